@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# Claim carrying User.token_version at issue time (see get_user_tokens).
+TOKEN_VERSION_CLAIM = "tv"
+
+
+def user_cache():
+    return caches[settings.JWT_USER_CACHE_ALIAS]
+
+
+def user_cache_key(user_id, token_version):
+    return f"jwt-user:{user_id}:{token_version}"
+
+
+def invalidate_cached_user(user):
+    # a version bump only moves one step, so the previous key is the only stale one
+    versions = {user.token_version, max(user.token_version - 1, 0)}
+    user_cache().delete_many([user_cache_key(user.pk, v) for v in versions])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from the cache rather than the
+    database on most requests.
+
+    The token signature and expiry are still checked on every request; only
+    the User lookup is cached, for JWT_USER_CACHE_TTL seconds, under
+    (user id, token version). Deactivating a user or changing their password
+    bumps User.token_version, which revokes every token issued before it
+    (api/signals.py), and saving a user drops its cache entry.
+
+    That drop only reaches the cache the saving process can see. With a
+    shared cache (JWT_USER_CACHE_ALIAS pointing at e.g. Redis or Memcached)
+    it applies everywhere on the next request; with per-process LocMem the
+    other workers keep serving their copy until it expires, which is why the
+    default TTL is short.
+    """
+
+    def _claims(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        return user_id, validated_token.get(TOKEN_VERSION_CLAIM, 0)
+
+    def _check_user(self, user, version):
+        # only entries that passed this are cached
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(_("User not found or inactive"), code="user_not_found")
+        if user.token_version != version:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+    def get_user(self, validated_token):
+        user_id, version = self._claims(validated_token)
+        key = user_cache_key(user_id, version)
+        user = user_cache().get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            self._check_user(user, version)
+            user_cache().set(key, user, settings.JWT_USER_CACHE_TTL)
+        return user
+
+    async def aget_user(self, validated_token):
+        # async views (views/async_views.py): same lookup through the async cache / ORM APIs
+        user_id, version = self._claims(validated_token)
+        key = user_cache_key(user_id, version)
+        user = await user_cache().aget(key)
+        if user is None:
+            user = await self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+            self._check_user(user, version)
+            await user_cache().aset(key, user, settings.JWT_USER_CACHE_TTL)
+        return user
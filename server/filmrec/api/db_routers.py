@@ -0,0 +1,120 @@
+import asyncio
+import functools
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+REPLICA_ALIAS = "replica"
+RECENT_WRITE_COOKIE = "filmrec_recent_write"
+RECENT_WRITE_SALT = "api.db_routers.recent_write"
+
+# Alias reads should go to for the current request; None means the primary.
+_read_alias = ContextVar("filmrec_read_alias", default=None)
+
+
+def mark_recent_write(request):
+    """
+    Pin the requesting user's reads to the primary for
+    DB_REPLICA_STICKY_SECONDS, so the stats they load right after an import
+    reflect it (read-your-writes).
+
+    The marker is a signed, timestamped cookie recent_write_middleware sets on
+    this response: every worker can check it without a query, whatever the
+    cache backend.
+    """
+    user = getattr(request, "user", None)
+    if REPLICA_ALIAS in settings.DATABASES and user is not None and user.pk:
+        # a DRF Request wraps the HttpRequest the middleware sees
+        getattr(request, "_request", request).recent_write_by = user.pk
+
+
+def has_recent_write(request):
+    user = getattr(request, "user", None)
+    if user is None or not user.pk:
+        return False
+    marker = request.get_signed_cookie(
+        RECENT_WRITE_COOKIE, default=None, salt=RECENT_WRITE_SALT,
+        max_age=settings.DB_REPLICA_STICKY_SECONDS,
+    )
+    return marker == str(user.pk)
+
+
+@sync_and_async_middleware
+def recent_write_middleware(get_response):
+    """
+    Sets the cookie has_recent_write() looks for on responses to requests
+    that called mark_recent_write().
+    """
+    def set_marker(request, response):
+        user_pk = getattr(request, "recent_write_by", None)
+        if user_pk is not None:
+            response.set_signed_cookie(
+                RECENT_WRITE_COOKIE, str(user_pk), salt=RECENT_WRITE_SALT,
+                max_age=settings.DB_REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax",
+            )
+        return response
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            return set_marker(request, await get_response(request))
+    else:
+        def middleware(request):
+            return set_marker(request, get_response(request))
+    return middleware
+
+
+def use_read_replica(view):
+    """
+    Route the ORM reads of a read-only view to the replica.
+
+    Goes under @api_view / @permission_classes (or under the auth decorator
+    of an async view) so request.user is the authenticated user. Falls back
+    to the primary when no replica is configured or the user wrote recently.
+    """
+    def replica_wanted(request):
+        return REPLICA_ALIAS in settings.DATABASES and not has_recent_write(request)
+
+    if asyncio.iscoroutinefunction(view):
+        # async views: the ORM runs queries via sync_to_async, which carries the contextvar over
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not replica_wanted(request):
+                return await view(request, *args, **kwargs)
+            token = _read_alias.set(REPLICA_ALIAS)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_wanted(request):
+            return view(request, *args, **kwargs)
+        token = _read_alias.set(REPLICA_ALIAS)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes (and migrations) always go to "default"; reads go to the replica
+    only inside a use_read_replica view.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
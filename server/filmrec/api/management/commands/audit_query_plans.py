@@ -0,0 +1,193 @@
+import json
+import re
+from datetime import date, timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ...models import (
+    Actor, Director, Genre, Movie, MovieActor, MovieDirector, MovieGenre, MovieUser, User,
+)
+from ...services.letterboxd_import import run_letterboxd_import
+from ...views.stats_views import stats_all_time, stats_payload
+
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+# "SCAN api_movieuser" is a full table scan; "SCAN t USING [COVERING] INDEX i",
+# constant rows, materialized subqueries and virtual-table (FTS) scans are not.
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(?!\(?subquery)(\S+)(?!.*\bUSING\b)(?!.*VIRTUAL TABLE)")
+
+UNFILTERED = re.compile(r"^SELECT (?:(?!\b(?:WHERE|JOIN)\b).)* FROM \"\w+\"(?: ORDER BY [^()]*)?$", re.S)
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def query_shape(sql):
+    # collapse literals so the same query with different parameters is explained once
+    return re.sub(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b", "?", sql)
+
+
+class Command(BaseCommand):
+    help = ("Run the stats views and a Letterboxd import inside a rolled-back transaction, "
+            "EXPLAIN QUERY PLAN every query they issue and flag full table scans.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", default=None,
+                            help="Audit against this user's data instead of a synthetic user.")
+        parser.add_argument("--movies", type=int, default=300, help="Synthetic catalog size.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+        parser.add_argument("--fail-on-scan", action="store_true",
+                            help="Exit non-zero if any full table scan is found.")
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "sqlite":
+            raise CommandError("audit_query_plans reads SQLite's EXPLAIN QUERY PLAN output.")
+
+        report = {}
+        with transaction.atomic():
+            if opts["username"]:
+                user = User.objects.filter(username=opts["username"]).first()
+                if user is None:
+                    raise CommandError(f"No user named {opts['username']!r}.")
+            else:
+                user = self._seed(opts["movies"])
+
+            for name, scenario in self._scenarios(user).items():
+                with CaptureQueriesContext(connection) as ctx:
+                    try:
+                        with transaction.atomic():
+                            scenario()
+                    except Exception as exc:
+                        report[name] = {"error": repr(exc), "queries": len(ctx.captured_queries)}
+                        continue
+                report[name] = self._audit(ctx.captured_queries)
+
+            # nothing the audit did is kept
+            transaction.set_rollback(True)
+
+        scans = sum(len(r.get("fullScans", [])) for r in report.values())
+        if opts["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print(report)
+
+        if opts["fail_on_scan"] and scans:
+            raise CommandError(f"{scans} full table scan(s) found.")
+
+    # ---------- scenarios ----------
+    def _scenarios(self, user):
+        factory = APIRequestFactory()
+
+        def call_view(view, path):
+            def run():
+                request = factory.get(path)
+                force_authenticate(request, user=user)
+                response = view(request)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+            return run
+
+        return {
+            "stats_payload": call_view(stats_payload, "/api/stats/"),
+            "stats_all_time": call_view(stats_all_time, "/api/stats/all-time"),
+            "letterboxd_import": self._import_scenario(user),
+        }
+
+    def _import_scenario(self, user):
+        # a mix of known URIs, new films and URI-less rows for the fuzzy matcher;
+        # the CSV is built up front so its own queries aren't audited
+        movies = list(Movie.objects.order_by("id").values_list("title", "letterboxd_uri")[:50])
+        lines = ["Date,Name,Year,Letterboxd URI,Rating,Rewatch,Review,Tags,Watched Date"]
+        for i, (title, uri) in enumerate(movies):
+            lines.append(f'2024-01-01,"{title}",2000,{uri or ""},3.5,,"Review {i}",,2024-01-{i % 28 + 1:02d}')
+        for i in range(20):
+            lines.append(f'2024-02-01,"Audit New Film {i}",2001,https://boxd.it/audit{i},4,,,,2024-02-01')
+        for title, _ in movies[:5]:
+            lines.append(f'2024-03-01,"{title}",2000,,4,,,,2024-03-01')
+        data = "\n".join(lines).encode("utf-8")
+
+        def run():
+            run_letterboxd_import(user=user, reviews_file=SimpleUploadedFile("reviews.csv", data))
+        return run
+
+    def _seed(self, n_movies):
+        user = User.objects.create(username="__query_plan_audit__", email="audit@example.invalid")
+        movies = Movie.objects.bulk_create(
+            Movie(title=f"Audit Film {i}", release_date=date(1950 + i % 70, 1, 1),
+                  letterboxd_uri=f"https://letterboxd.com/film/audit-film-{i}/")
+            for i in range(n_movies)
+        )
+        genres = Genre.objects.bulk_create(Genre(name=f"Audit Genre {i}") for i in range(10))
+        directors = Director.objects.bulk_create(Director(name=f"Audit Director {i}") for i in range(30))
+        actors = Actor.objects.bulk_create(Actor(name=f"Audit Actor {i}") for i in range(200))
+
+        MovieGenre.objects.bulk_create(MovieGenre(movie=m, genre=genres[i % len(genres)]) for i, m in enumerate(movies))
+        MovieDirector.objects.bulk_create(
+            MovieDirector(movie=m, director=directors[i % len(directors)]) for i, m in enumerate(movies)
+        )
+        MovieActor.objects.bulk_create(
+            MovieActor(movie=m, actor=actors[(i * 7 + j) % len(actors)], casting_order=j)
+            for i, m in enumerate(movies) for j in range(5)
+        )
+        today = date.today()
+        MovieUser.objects.bulk_create(
+            MovieUser(user=user, movie=m, watch_status="Watched", watched_date=today - timedelta(days=i % 30))
+            for i, m in enumerate(movies[: n_movies // 2])
+        )
+        return user
+
+    # ---------- plans ----------
+    def _audit(self, captured):
+        seen = {}
+        for query in captured:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith(EXPLAINABLE):
+                continue
+            seen.setdefault(query_shape(sql), sql)
+
+        full_scans, full_reads, temp_btrees = [], [], 0
+        for sql in seen.values():
+            plan = explain(sql)
+            temp_btrees += sum("USE TEMP B-TREE" in line for line in plan)
+            tables = [m.group(1) for m in map(FULL_SCAN.match, plan) if m]
+            if not tables:
+                continue
+            entry = {"tables": tables, "sql": sql, "plan": plan}
+            # an unfiltered SELECT (e.g. loading the title index) reads everything by design
+            if UNFILTERED.search(sql):
+                full_reads.append(entry)
+            else:
+                full_scans.append(entry)
+        return {
+            "queries": len(captured),
+            "distinctQueries": len(seen),
+            "tempBtrees": temp_btrees,
+            "fullScans": full_scans,
+            "fullReads": full_reads,
+        }
+
+    def _print(self, report):
+        for name, result in report.items():
+            if "error" in result:
+                self.stdout.write(self.style.ERROR(f"{name}: failed after {result['queries']} queries: {result['error']}"))
+                continue
+            self.stdout.write(
+                f"{name}: {result['queries']} queries, {result['distinctQueries']} distinct, "
+                f"{result['tempBtrees']} temp b-tree sorts"
+            )
+            for scan in result["fullScans"]:
+                self.stdout.write(self.style.WARNING(f"  full scan of {', '.join(scan['tables'])}"))
+                self.stdout.write(f"    {scan['sql'][:300]}")
+                for line in scan["plan"]:
+                    self.stdout.write(f"      {line}")
+            for read in result["fullReads"]:
+                self.stdout.write(f"  unfiltered read of {', '.join(read['tables'])} (expected)")
+            if not result["fullScans"]:
+                self.stdout.write(self.style.SUCCESS("  no full table scans"))
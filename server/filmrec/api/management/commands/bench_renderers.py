@@ -0,0 +1,128 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from ...models import Movie, MovieUser, User
+from ...renderers import ORJSONRenderer, orjson
+from ...serializer import HistoryEntrySerializer, MovieSerializer, MovieSummarySerializer, history_values
+
+# .only() columns for the lean serializer over model instances
+LEAN_ONLY = [f for f in HistoryEntrySerializer.Meta.fields if f != "movie"] + [
+    f"movie__{f}" for f in MovieSummarySerializer.Meta.fields
+]
+
+
+class FullHistoryEntrySerializer(serializers.ModelSerializer):
+    # the '__all__' shape: every Movie column, description included
+    movie = MovieSerializer(read_only=True)
+
+    class Meta:
+        model = MovieUser
+        fields = "__all__"
+
+
+def seed_synthetic_history(n, seed=0):
+    """
+    A throwaway user with n watched films (long descriptions included); the
+    caller runs this inside a transaction it rolls back.
+    """
+    rng = random.Random(seed)
+    user = User.objects.create_user(username="bench-renderers", password=None)
+    movies = Movie.objects.bulk_create([
+        Movie(
+            title=f"Film {i}", letterboxd_uri=f"https://letterboxd.com/film/bench-film-{i}/",
+            release_date=date(1930 + i % 95, 1, 1), description="Lorem ipsum dolor sit amet. " * 25,
+            avg_rating=round(rng.uniform(4, 9), 1), budget=rng.randrange(10**6, 10**8),
+            revenue=rng.randrange(10**6, 10**9), runtime=rng.randrange(80, 180), language="en",
+            country="United States of America", poster_url=f"https://image.tmdb.org/t/p/original/{i}.jpg",
+        )
+        for i in range(n)
+    ], batch_size=500)
+    MovieUser.objects.bulk_create([
+        MovieUser(
+            movie=movie, user=user, rating=rng.choice([None, 2.5, 3.5, 4.0, 5.0]),
+            watch_status="Watched", watched_date=date(2020, 1, 1) + timedelta(days=i % 1500),
+            liked=rng.random() < 0.3, rewatch=False,
+        )
+        for i, movie in enumerate(movies)
+    ], batch_size=500)
+    return user
+
+
+def best_of(repeat, fn):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = ("Benchmark querying, serializing and rendering a large watch-history payload: full ModelSerializer "
+            "rows vs lean serializers vs values() projections (as /api/history/ serves them), with DRF's "
+            "JSONRenderer vs ORJSONRenderer.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Synthetic history entries.")
+        parser.add_argument("--username", default=None, help="Benchmark this user's real history instead.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per case (best is reported).")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            if opts["username"]:
+                user = User.objects.filter(username=opts["username"]).first()
+                if user is None:
+                    raise CommandError(f"No user named {opts['username']!r}.")
+            else:
+                user = seed_synthetic_history(opts["rows"])
+            results = self.run_cases(MovieUser.objects.filter(user=user).order_by("-watched_date", "-id"), opts)
+            # synthetic rows are only there for the run
+            transaction.set_rollback(True)
+        self.report(results, opts)
+
+    def run_cases(self, qs, opts):
+        # each shape includes its query: the projection's saving is mostly in what it reads
+        shapes = {
+            "full_serializer": lambda: FullHistoryEntrySerializer(qs.select_related("movie"), many=True).data,
+            "lean_serializer": lambda: HistoryEntrySerializer(
+                qs.select_related("movie").only(*LEAN_ONLY), many=True).data,
+            "values_projection": lambda: HistoryEntrySerializer(history_values(qs), many=True).data,
+        }
+        renderers = {"drf_json": JSONRenderer(), "orjson": ORJSONRenderer()}
+
+        results = []
+        for shape, build in shapes.items():
+            shape_secs, data = best_of(opts["repeat"], build)
+            for name, renderer in renderers.items():
+                render_secs, body = best_of(opts["repeat"], lambda: renderer.render(data))
+                results.append({
+                    "shape": shape,
+                    "renderer": name,
+                    "rows": len(data),
+                    "serializeMs": round(shape_secs * 1000, 2),
+                    "renderMs": round(render_secs * 1000, 2),
+                    "totalMs": round((shape_secs + render_secs) * 1000, 2),
+                    "bytes": len(body),
+                })
+        return results
+
+    def report(self, results, opts):
+        if opts["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed: ORJSONRenderer falls back to DRF's renderer."))
+        self.stdout.write(f"{'shape':<20}{'renderer':<10}{'serialize ms':>14}{'render ms':>11}{'total ms':>10}{'bytes':>12}")
+        for r in results:
+            self.stdout.write(
+                f"{r['shape']:<20}{r['renderer']:<10}{r['serializeMs']:>14}{r['renderMs']:>11}"
+                f"{r['totalMs']:>10}{r['bytes']:>12}"
+            )
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from ...services.similar_films import rebuild_neighbours
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the top-k similar films per movie (co-watches blended with shared "
+        "genres, directors and cast). Only movies whose inputs changed, and the movies similar to them, "
+        "are recomputed unless --full is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recompute every movie.")
+        parser.add_argument("--k", type=int, default=20, help="Neighbours stored per movie.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        counters = rebuild_neighbours(full=opts["full"], k=opts["k"], batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {counters['recomputed']} of {counters['movies']} movies, "
+            f"wrote {counters['neighbors_written']} neighbour rows."
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ...services.global_stats import compute_global_stats
+
+
+class Command(BaseCommand):
+    help = ("Recompute the site-wide and per-cohort summary rows (watch-count percentiles, genre / decade "
+            "shares, this week's most-watched films and directors) behind the stats 'vsEveryone' figures. "
+            "Meant to run periodically, e.g. hourly from cron.")
+
+    def handle(self, *args, **opts):
+        counters = compute_global_stats()
+        self.stdout.write(self.style.SUCCESS(", ".join(f"{k}={v}" for k, v in counters.items())))
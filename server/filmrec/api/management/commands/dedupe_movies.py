@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from ...services.movie_dedupe import dedupe_movies
+
+
+class Command(BaseCommand):
+    help = ("Merge duplicate Movie rows (same canonical Letterboxd slug, or title + year) into one "
+            "survivor, moving watch history and credits onto it.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Run the merge in a transaction that is rolled back and report what it would do.")
+
+    def handle(self, *args, **opts):
+        counters = dedupe_movies(dry_run=opts["dry_run"])
+        prefix = "Dry run (nothing saved): " if opts["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(prefix + ", ".join(f"{k}={v}" for k, v in counters.items())))
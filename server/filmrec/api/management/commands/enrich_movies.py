@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Movie
+from ...services.tmdb_client import TMDbClient
+from ...services.tmdb_enrichment import enrich_movies
+
+
+class Command(BaseCommand):
+    help = "Fill Movie metadata and Actor/Director/Genre links from TMDb for movies missing them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Enrich at most this many movies.")
+        parser.add_argument("--workers", type=int, default=None, help="Concurrent lookups (TMDB_MAX_WORKERS).")
+        parser.add_argument("--rate", type=float, default=None,
+                            help="Requests per second (TMDB_REQUESTS_PER_SECOND).")
+        parser.add_argument("--batch-size", type=int, default=50, help="Movies written per transaction.")
+        parser.add_argument("--all", action="store_true",
+                            help="Re-enrich every movie, not only those missing metadata.")
+        parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache.")
+        parser.add_argument("--base-url", default=None, help="Override TMDB_API_BASE_URL, e.g. a local stand-in.")
+
+    def handle(self, *args, **opts):
+        client = TMDbClient(
+            base_url=opts["base_url"],
+            requests_per_second=opts["rate"],
+            **({"cache": None} if opts["no_cache"] else {}),
+        )
+        counters = enrich_movies(
+            Movie.objects.order_by("id") if opts["all"] else None,
+            client=client,
+            max_workers=opts["workers"],
+            batch_size=opts["batch_size"],
+            limit=opts["limit"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{k}={v}" for k, v in counters.items())
+        ))
@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ...services.loadtest import (
+    DEFAULT_MIX, ClientTransport, FixtureFeedServer, HttpTransport, parse_mix, run_load, seeded_accounts, seeded_films,
+)
+
+
+class Command(BaseCommand):
+    help = ("Drive the API routes (login, ping, stats, all-time stats, CSV import, RSS sync against a local "
+            "fixture feed) as concurrent seeded users and report throughput and p50/p95/p99 latency per "
+            "endpoint. Run seed_loadtest first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8, help="Simultaneous simulated users.")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run for.")
+        parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests (not counting each worker's first login).")
+        parser.add_argument("--mix", default=None,
+                            help="Endpoint weights, e.g. 'stats=40,all_time=25,rss=10' "
+                                 f"(default: {','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())}).")
+        parser.add_argument("--base-url", default=None,
+                            help="Load a running server (e.g. http://127.0.0.1:8000) instead of "
+                                 "calling the URL conf in-process. It must share this database.")
+        parser.add_argument("--users", type=int, default=None, help="Use only the first N seeded users.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **opts):
+        try:
+            mix = parse_mix(opts["mix"]) if opts["mix"] else DEFAULT_MIX
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if opts["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        accounts, films = seeded_accounts(opts["users"]), seeded_films()
+        if not accounts or not films:
+            raise CommandError("No seeded data found; run seed_loadtest first.")
+
+        if opts["base_url"]:
+            base_url = opts["base_url"]
+            make_transport = lambda: HttpTransport(base_url)
+            self.stderr.write("Start the server with LETTERBOXD_SYNC_MIN_INTERVAL=0, or repeated syncs and "
+                              "imports are answered from the last result (counted under 'shared').")
+        else:
+            # the test Client's "testserver" host has to be allowed
+            setup_test_environment()
+            make_transport = ClientTransport
+
+        try:
+            with FixtureFeedServer(films) as feeds:
+                report = run_load(make_transport, accounts, films, feeds, mix=mix,
+                                  concurrency=opts["concurrency"], duration=opts["duration"],
+                                  max_requests=opts["requests"], seed=opts["seed"])
+        finally:
+            if not opts["base_url"]:
+                teardown_test_environment()
+
+        report = {
+            "mode": "http" if opts["base_url"] else "in-process",
+            "concurrency": opts["concurrency"],
+            "users": len(accounts),
+            "mix": mix,
+            **report,
+        }
+        if opts["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self._print(report)
+
+    def _print(self, report):
+        self.stdout.write(
+            f"{report['mode']}: {report['requests']} requests in {report['wallSeconds']}s "
+            f"({report['throughput']} req/s), concurrency {report['concurrency']}, "
+            f"error rate {report['errorRate']:.2%}"
+        )
+        self.stdout.write(f"{'endpoint':<10}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                          f"{'errors':>8}{'shared':>8}")
+        for name, r in report["endpoints"].items():
+            line = (f"{name:<10}{r['requests']:>9}{r['throughput']:>8}{r['p50Ms']:>9}{r['p95Ms']:>9}"
+                    f"{r['p99Ms']:>9}{r['errors']:>8}{r['shared']:>8}")
+            self.stdout.write(self.style.WARNING(line) if r["errors"] else line)
@@ -0,0 +1,54 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.import_profile import BOOT_MODULES, best_of, heavy_modules_loaded
+
+
+class Command(BaseCommand):
+    help = ("Boot the app in a fresh interpreter under `python -X importtime` and report the slowest "
+            "module imports, the total cold-start time and any heavy dependency loaded at boot.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25, help="Modules to list, by cumulative time.")
+        parser.add_argument("--runs", type=int, default=3, help="Boots to measure; the fastest is reported.")
+        parser.add_argument("--module", action="append", default=None,
+                            help="Import this module as well as the URLconf (repeatable). Default: filmrec.wsgi.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+        parser.add_argument("--fail-over-budget", action="store_true",
+                            help="Exit non-zero if boot exceeds WORKER_BOOT_BUDGET_MS or WORKER_BOOT_MAX_MODULES, "
+                                 "or loads a heavy module.")
+
+    def handle(self, *args, **opts):
+        result = best_of(opts["runs"], opts["module"] or BOOT_MODULES)
+        slowest = sorted(result["imports"], key=lambda row: row["cumulative"], reverse=True)[:opts["top"]]
+        heavy = heavy_modules_loaded(result)
+        boot_ms = round(result["seconds"] * 1000, 1)
+        budget_ms = settings.WORKER_BOOT_BUDGET_MS
+        modules = len(result["modules"])
+        over = boot_ms > budget_ms or modules > settings.WORKER_BOOT_MAX_MODULES or heavy
+
+        if opts["json"]:
+            self.stdout.write(json.dumps({
+                "bootMs": boot_ms, "budgetMs": budget_ms, "modulesLoaded": modules,
+                "maxModules": settings.WORKER_BOOT_MAX_MODULES,
+                "heavyModules": heavy, "slowest": slowest,
+            }, indent=2))
+        else:
+            self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+            for row in slowest:
+                self.stdout.write(
+                    f"{row['cumulative'] / 1000:>14.1f} {row['self'] / 1000:>9.1f}  {'  ' * row['depth']}{row['module']}"
+                )
+            style = self.style.WARNING if over else self.style.SUCCESS
+            self.stdout.write(style(
+                f"boot={boot_ms}ms, budget={budget_ms}ms, modules={modules}/{settings.WORKER_BOOT_MAX_MODULES}, "
+                f"heavy={','.join(heavy) or 'none'}"
+            ))
+
+        if opts["fail_over_budget"] and over:
+            raise CommandError(
+                f"Boot took {boot_ms}ms (budget {budget_ms}ms) and loaded {modules} modules "
+                f"(max {settings.WORKER_BOOT_MAX_MODULES}); heavy modules: {heavy or 'none'}."
+            )
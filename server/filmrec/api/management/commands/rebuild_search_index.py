@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.search_index import rebuild_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SQLite FTS5 index over movie titles/descriptions and user reviews."
+
+    def handle(self, *args, **opts):
+        if not search_available():
+            raise CommandError("Full-text search index requires the SQLite backend.")
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} MovieUser rows."))
@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.recommender import RECOMMENDERS
+from ...services.recommender_eval import (
+    generate_synthetic_interactions,
+    load_movieuser_rows,
+    run_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Offline recommender evaluation: time-based holdout on MovieUser.watched_date, "
+        "precision/recall/NDCG@k, coverage, training time, index size and scoring latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from-db", action="store_true",
+                            help="Evaluate on watched MovieUser rows instead of a synthetic dataset.")
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--movies", type=int, default=2000)
+        parser.add_argument("--per-user", type=int, default=30, help="Mean watches per synthetic user.")
+        parser.add_argument("--models", default=",".join(RECOMMENDERS))
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument("--holdout", type=float, default=0.2)
+        parser.add_argument("--latency-sample", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--json", action="store_true", help="Print machine-readable output.")
+
+    def handle(self, *args, **opts):
+        models = [m.strip() for m in opts["models"].split(",") if m.strip()]
+        unknown = [m for m in models if m not in RECOMMENDERS]
+        if unknown:
+            raise CommandError(f"Unknown model(s): {', '.join(unknown)}")
+
+        if opts["from_db"]:
+            rows = load_movieuser_rows()
+        else:
+            rows = generate_synthetic_interactions(
+                n_users=opts["users"],
+                n_movies=opts["movies"],
+                mean_per_user=opts["per_user"],
+                seed=opts["seed"],
+            )
+        if not rows:
+            raise CommandError("No interactions to evaluate.")
+
+        try:
+            report = run_benchmark(
+                rows,
+                models=models,
+                k=opts["k"],
+                holdout=opts["holdout"],
+                latency_sample=opts["latency_sample"],
+                seed=opts["seed"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        k = opts["k"]
+        self.stdout.write(
+            f"{report['users']} users, {report['movies']} movies, "
+            f"{report['train_interactions']} train interactions, {report['test_users']} test users"
+        )
+        header = f"{'model':<12}{'P@k':>8}{'R@k':>8}{'NDCG':>8}{'cover':>8}{'train s':>9}{'index KB':>10}{'p50 ms':>8}{'p99 ms':>8}"
+        self.stdout.write(header)
+        for r in report["results"]:
+            self.stdout.write(
+                f"{r['model']:<12}"
+                f"{r[f'precision@{k}']:>8.4f}{r[f'recall@{k}']:>8.4f}{r[f'ndcg@{k}']:>8.4f}"
+                f"{r['catalog_coverage']:>8.3f}{r['train_seconds']:>9.2f}{r['index_bytes'] / 1024:>10.0f}"
+                f"{r['latency_ms_p50'] or 0:>8.2f}{r['latency_ms_p99'] or 0:>8.2f}"
+            )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...services.loadtest import clear_dataset, seed_dataset
+
+
+class Command(BaseCommand):
+    help = ("Seed synthetic users, enriched films and watch histories for the loadtest command. "
+            "Everything created is prefixed 'loadtest-' and removed again by --flush.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100, help="Accounts to create.")
+        parser.add_argument("--movies", type=int, default=5000, help="Films in the synthetic catalog.")
+        parser.add_argument("--median-history", type=int, default=250, help="Median films logged per user.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--flush", action="store_true", help="Remove previously seeded data first.")
+        parser.add_argument("--flush-only", action="store_true", help="Remove previously seeded data and stop.")
+
+    def handle(self, *args, **opts):
+        if opts["flush"] or opts["flush_only"]:
+            counts = clear_dataset()
+            self.stdout.write("Removed: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+            if opts["flush_only"]:
+                return
+        if opts["users"] < 1 or opts["movies"] < 1:
+            raise CommandError("--users and --movies must be positive.")
+
+        counts = seed_dataset(users=opts["users"], movies=opts["movies"], seed=opts["seed"],
+                              median_history=opts["median_history"])
+        self.stdout.write(self.style.SUCCESS(", ".join(f"{k}={v}" for k, v in counts.items())))
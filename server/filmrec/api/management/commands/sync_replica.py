@@ -0,0 +1,28 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ...db_routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the replica file (local stand-in for replication)."
+
+    def handle(self, *args, **opts):
+        if REPLICA_ALIAS not in settings.DATABASES:
+            raise CommandError("No replica configured; set FILMREC_REPLICA_DB_PATH.")
+        connections[REPLICA_ALIAS].close()
+
+        # the online backup API gives a consistent snapshot even while the primary is written to
+        src = sqlite3.connect(str(settings.DATABASES["default"]["NAME"]))
+        dst = sqlite3.connect(str(settings.DATABASES[REPLICA_ALIAS]["NAME"]))
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Replica refreshed: {settings.DATABASES[REPLICA_ALIAS]['NAME']}"
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Actor, Movie
+from ...services.poster_cache import warm_images
+
+
+class Command(BaseCommand):
+    help = "Download movie posters (and optionally actor profile images) into the local image cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--actors", action="store_true", help="Also cache actor profile images.")
+        parser.add_argument("--limit", type=int, default=None, help="Cache at most this many movies / actors.")
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent downloads.")
+
+    def handle(self, *args, **opts):
+        urls = Movie.objects.exclude(poster_url__isnull=True).exclude(poster_url="") \
+            .order_by("id").values_list("poster_url", flat=True)
+        urls = list(urls[:opts["limit"]] if opts["limit"] else urls)
+        if opts["actors"]:
+            profiles = Actor.objects.exclude(profile_url__isnull=True).exclude(profile_url="") \
+                .order_by("id").values_list("profile_url", flat=True)
+            urls += list(profiles[:opts["limit"]] if opts["limit"] else profiles)
+
+        counters = warm_images(urls, max_workers=opts["workers"])
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{k}={v}" for k, v in counters.items())
+        ))
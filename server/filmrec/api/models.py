@@ -31,19 +31,32 @@ class Movie(models.Model):
     letterboxd_uri = models.CharField(max_length=500, unique=True, null=True, blank=True)
     # TMDb id
     tmdb_id = models.IntegerField(unique=True, null = True, blank = True)
+    # Failed TMDb lookups (not found / errors), retried with backoff rather than on every enrichment run
+    enrichment_attempts = models.PositiveSmallIntegerField(default=0)
+    enrichment_retry_at = models.DateTimeField(blank=True, null=True)
+    # Last successful TMDb lookup; the movie isn't looked up again even if TMDb has no runtime for it
+    enriched_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        indexes = [
+            # fuzzy title matching reads candidates by release-year window (title_matcher.candidate_movies)
+            models.Index(fields=['release_date'], name='movie_release_date'),
+        ]
+
 # --- User Model ---
 class User(AbstractUser):
     last_sync = models.DateTimeField(auto_now=True)         # Track when the user last synced their data
+    token_version = models.PositiveIntegerField(default=0)  # Bumped to revoke every issued JWT (password reset)
     def __str__(self):
         return self.username
 
 # --- Actor Model ---
 class Actor(models.Model):
     name = models.CharField(max_length=255)
+    tmdb_id = models.IntegerField(unique=True, null=True, blank=True)     # TMDb person id
     birth_date = models.DateField(blank=True, null=True)
     profile_url = models.URLField(max_length=500, blank=True, null=True)
     biography = models.TextField(blank=True, null=True)
@@ -51,6 +64,7 @@ class Actor(models.Model):
 # --- Director Model ---
 class Director(models.Model):
     name = models.CharField(max_length=255)
+    tmdb_id = models.IntegerField(unique=True, null=True, blank=True)     # TMDb person id
     birth_date = models.DateField(blank=True, null=True)
     profile_url = models.URLField(max_length=500, blank=True, null=True)
     biography = models.TextField(blank=True, null=True)
@@ -83,6 +97,10 @@ class MovieUser(models.Model):
                 name='uniq_user_movie',
             )
         ]
+        indexes = [
+            # stats filters (user, watch_status, watched_date range); movie makes it covering for the joins
+            models.Index(fields=['user', 'watch_status', 'watched_date', 'movie'], name='mu_user_status_date'),
+        ]
         
 # --- Movie-Director Relationship ---
 class MovieDirector(models.Model):
@@ -95,6 +113,10 @@ class MovieDirector(models.Model):
                 fields=['movie', 'director'], name='uniq_movie_director'
                 )
         ]
+        indexes = [
+            # director -> movies joins; uniq_movie_director already serves movie -> director
+            models.Index(fields=['director', 'movie'], name='md_director_movie'),
+        ]
 
 # --- Movie-Genre Relationship ---
 class MovieGenre(models.Model):
@@ -107,6 +129,10 @@ class MovieGenre(models.Model):
                 fields=['movie', 'genre'], name='uniq_movie_genre'
                 )
         ]
+        indexes = [
+            # genre -> movies joins; uniq_movie_genre already serves movie -> genre
+            models.Index(fields=['genre', 'movie'], name='mg_genre_movie'),
+        ]
 
 # --- Movie-Actor Relationship ---
 class MovieActor(models.Model):
@@ -121,4 +147,97 @@ class MovieActor(models.Model):
                 fields=['movie', 'actor'], name='uniq_movie_actor'
                  )
         ]
+        indexes = [
+            # actor -> movies joins; uniq_movie_actor already serves movie -> actor
+            models.Index(fields=['actor', 'movie'], name='ma_actor_movie'),
+        ]
 # --- Tables ---
+
+# --- Recommendation Table ---
+class Recommendation(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE)
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()                   # 1 = best
+    model_name = models.CharField(max_length=50)                # recommender that produced the row
+    generated_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'movie'], name='uniq_user_recommendation'
+                )
+        ]
+
+# --- Similar Films Table ---
+class MovieNeighbor(models.Model):
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()                   # 1 = most similar
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['movie', 'rank'], name='uniq_movie_neighbor_rank'
+                )
+        ]
+
+# Signature of the inputs a movie's neighbours were computed from, so the
+# builder only recomputes movies whose watches or credits changed.
+class MovieNeighborState(models.Model):
+    movie = models.OneToOneField(Movie, on_delete=models.CASCADE, primary_key=True)
+    signature = models.CharField(max_length=255)
+    computed_at = models.DateTimeField()
+
+# --- Image Cache Table ---
+# Remote poster / profile URL -> content hash of the downloaded file.
+# Files live under POSTER_CACHE_DIR keyed by sha256 (see services/poster_cache).
+class CachedImage(models.Model):
+    OK, MISSING = "ok", "missing"
+
+    url = models.URLField(max_length=500, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True, blank=True, default="")
+    content_type = models.CharField(max_length=50, blank=True, default="")
+    byte_size = models.PositiveIntegerField(default=0)
+    fetched_at = models.DateTimeField()
+    # MISSING: the source had no usable image; it isn't asked again before retry_at
+    status = models.CharField(max_length=10, default=OK)
+    retry_at = models.DateTimeField(blank=True, null=True)
+
+# --- Global Stats Table ---
+# One row per cohort ("all", or the year users joined), rewritten by the
+# compute_global_stats job so the stats views can compare a user with everyone
+# without reading anyone else's rows. Distributions are stored pre-aggregated.
+class GlobalStats(models.Model):
+    cohort = models.CharField(max_length=20, unique=True)
+    users = models.PositiveIntegerField()                   # users with at least one watched film
+    week_percentiles = models.JSONField()                   # 101 quantiles of films watched in the last 7 days
+    month_percentiles = models.JSONField()                  # ... in the last 30 days
+    all_time_percentiles = models.JSONField()               # ... ever
+    genre_shares = models.JSONField()                       # {"Drama": 0.41}: share of watched films with the genre
+    decade_shares = models.JSONField()                      # {"90s": 0.12}: share of watched films from the decade
+    week_start = models.DateField()                         # Sunday the top lists cover
+    top_films = models.JSONField(default=list)              # [{"id", "name", "count"}], most watched this week
+    top_directors = models.JSONField(default=list)
+    computed_at = models.DateTimeField()
+
+# Each user's own counts as of the same compute_global_stats run, so a user is
+# placed in the distribution with the numbers it was built from.
+class UserStatsSummary(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    last_7_days = models.PositiveIntegerField()
+    last_30_days = models.PositiveIntegerField()
+    all_time = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+# --- Single-Flight Table ---
+# One row per single-flight key (services/single_flight): the lease of the
+# process running it, and the last finished result, shared by every worker.
+class SingleFlight(models.Model):
+    key = models.CharField(max_length=255, unique=True)
+    scope = models.CharField(max_length=255, db_index=True)        # min_interval is enforced across a scope
+    token = models.CharField(max_length=32, blank=True)             # owner of the running call, "" when idle
+    locked_until = models.DateTimeField(blank=True, null=True)      # a crashed owner's lease lapses here
+    result = models.JSONField(blank=True, null=True)                # last finished call's return value
+    finished_at = models.DateTimeField(blank=True, null=True, db_index=True)
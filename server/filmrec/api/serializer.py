@@ -38,6 +38,10 @@ class RegistrationSerializer(serializers.ModelSerializer):
         style = {'input_type': 'password'},
         write_only = True
     )
+
+    class Meta:
+        model = User
+        fields = ['first_name', 'email', 'password']
     
     def validate_email(self, value):
         if User.objects.filter(email=value).exists():
@@ -71,3 +75,35 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
         fields = '__all__'
 
+
+# --- Lean read serializers ---
+# List responses can carry thousands of rows; these name exactly the columns a
+# list needs (no description / budget text), so querysets can be projected to match.
+class MovieSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Movie
+        fields = ['id', 'title', 'release_date', 'poster_url']
+        read_only_fields = fields
+
+# --- Watch History Entry Serializer ---
+class HistoryEntrySerializer(serializers.ModelSerializer):
+    movie = MovieSummarySerializer(read_only=True)
+
+    class Meta:
+        model = MovieUser
+        fields = ['id', 'movie', 'rating', 'watch_status', 'watched_date', 'liked', 'rewatch']
+        read_only_fields = fields
+
+
+def history_values(queryset):
+    """
+    MovieUser rows projected with .values() to exactly the HistoryEntrySerializer
+    columns, nested the way the serializer reads them. No model instances are built.
+    """
+    movie_fields = MovieSummarySerializer.Meta.fields
+    entry_fields = [f for f in HistoryEntrySerializer.Meta.fields if f != 'movie']
+    rows = queryset.values(*entry_fields, *(f'movie__{f}' for f in movie_fields))
+    return [
+        {**{f: r[f] for f in entry_fields}, 'movie': {f: r[f'movie__{f}'] for f in movie_fields}}
+        for r in rows
+    ]
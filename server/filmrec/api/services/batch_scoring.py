@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .recommender import Interactions, build_recommender
+
+# Per-worker state, filled in by _init_worker. Arrays are views onto shared
+# memory created by the parent, so nothing large is pickled per task.
+_worker = {}
+
+
+def _to_shared(arrays):
+    """
+    Copy arrays into named shared memory blocks.
+
+    Returns (blocks, spec) where spec is a small picklable
+    {name: (shm name, shape, dtype)} that workers use to attach.
+    """
+    blocks, spec = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+
+def _attach(spec):
+    blocks, arrays = [], {}
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return blocks, arrays
+
+
+def _init_worker(model_name, model_spec, data_spec, k):
+    model_blocks, model_arrays = _attach(model_spec)
+    data_blocks, data = _attach(data_spec)
+
+    _worker["blocks"] = model_blocks + data_blocks   # keep mappings alive
+    _worker["model"] = build_recommender(model_name).load_arrays(model_arrays)
+    _worker["interactions"] = Interactions(
+        data["indptr"], data["indices"], data["user_ids"], data["movie_ids"],
+    )
+    _worker["k"] = k
+
+
+def _score_range(bounds):
+    start, stop = bounds
+    rows = np.arange(start, stop)
+    top, scores = _worker["model"].recommend_block(_worker["interactions"], rows, k=_worker["k"])
+    return start, top.astype(np.int32), scores
+
+
+def iter_scored_blocks(model, interactions, *, k=20, processes=None, block_size=256):
+    """
+    Score every user in `interactions` with a fitted model.
+
+    Users are sharded into contiguous blocks of `block_size` rows and scored
+    across a process pool; each block is one (block x items) matrix product.
+    Model arrays and the interaction CSR live in shared memory.
+
+    Yields (user row start, top item indices, top scores) per block, in
+    completion order.
+    """
+    processes = processes or os.cpu_count() or 1
+    bounds = [
+        (start, min(start + block_size, interactions.n_users))
+        for start in range(0, interactions.n_users, block_size)
+    ]
+
+    if processes == 1:
+        for start, stop in bounds:
+            rows = np.arange(start, stop)
+            top, scores = model.recommend_block(interactions, rows, k=k)
+            yield start, top, scores
+        return
+
+    model_blocks, model_spec = _to_shared(model.arrays())
+    data_blocks, data_spec = _to_shared({
+        "indptr": interactions.indptr,
+        "indices": interactions.indices,
+        "user_ids": interactions.user_ids,
+        "movie_ids": interactions.movie_ids,
+    })
+    try:
+        # spawn: workers must not inherit the parent's database connections
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(
+            processes,
+            initializer=_init_worker,
+            initargs=(model.name, model_spec, data_spec, k),
+        ) as pool:
+            yield from pool.imap_unordered(_score_range, bounds)
+    finally:
+        for shm in model_blocks + data_blocks:
+            shm.close()
+            shm.unlink()
+
+
+def score_all_users(model, interactions, *, k=20, processes=None, block_size=256,
+                    write=True, write_batch_size=2000):
+    """
+    Score all users and (optionally) replace their Recommendation rows.
+
+    Each block of users is swapped in its own short transaction (delete that
+    block's rows, insert the new ones), so the write lock is only held for
+    one block at a time and imports / syncs interleave with a long run. A
+    user's list is never seen half-written.
+
+    Returns counters including users/sec throughput.
+    """
+    from django.db import transaction
+    from django.utils import timezone
+
+    from ..models import Recommendation
+
+    started = time.perf_counter()
+    generated_at = timezone.now()
+    users_scored = 0
+    rows_written = 0
+
+    for start, top, scores in iter_scored_blocks(
+        model, interactions, k=k, processes=processes, block_size=block_size,
+    ):
+        users_scored += len(top)
+        if not write:
+            continue
+        user_ids = interactions.user_ids[start:start + len(top)].tolist()
+        movie_ids = interactions.movie_ids[top].tolist()
+        rows = [
+            Recommendation(
+                user_id=user_id,
+                movie_id=movie_id,
+                score=score,
+                rank=rank,
+                model_name=model.name,
+                generated_at=generated_at,
+            )
+            for user_id, movies, user_scores in zip(user_ids, movie_ids, scores.tolist())
+            for rank, (movie_id, score) in enumerate(zip(movies, user_scores), start=1)
+            if score != float("-inf")
+        ]
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=user_ids).delete()
+            Recommendation.objects.bulk_create(rows, batch_size=write_batch_size)
+        rows_written += len(rows)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "users_scored": users_scored,
+        "rows_written": rows_written,
+        "seconds": elapsed,
+        "users_per_sec": users_scored / elapsed if elapsed else 0.0,
+    }
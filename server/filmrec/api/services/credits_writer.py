@@ -0,0 +1,99 @@
+from django.conf import settings
+
+from ..models import Actor, Director, Genre, MovieActor, MovieDirector, MovieGenre
+
+MAX_CAST = 20          # billed cast members stored per film
+
+
+def image_url(path):
+    return f"{settings.TMDB_IMAGE_BASE_URL.rstrip('/')}/{path.lstrip('/')}" if path else None
+
+
+def _resolve(model, key_field, rows):
+    """
+    {key: field values} -> {key: pk}.
+
+    One query for existing rows, one bulk insert for the missing ones and one
+    query to read back their ids (ignore_conflicts rows don't return pks).
+    """
+    if not rows:
+        return {}
+    ids = dict(model.objects.filter(**{f"{key_field}__in": list(rows)}).values_list(key_field, "id"))
+    missing = [key for key in rows if key not in ids]
+    if missing:
+        model.objects.bulk_create(
+            [model(**{key_field: key}, **rows[key]) for key in missing],
+            ignore_conflicts=True,
+        )
+        ids.update(model.objects.filter(**{f"{key_field}__in": missing}).values_list(key_field, "id"))
+    return ids
+
+
+def write_credits_bulk(results):
+    """
+    Store genres, directors and billed cast for a batch of (movie, TMDb details)
+    pairs in a fixed number of queries, whatever the batch or cast size.
+
+    People are deduped by TMDb id (genres by name) within the batch and
+    resolved with one query per entity type; link rows are inserted with
+    ignore_conflicts against the uniq_movie_* constraints.
+    """
+    genres, directors, actors = {}, {}, {}
+    genre_links, director_links, actor_links = set(), set(), {}
+
+    for movie, details in results:
+        credits = details.get("credits") or {}
+
+        for g in details.get("genres") or []:
+            name = (g.get("name") or "")[:100]
+            if name:
+                genres[name] = {}
+                genre_links.add((movie.pk, name))
+
+        for person in credits.get("crew") or []:
+            if person.get("job") != "Director" or not person.get("id"):
+                continue
+            directors.setdefault(person["id"], {
+                "name": (person.get("name") or "")[:255],
+                "profile_url": image_url(person.get("profile_path")),
+            })
+            director_links.add((movie.pk, person["id"]))
+
+        for person in (credits.get("cast") or [])[:MAX_CAST]:
+            if not person.get("id"):
+                continue
+            actors.setdefault(person["id"], {
+                "name": (person.get("name") or "")[:255],
+                "profile_url": image_url(person.get("profile_path")),
+            })
+            # first billing wins if TMDb lists someone twice
+            actor_links.setdefault((movie.pk, person["id"]), (
+                (person.get("character") or "")[:255] or None,
+                person.get("order"),
+            ))
+
+    genre_ids = _resolve(Genre, "name", genres)
+    director_ids = _resolve(Director, "tmdb_id", directors)
+    actor_ids = _resolve(Actor, "tmdb_id", actors)
+
+    MovieGenre.objects.bulk_create(
+        [MovieGenre(movie_id=m, genre_id=genre_ids[name]) for m, name in genre_links],
+        ignore_conflicts=True,
+    )
+    MovieDirector.objects.bulk_create(
+        [MovieDirector(movie_id=m, director_id=director_ids[p]) for m, p in director_links],
+        ignore_conflicts=True,
+    )
+    MovieActor.objects.bulk_create(
+        [
+            MovieActor(movie_id=m, actor_id=actor_ids[p], character_name=character, casting_order=order)
+            for (m, p), (character, order) in actor_links.items()
+        ],
+        ignore_conflicts=True,
+    )
+    return {
+        "genres": len(genres),
+        "directors": len(directors),
+        "actors": len(actors),
+        "links": len(genre_links) + len(director_links) + len(actor_links),
+    }
@@ -0,0 +1,196 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from ..models import Director, GlobalStats, MovieUser, User, UserStatsSummary
+from ..utils.dates import getDecadeLabel, week_window_sunday_anchor
+
+EVERYONE = "all"
+TOP_LIMIT = 10
+
+# Web processes re-read the summary rows at most this often.
+CACHE_SECONDS = 300
+
+USER_FIELDS = ["last_7_days", "last_30_days", "all_time", "computed_at"]
+
+
+def _cache_key(cohort):
+    return f"global-stats:{cohort}"
+
+
+def _user_key(user_id):
+    return f"global-stats:user:{user_id}"
+
+
+def join_cohort(date_joined):
+    # the job and the views must agree on this, so it's only ever computed here
+    return str(timezone.localtime(date_joined).year)
+
+
+def cohort_of(user):
+    return join_cohort(user.date_joined)
+
+
+# ---------- percentiles ----------
+def quantiles(counts):
+    """
+    101 values: the 0th..100th percentile of `counts` (nearest rank).
+    """
+    values = sorted(counts)
+    if not values:
+        return []
+    last = len(values) - 1
+    return [values[round(p / 100 * last)] for p in range(101)]
+
+
+def percentile_rank(points, value):
+    """
+    Share of users (0-100) below `value`, counting ties as half, read off
+    the stored quantiles.
+    """
+    if not points:
+        return None
+    below, at_or_below = bisect_left(points, value), bisect_right(points, value)
+    return round(100 * (below + at_or_below) / 2 / len(points))
+
+
+def _shares(counter, total):
+    return {name: round(n / total, 4) for name, n in counter.most_common()} if total else {}
+
+
+# ---------- job ----------
+def compute_global_stats(now=None):
+    """
+    Aggregate every user's watched MovieUser rows into one GlobalStats row
+    per cohort (everyone, and each join year), plus a UserStatsSummary row per
+    user with the counts that went into them. Every aggregate is a GROUP BY
+    in the database; Python only holds one count per user.
+    Returns counters.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    _, _, week_start, week_end = week_window_sunday_anchor(now)
+    watched = MovieUser.objects.filter(watch_status="Watched")
+
+    cohorts = {uid: join_cohort(joined) for uid, joined in User.objects.values_list("id", "date_joined").iterator()}
+
+    def per_user(qs):
+        return dict(qs.values("user_id").annotate(n=Count("id")).values_list("user_id", "n").iterator())
+
+    all_time = per_user(watched)
+    last_week = per_user(watched.filter(watched_date__gt=today - timedelta(days=7), watched_date__lte=today))
+    last_month = per_user(watched.filter(watched_date__gt=today - timedelta(days=30), watched_date__lte=today))
+
+    # users with nothing watched in a window still count, as zeros
+    members = defaultdict(list)
+    for uid in all_time:
+        members[EVERYONE].append(uid)
+        members[cohorts[uid]].append(uid)
+
+    genres, decades = defaultdict(Counter), defaultdict(Counter)
+    genre_rows = (watched.filter(movie__moviegenre__isnull=False)
+                  .values("user_id", "movie__moviegenre__genre__name").annotate(n=Count("id")))
+    for row in genre_rows.iterator():
+        for cohort in (EVERYONE, cohorts[row["user_id"]]):
+            genres[cohort][row["movie__moviegenre__genre__name"]] += row["n"]
+    decade_rows = (watched.filter(movie__release_date__isnull=False)
+                   .values("user_id", "movie__release_date__year").annotate(n=Count("id")))
+    for row in decade_rows.iterator():
+        for cohort in (EVERYONE, cohorts[row["user_id"]]):
+            decades[cohort][getDecadeLabel(row["movie__release_date__year"])] += row["n"]
+
+    this_week = watched.filter(watched_date__gte=week_start.date(), watched_date__lt=week_end.date())
+    top_films = [
+        {"id": row["movie_id"], "name": row["movie__title"], "count": row["count"]}
+        for row in this_week.values("movie_id", "movie__title").annotate(count=Count("id"))
+        .order_by("-count", "movie__title")[:TOP_LIMIT]
+    ]
+    top_directors = list(
+        Director.objects.filter(moviedirector__movie__movieuser__in=this_week)
+        .annotate(count=Count("moviedirector__movie__movieuser", distinct=True))
+        .order_by("-count", "name").values("id", "name", "count")[:TOP_LIMIT]
+    )
+
+    rows = []
+    for cohort, uids in members.items():
+        watched_rows = sum(all_time[uid] for uid in uids)
+        rows.append(GlobalStats(
+            cohort=cohort,
+            users=len(uids),
+            week_percentiles=quantiles(last_week.get(uid, 0) for uid in uids),
+            month_percentiles=quantiles(last_month.get(uid, 0) for uid in uids),
+            all_time_percentiles=quantiles(all_time[uid] for uid in uids),
+            genre_shares=_shares(genres[cohort], watched_rows),
+            decade_shares=_shares(decades[cohort], sum(decades[cohort].values())),
+            week_start=week_start.date(),
+            # site-wide lists only: per-cohort top lists would be too thin to mean much
+            top_films=top_films if cohort == EVERYONE else [],
+            top_directors=top_directors if cohort == EVERYONE else [],
+            computed_at=now,
+        ))
+
+    summaries = [
+        UserStatsSummary(user_id=uid, last_7_days=last_week.get(uid, 0), last_30_days=last_month.get(uid, 0),
+                         all_time=n, computed_at=now)
+        for uid, n in all_time.items()
+    ]
+
+    with transaction.atomic():
+        GlobalStats.objects.all().delete()
+        GlobalStats.objects.bulk_create(rows)
+        UserStatsSummary.objects.all().delete()
+        UserStatsSummary.objects.bulk_create(summaries, batch_size=2000)
+    # only reaches web processes that share this cache (CACHE_BACKEND); see global_stats_for
+    cache.delete_many([_cache_key(row.cohort) for row in rows])
+
+    return {"users": len(all_time), "cohorts": len(rows) - 1 if rows else 0,
+            "watchedRows": sum(all_time.values())}
+
+
+# ---------- reads ----------
+def _load(cohort):
+    row = GlobalStats.objects.filter(cohort=cohort).values().first()
+    # cache misses are remembered too, so a site without the job doesn't query every request
+    return row or {}
+
+
+def _load_user(user_id, default_at):
+    row = UserStatsSummary.objects.filter(user_id=user_id).values(*USER_FIELDS).first()
+    # no row: nothing watched when the job ran
+    return row or {"last_7_days": 0, "last_30_days": 0, "all_time": 0, "computed_at": default_at}
+
+
+def global_stats_for(user):
+    """
+    (everyone, cohort, you) for the stats views: the summary rows and the
+    user's own counts from the same job run, as dicts. All three are None
+    until the job has run; cohort is None if it has no row.
+
+    Everything is served from the cache, so after the first request this
+    costs no queries. The job clears the cohort entries, but that only reaches
+    web processes sharing its cache; with the default per-process cache they
+    pick up a new run within CACHE_SECONDS. A user's counts are checked
+    against the run they're compared with, so the two never come from
+    different runs.
+    """
+    everyone = cache.get_or_set(_cache_key(EVERYONE), lambda: _load(EVERYONE), CACHE_SECONDS)
+    if not everyone:
+        return None, None, None
+    you = cache.get_or_set(_user_key(user.pk), lambda: _load_user(user.pk, everyone["computed_at"]), CACHE_SECONDS)
+
+    cohort = cohort_of(user)
+    if you["computed_at"] != everyone["computed_at"]:
+        # one of the two cached entries predates the latest run: re-read both from it
+        everyone = _load(EVERYONE)
+        if not everyone:
+            return None, None, None
+        you = _load_user(user.pk, everyone["computed_at"])
+        cache.set_many({_cache_key(EVERYONE): everyone, _user_key(user.pk): you}, CACHE_SECONDS)
+        cache.delete(_cache_key(cohort))
+    mine = cache.get_or_set(_cache_key(cohort), lambda: _load(cohort), CACHE_SECONDS)
+    return everyone, mine or None, you
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+import zlib
+
+from ..models import MovieUser
+
+# Rows pulled from the database per round trip, and CSV/JSON rows per yielded chunk.
+FETCH_CHUNK_SIZE = 2000
+ROWS_PER_CHUNK = 500
+
+ROW_FIELDS = [
+    "movie__title", "movie__release_date", "movie__letterboxd_uri", "watch_status", "watched_date",
+    "rating", "review", "liked", "in_watchlist", "rewatch",
+]
+
+# Letterboxd export layouts, matching what run_letterboxd_import reads back
+# (reviews -> reviews_file, watchlist -> watchlist_file, likes -> films_file).
+CSV_HEADERS = {
+    "reviews": ["Date", "Name", "Year", "Letterboxd URI", "Rating", "Rewatch", "Review", "Tags", "Watched Date"],
+    "watchlist": ["Date", "Name", "Year", "Letterboxd URI"],
+    "likes": ["Date", "Name", "Year", "Letterboxd URI"],
+}
+KIND_FILTERS = {
+    "reviews": {"watch_status": "Watched"},
+    "watchlist": {"in_watchlist": True},
+    "likes": {"liked": True},
+    "all": {},
+}
+
+
+def export_rows(user, kind):
+    """
+    Streams the user's MovieUser rows (joined to Movie) as dicts, FETCH_CHUNK_SIZE at a time.
+    """
+    qs = (
+        MovieUser.objects.filter(user=user, **KIND_FILTERS[kind])
+        .order_by("watched_date", "id")
+        .values(*ROW_FIELDS)
+    )
+    return qs.iterator(chunk_size=FETCH_CHUNK_SIZE)
+
+
+def _csv_row(kind, r):
+    release, watched = r["movie__release_date"], r["watched_date"]
+    common = [
+        watched.isoformat() if watched else "",
+        r["movie__title"],
+        release.year if release else "",
+        r["movie__letterboxd_uri"],
+    ]
+    if kind != "reviews":
+        return common
+    rating = r["rating"]
+    return common + [
+        f"{rating:g}" if rating is not None else "",
+        "Yes" if r["rewatch"] else "",
+        r["review"] or "",
+        "",
+        watched.isoformat() if watched else "",
+    ]
+
+
+def iter_csv(user, kind):
+    """
+    Letterboxd-compatible CSV for one kind (reviews / watchlist / likes), yielded in text chunks.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_HEADERS[kind])
+    rows = 0
+    for r in export_rows(user, kind):
+        writer.writerow(_csv_row(kind, r))
+        rows += 1
+        if rows % ROWS_PER_CHUNK == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _json_row(r):
+    release, watched = r["movie__release_date"], r["watched_date"]
+    return {
+        "title": r["movie__title"],
+        "year": release.year if release else None,
+        "letterboxdUri": r["movie__letterboxd_uri"],
+        "watchStatus": r["watch_status"],
+        "watchedDate": watched.isoformat() if watched else None,
+        "rating": r["rating"],
+        "review": r["review"],
+        "liked": r["liked"],
+        "inWatchlist": r["in_watchlist"],
+        "rewatch": r["rewatch"],
+    }
+
+
+def iter_json(user, kind):
+    """
+    JSON array of history entries, yielded in text chunks without building the list.
+    """
+    parts = ["["]
+    first = True
+    for r in export_rows(user, kind):
+        parts.append(("" if first else ",") + json.dumps(_json_row(r), ensure_ascii=False))
+        first = False
+        if len(parts) >= ROWS_PER_CHUNK:
+            yield "".join(parts)
+            parts = []
+    parts.append("]")
+    yield "".join(parts)
+
+
+def gzip_stream(chunks):
+    """
+    Compress a stream of text chunks into a gzip stream as it goes (wbits=31 -> gzip container).
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
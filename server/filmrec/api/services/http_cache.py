@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that identify the caller, not the resource.
+IGNORED_PARAMS = {"api_key"}
+
+# Check the size cap every N stores rather than on every write.
+EVICTION_CHECK_EVERY = 100
+
+
+def normalize_url(url):
+    """
+    Cache key for a request URL: lower-cased scheme/host, default port dropped,
+    query parameters sorted and credentials removed.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+    return urlunsplit((scheme, host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+class CachedResponse:
+    def __init__(self, status, body, etag, last_modified, expires_at):
+        self.status = status
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return self.expires_at > time.time()
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    SQLite-backed HTTP response cache with per-endpoint TTLs and LRU eviction.
+
+    Entries past their TTL are kept (not deleted) so the client can revalidate
+    them with If-None-Match / If-Modified-Since; a 304 just extends the expiry.
+    Each thread gets its own connection; the file is in WAL mode.
+    """
+
+    def __init__(self, path, *, ttls=None, default_ttl=86400, max_entries=50000):
+        self.path = str(path)
+        # longest prefix first so "/movie/popular" can override "/movie/"
+        self.ttls = sorted((ttls or {}).items(), key=lambda kv: -len(kv[0]))
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stores_since_check = 0
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, status INTEGER NOT NULL, body BLOB,"
+            " etag TEXT, last_modified TEXT, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def ttl_for(self, endpoint):
+        for prefix, ttl in self.ttls:
+            if endpoint.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key):
+        """
+        Returns a CachedResponse (fresh or stale) or None. Fresh entries count as
+        hits; stale ones are returned for revalidation.
+        """
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT status, body, etag, last_modified, expires_at FROM responses WHERE key = ?", (key,),
+        ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        self._conn().execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        entry = CachedResponse(*row)
+        self._count("hits" if entry.fresh else "stale")
+        return entry
+
+    def store(self, key, endpoint, status, body, etag=None, last_modified=None):
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO responses (key, status, body, etag, last_modified, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, status, body, etag, last_modified, now + self.ttl_for(endpoint), now),
+        )
+        self._count("stores")
+        with self._lock:
+            self._stores_since_check += 1
+            check = self._stores_since_check >= max(1, min(EVICTION_CHECK_EVERY, self.max_entries // 10))
+            if check:
+                self._stores_since_check = 0
+        if check:
+            self.evict()
+
+    def revalidated(self, key, endpoint):
+        # origin answered 304: the stored body is good for another TTL
+        now = time.time()
+        self._conn().execute(
+            "UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?",
+            (now + self.ttl_for(endpoint), now, key),
+        )
+        self._count("revalidated")
+
+    def evict(self):
+        conn = self._conn()
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        conn.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+            (excess,),
+        )
+        with self._lock:
+            self.counters["evictions"] += excess
+        return excess
+
+    def clear(self):
+        self._conn().execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats["hits"] + stats["misses"] + stats["stale"]
+        # revalidated entries were served without downloading the body
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / lookups if lookups else 0.0
+        return stats
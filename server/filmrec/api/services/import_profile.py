@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Optional / heavy dependencies that must only load on the code paths that use them.
+HEAVY_MODULES = ("numpy", "feedparser", "httpx", "PIL")
+
+# What a worker imports before serving its first request: the WSGI app and the URLconf
+# (Django resolves ROOT_URLCONF lazily, but every worker pays for it on request one).
+BOOT_MODULES = ("filmrec.wsgi",)
+
+_PROBE = """
+import importlib, json, os, sys, time
+start = time.perf_counter()
+for name in json.loads(sys.argv[1]):
+    importlib.import_module(name)
+from django.conf import settings
+importlib.import_module(settings.ROOT_URLCONF)
+print(json.dumps({"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}))
+"""
+
+
+def _parse_importtime(stderr):
+    """
+    Rows of `python -X importtime` output as dicts: self / cumulative
+    microseconds, nesting depth and module name, in import order.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self": int(own),
+            "cumulative": int(cumulative),
+        })
+    return rows
+
+
+def measure_boot(modules=BOOT_MODULES):
+    """
+    Import `modules` plus the URLconf in a fresh interpreter under
+    -X importtime. Returns {"seconds", "modules", "imports"}: wall-clock time
+    to boot, every module loaded, and the per-module import times.
+    """
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "filmrec.settings")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE, json.dumps(list(modules))],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"import probe failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["imports"] = _parse_importtime(proc.stderr)
+    return result
+
+
+def best_of(runs, modules=BOOT_MODULES):
+    # the fastest run is the least disturbed by whatever else the machine is doing
+    return min((measure_boot(modules) for _ in range(max(runs, 1))), key=lambda r: r["seconds"])
+
+
+def heavy_modules_loaded(result):
+    loaded = set(result["modules"])
+    return [name for name in HEAVY_MODULES if name in loaded]
@@ -1,13 +1,20 @@
+import asyncio
 import csv
+import hashlib
 import io
 import re
+import time
 from datetime import date, datetime
+from urllib.error import URLError
+from urllib.request import Request, urlopen
 
 from django.db import transaction
 
 from ..models import Movie, MovieUser
 from ..utils.letterboxd import normalize_letterboxd_uri
 from ..utils.dates import parse_iso_date
+from ..utils.titles import parse_year
+from .search_index import sync_movieusers
 
 
 def run_letterboxd_import(*, user, reviews_file=None, watchlist_file=None, films_file=None):
@@ -20,6 +27,10 @@ def run_letterboxd_import(*, user, reviews_file=None, watchlist_file=None, films
     movies_matched = 0
     rel_created = 0
     rel_updated = 0
+    movies_fuzzy_matched = 0
+    movies_unresolved = 0
+    touched_ids = set()     # MovieUser ids to re-index for search
+    unresolved = []         # (row handler, row) for rows without a usable URI
 
     def iter_csv(file_obj):
         text = io.TextIOWrapper(file_obj.file, encoding="utf-8-sig")
@@ -69,6 +80,7 @@ def run_letterboxd_import(*, user, reviews_file=None, watchlist_file=None, films
         mu, created = MovieUser.objects.get_or_create(user=user, movie=movie)
         if created:
             rel_created += 1
+        touched_ids.add(mu.pk)
         return mu
 
     def apply_update(mu: MovieUser, updates: dict):
@@ -82,54 +94,43 @@ def run_letterboxd_import(*, user, reviews_file=None, watchlist_file=None, films
             mu.save()
             rel_updated += 1
 
-    # ---------- per-csv handlers ----------
-    def import_reviews_csv(file_obj):
-        for row in iter_csv(file_obj):
-            name = row.get("Name")
-            year = row.get("Year")
-            uri = row.get("Letterboxd URI")
-
-            movie = upsert_movie(name, year, uri)
-            if not movie:
-                continue
+    # ---------- per-row handlers ----------
+    def handle_review_row(movie, row):
+        mu = get_or_create_mu(movie)
 
-            mu = get_or_create_mu(movie)
+        watched_date = parse_iso_date(row.get("Watched Date"))
+        rating = parse_float(row.get("Rating"))
+        review_text = (row.get("Review") or "").strip()
 
-            watched_date = parse_iso_date(row.get("Watched Date"))
-            rating = parse_float(row.get("Rating"))
-            review_text = (row.get("Review") or "").strip()
+        updates = {"watch_status": "Watched"}
+        if watched_date:
+            updates["watched_date"] = watched_date
+        if rating is not None:
+            updates["rating"] = rating
+        if review_text:
+            updates["review"] = review_text
+        # "Yes" or blank, as in Letterboxd's exports and ours (services/history_export)
+        if (row.get("Rewatch") or "").strip().lower() == "yes":
+            updates["rewatch"] = True
 
-            updates = {"watch_status": "Watched"}
-            if watched_date:
-                updates["watched_date"] = watched_date
-            if rating is not None:
-                updates["rating"] = rating
-            if review_text:
-                updates["review"] = review_text
+        apply_update(mu, updates)
 
-            apply_update(mu, updates)
+    def handle_watchlist_row(movie, row):
+        mu = get_or_create_mu(movie)
 
-    def import_watchlist_csv(file_obj):
-        for row in iter_csv(file_obj):
-            name = row.get("Name")
-            year = row.get("Year")
-            uri = row.get("Letterboxd URI")
-
-            movie = upsert_movie(name, year, uri)
-            if not movie:
-                continue
+        updates = {"in_watchlist": True}
 
-            mu = get_or_create_mu(movie)
+        # Don't clobber watched entries
+        if not mu.watched_date and mu.watch_status != "Watched":
+            updates["watch_status"] = "Want to Watch"
 
-            updates = {"in_watchlist": True}
+        apply_update(mu, updates)
 
-            # Don't clobber watched entries
-            if not mu.watched_date and mu.watch_status != "Watched":
-                updates["watch_status"] = "Want to Watch"
+    def handle_like_row(movie, row):
+        mu = get_or_create_mu(movie)
+        apply_update(mu, {"liked": True})
 
-            apply_update(mu, updates)
-
-    def import_films_likes_csv(file_obj):
+    def import_csv(file_obj, handle_row):
         for row in iter_csv(file_obj):
             name = row.get("Name")
             year = row.get("Year")
@@ -137,28 +138,53 @@ def run_letterboxd_import(*, user, reviews_file=None, watchlist_file=None, films
 
             movie = upsert_movie(name, year, uri)
             if not movie:
+                # no usable URI: try the fuzzy title matcher once all files are read
+                if (name or "").strip():
+                    unresolved.append((handle_row, row))
                 continue
 
-            mu = get_or_create_mu(movie)
-            apply_update(mu, {"liked": True})
+            handle_row(movie, row)
+
+    def resolve_unresolved():
+        nonlocal movies_fuzzy_matched, movies_unresolved
+        if not unresolved:
+            return
+        # numpy-backed; only loaded once a title actually needs fuzzy matching
+        from .title_matcher import match_titles
+        matches = match_titles([(row.get("Name"), row.get("Year")) for _, row in unresolved])
+        movies = Movie.objects.in_bulk([m for m in matches if m is not None])
+        for (handle_row, row), movie_id in zip(unresolved, matches):
+            if movie_id is None:
+                movies_unresolved += 1
+                continue
+            movies_fuzzy_matched += 1
+            handle_row(movies[movie_id], row)
 
     # ---------- run import ----------
     with transaction.atomic():
         if reviews_file:
-            import_reviews_csv(reviews_file)
+            import_csv(reviews_file, handle_review_row)
         if watchlist_file:
-            import_watchlist_csv(watchlist_file)
+            import_csv(watchlist_file, handle_watchlist_row)
         if films_file:
-            import_films_likes_csv(films_file)
+            import_csv(films_file, handle_like_row)
+        resolve_unresolved()
+        sync_movieusers(touched_ids)
 
     return {
         "movies_created": movies_created,
         "movies_matched": movies_matched,
         "relationships_created": rel_created,
         "relationships_updated": rel_updated,
+        "movies_fuzzy_matched": movies_fuzzy_matched,
+        "movies_unresolved": movies_unresolved,
     }
 
 # RSS Helper Function
+class FeedUnavailable(Exception):
+    pass
+
+
 def _build_letterboxd_rss_url(raw: str) -> str:
     s = (raw or "").strip()
     if not s:
@@ -169,14 +195,14 @@ def _build_letterboxd_rss_url(raw: str) -> str:
         s = "https://" + s
     
     # Full URL with scheme
-    if s.startsqwith("http://") or s.startswith("https://"):
+    if s.startswith("http://") or s.startswith("https://"):
         # if it's already an rss URL, keep it
-        if s.rstrip("/").endswith("/rss/"):
+        if s.rstrip("/").endswith("/rss"):
             return s.rstrip("/") + "/"
         # if it's a profile URL like httsp://letterboxd.com/<user>/
         m = re.match(r"^https?://letterboxd\.com/([^/]+)/?$", s.rstrip("/"))
         if m:
-            username = m.group(2)
+            username = m.group(1)
             return f"https://letterboxd.com/{username}/rss/"
         # unnknown URL Format
         return ""
@@ -187,6 +213,66 @@ def _build_letterboxd_rss_url(raw: str) -> str:
         return ""
     return f"https://letterboxd.com/{username}/rss/"
 
+
+# Feed downloads for both RSS endpoints. RSS_FETCH_TIMEOUT bounds the whole
+# download (not each socket read) and a feed over MAX_FEED_BYTES is rejected;
+# the bytes then go to feedparser, which never touches the network itself.
+RSS_FETCH_TIMEOUT = 15          # seconds
+MAX_FEED_BYTES = 5 * 1024 * 1024
+FEED_HEADERS = {"Accept": "application/rss+xml"}
+
+
+def _check_feed_size(body):
+    if len(body) > MAX_FEED_BYTES:
+        raise FeedUnavailable(f"feed larger than {MAX_FEED_BYTES} bytes")
+
+
+def _timed_out():
+    return FeedUnavailable(f"no complete response within {RSS_FETCH_TIMEOUT}s")
+
+
+def fetch_feed(url):
+    """
+    Download a feed (blocking). Raises FeedUnavailable on any failure.
+    """
+    deadline = time.monotonic() + RSS_FETCH_TIMEOUT
+    body = bytearray()
+    try:
+        with urlopen(Request(url, headers=FEED_HEADERS), timeout=RSS_FETCH_TIMEOUT) as resp:
+            for chunk in iter(lambda: resp.read(64 * 1024), b""):
+                body += chunk
+                _check_feed_size(body)
+                if time.monotonic() > deadline:
+                    raise _timed_out()
+    except (URLError, TimeoutError, ValueError) as exc:
+        raise FeedUnavailable(str(exc)) from exc
+    return bytes(body)
+
+
+async def afetch_feed(url):
+    """
+    fetch_feed() on httpx's async client, so a slow feed doesn't hold a thread.
+    """
+    import httpx
+
+    async def download():
+        async with httpx.AsyncClient(timeout=RSS_FETCH_TIMEOUT, follow_redirects=True) as client:
+            async with client.stream("GET", url, headers=FEED_HEADERS) as resp:
+                resp.raise_for_status()
+                body = bytearray()
+                async for chunk in resp.aiter_bytes():
+                    body += chunk
+                    _check_feed_size(body)
+                return bytes(body)
+
+    try:
+        return await asyncio.wait_for(download(), RSS_FETCH_TIMEOUT)
+    except asyncio.TimeoutError as exc:
+        raise _timed_out() from exc
+    except httpx.HTTPError as exc:
+        raise FeedUnavailable(str(exc)) from exc
+
+
 def _parse_published_date(entry) -> datetime | None:
     # feedparser gives published_parsed as a time.struct_time sometimes
     tp = getattr(entry, "published_parsed", None)
@@ -204,4 +290,142 @@ def _parse_published_date(entry) -> datetime | None:
             return datetime.fromisoformat(pub)
         except Exception:
             return None
-        
\ No newline at end of file
+
+
+def _rss_film_title_year(entry):
+    title = (getattr(entry, "letterboxd_filmtitle", "") or "").strip()
+    year = getattr(entry, "letterboxd_filmyear", None)
+    if not title:
+        # entry titles look like "Film Title, 2019 - ★★★½"
+        raw = (getattr(entry, "title", "") or "").strip()
+        m = re.match(r"^(.*?), (\d{4})(?: - .*)?$", raw)
+        title, year = (m.group(1), m.group(2)) if m else (raw, None)
+    return title, parse_year(year)
+
+
+def resolve_rss_movies(entries):
+    """
+    Movie for each RSS entry: matched by canonical film URI, then by the raw
+    permalink older syncs stored; created if both miss. Only entries whose link
+    has no film slug are matched fuzzily by title + year: a film URI that isn't
+    in the table is a film we don't have yet, not a typo of one we do.
+
+    Returns [(movie, created)] aligned with entries, (None, False) for entries without a link.
+    """
+    links = [(getattr(e, "link", "") or "").strip() for e in entries]
+    canonical = [normalize_letterboxd_uri(link) if link else None for link in links]
+    titles = [_rss_film_title_year(e) for e in entries]
+
+    keys = {k for k in canonical + links if k}
+    by_uri = {m.letterboxd_uri: m for m in Movie.objects.filter(letterboxd_uri__in=keys)}
+
+    resolved = [None] * len(entries)
+    for i, link in enumerate(links):
+        if link:
+            resolved[i] = by_uri.get(canonical[i]) or by_uri.get(link)
+
+    # one fuzzy pass for every slug-less entry that missed
+    misses = [i for i, movie in enumerate(resolved) if links[i] and not canonical[i] and movie is None]
+    if misses:
+        from .title_matcher import match_titles
+        matches = match_titles([titles[i] for i in misses])
+        found = Movie.objects.in_bulk([m for m in matches if m is not None])
+        for i, movie_id in zip(misses, matches):
+            if movie_id is not None:
+                resolved[i] = found[movie_id]
+
+    out = []
+    for i, link in enumerate(links):
+        if not link:
+            out.append((None, False))
+        elif resolved[i]:
+            out.append((resolved[i], False))
+        else:
+            key = canonical[i] or link
+            movie = by_uri.get(key)
+            created = movie is None
+            if created:
+                title, year = titles[i]
+                movie = Movie.objects.create(
+                    title=title[:255] or "Unknown",
+                    release_date=date(year, 1, 1) if year else None,
+                    letterboxd_uri=key,
+                )
+                by_uri[key] = movie
+            out.append((movie, created))
+    return out
+
+
+def sync_rss_entries(user, entries):
+    """
+    Mark every film in a parsed Letterboxd RSS feed as watched by `user`,
+    dated by the entry's publish date. Returns counters.
+    """
+    synced, created_movies, created_links, updated_links = 0, 0, 0, 0
+    touched_ids = []
+    # Typical entries ~20; entry links are review permalinks, resolved to films in one batch
+    for entry, (movie, movie_created) in zip(entries, resolve_rss_movies(entries)):
+        if movie is None:
+            continue
+        if movie_created:
+            created_movies += 1
+
+        # Create or update relationship for this user and movie
+        mu, created = MovieUser.objects.get_or_create(
+            user=user,
+            movie=movie,
+        )
+        if created:
+            created_links += 1
+        touched_ids.append(mu.pk)
+
+        # Mark watched + set watched_date from RSS publish date if present
+        pub_dt = _parse_published_date(entry)
+        watched_date = pub_dt.date() if pub_dt else None
+
+        changed = False
+        if mu.watch_status != "Watched":
+            mu.watch_status = "Watched"
+            changed = True
+
+        if watched_date and mu.watched_date != watched_date:
+            mu.watched_date = watched_date
+            changed = True
+
+        if changed:
+            mu.save()
+            if not created:
+                updated_links += 1
+
+        synced += 1
+
+    sync_movieusers(touched_ids)
+    return {
+        "entries_processed": synced,
+        "movies_created": created_movies,
+        "movieuser_created": created_links,
+        "movieuser_updated": updated_links,
+    }
+
+
+# Single-flight keys (see services/single_flight): identical concurrent
+# syncs / imports by one user share a single run.
+def rss_sync_key(user, rss_url):
+    # per feed: LETTERBOXD_SYNC_MIN_INTERVAL never answers one feed with another's result
+    feed = rss_url.strip().lower()
+    return f"rss-sync:{user.pk}:{hashlib.sha256(feed.encode('utf-8')).hexdigest()}"
+
+
+def import_key(user, *, reviews_file=None, watchlist_file=None, films_file=None):
+    """
+    Keyed by the uploaded bytes, so re-posting the same export is recognised.
+    """
+    digest = hashlib.sha256()
+    for slot, file_obj in (("reviews", reviews_file), ("watchlist", watchlist_file), ("films", films_file)):
+        digest.update(slot.encode("utf-8") + b"\0")
+        if file_obj:
+            for chunk in file_obj.chunks():
+                digest.update(chunk)
+            file_obj.seek(0)
+        digest.update(b"\0")
+    return f"letterboxd-import:{user.pk}:{digest.hexdigest()}"
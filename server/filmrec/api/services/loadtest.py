@@ -0,0 +1,489 @@
+import heapq
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from xml.sax.saxutils import escape
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction
+from django.test import Client, override_settings
+
+from ..models import Actor, Director, Genre, Movie, MovieActor, MovieDirector, MovieGenre, MovieUser, User
+from .search_index import rebuild_search_index
+
+# Everything the seeder creates is tagged with this prefix so --flush can remove it again.
+PREFIX = "loadtest-"
+PASSWORD = "loadtest-password"
+FILM_URI_PREFIX = "https://letterboxd.com/film/" + PREFIX
+FILM_URI = FILM_URI_PREFIX + "{}/"
+
+GENRES = [
+    "Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama", "Family", "Fantasy",
+    "History", "Horror", "Music", "Mystery", "Romance", "Science Fiction", "TV Movie", "Thriller", "War", "Western",
+]
+# Letterboxd half-star ratings, weighted the way real rating histograms lean (mostly 3-4 stars)
+RATINGS = [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0]
+RATING_WEIGHTS = [1, 2, 2, 5, 7, 14, 18, 22, 14, 15]
+CAST_SIZE = 8
+
+
+def _zipf_weights(n, s=0.9):
+    # popularity of the i-th most popular film / person
+    return [1.0 / (rank + 1) ** s for rank in range(n)]
+
+
+def _weighted_sample(rng, weights, k):
+    # weighted sampling without replacement (Efraimidis-Spirakis): top-k of u ** (1 / w)
+    return heapq.nlargest(k, range(len(weights)), key=lambda i: rng.random() ** (1.0 / weights[i]))
+
+
+# ---------- seeding ----------
+def clear_dataset():
+    """
+    Delete every user, film and person the seeder created (links cascade).
+    """
+    def delete(qs):
+        # delete() counts cascaded rows too; report just this model's
+        return qs.delete()[1].get(qs.model._meta.label, 0)
+
+    with transaction.atomic():
+        counts = {
+            "users": delete(User.objects.filter(username__startswith=PREFIX)),
+            "movies": delete(Movie.objects.filter(letterboxd_uri__startswith=FILM_URI_PREFIX)),
+            "directors": delete(Director.objects.filter(name__startswith="Loadtest ")),
+            "actors": delete(Actor.objects.filter(name__startswith="Loadtest ")),
+        }
+    rebuild_search_index()
+    return counts
+
+
+def seed_dataset(*, users, movies, seed=0, median_history=250):
+    """
+    Seed `users` accounts over a catalog of `movies` enriched films.
+
+    Film popularity is Zipf-distributed, history sizes are log-normal around
+    `median_history`, and watch dates skew recent so the weekly stats have data.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+
+    with transaction.atomic():
+        Genre.objects.bulk_create([Genre(name=name) for name in GENRES], ignore_conflicts=True)
+        genres = list(Genre.objects.filter(name__in=GENRES))
+
+        films = Movie.objects.bulk_create(
+            Movie(
+                title=f"Loadtest Film {i}",
+                description="A synthetic film seeded for load testing. " * 6,
+                release_date=date(1930 + int(95 * rng.random() ** 0.5), rng.randint(1, 12), 1),
+                avg_rating=round(rng.uniform(4.5, 8.5), 1),
+                runtime=rng.randint(75, 190),
+                language="en",
+                country="United States of America",
+                poster_url=f"https://image.tmdb.org/t/p/original/{PREFIX}{i}.jpg",
+                letterboxd_uri=FILM_URI.format(f"film-{i}"),
+            )
+            for i in range(movies)
+        )
+        directors = Director.objects.bulk_create(
+            Director(name=f"Loadtest Director {i}") for i in range(max(1, movies // 4))
+        )
+        actors = Actor.objects.bulk_create(Actor(name=f"Loadtest Actor {i}") for i in range(max(CAST_SIZE, movies * 2)))
+
+        actor_weights = _zipf_weights(len(actors))
+        MovieGenre.objects.bulk_create(
+            (MovieGenre(movie=film, genre=genre) for film in films for genre in rng.sample(genres, rng.randint(1, 3))),
+            batch_size=2000,
+        )
+        MovieDirector.objects.bulk_create(
+            (MovieDirector(movie=film, director=rng.choice(directors)) for film in films), batch_size=2000,
+        )
+        MovieActor.objects.bulk_create(
+            (
+                MovieActor(movie=film, actor=actors[a], casting_order=order)
+                for film in films
+                for order, a in enumerate(_weighted_sample(rng, actor_weights, CAST_SIZE))
+            ),
+            batch_size=2000,
+        )
+
+        # one hash for every account: seeding stays fast, logins still pay the full hasher cost
+        password = make_password(PASSWORD)
+        accounts = User.objects.bulk_create(
+            User(username=f"{PREFIX}{i}@example.invalid", email=f"{PREFIX}{i}@example.invalid", password=password)
+            for i in range(users)
+        )
+
+        film_weights = _zipf_weights(len(films))
+        rows = 0
+        for account in accounts:
+            size = min(len(films), max(1, int(rng.lognormvariate(math.log(median_history), 0.8))))
+            entries = []
+            for i in _weighted_sample(rng, film_weights, size):
+                if rng.random() < 0.12:
+                    entries.append(MovieUser(user=account, movie=films[i], watch_status="Want to Watch", in_watchlist=True))
+                    continue
+                entries.append(MovieUser(
+                    user=account,
+                    movie=films[i],
+                    watch_status="Watched",
+                    watched_date=today - timedelta(days=min(int(rng.expovariate(1 / 180)), 3 * 365)),
+                    rating=rng.choices(RATINGS, RATING_WEIGHTS)[0] if rng.random() < 0.8 else None,
+                    review="Synthetic review text for load testing. " * rng.randint(1, 8) if rng.random() < 0.1 else None,
+                    liked=rng.random() < 0.25,
+                    rewatch=rng.random() < 0.05,
+                ))
+            MovieUser.objects.bulk_create(entries, batch_size=2000)
+            rows += len(entries)
+
+    rebuild_search_index()
+    return {"users": len(accounts), "movies": len(films), "directors": len(directors),
+            "actors": len(actors), "movieusers": rows}
+
+
+def seeded_accounts(limit=None):
+    qs = User.objects.filter(username__startswith=PREFIX, is_active=True).order_by("id").values_list("email", flat=True)
+    return list(qs[:limit] if limit else qs)
+
+
+def seeded_films():
+    qs = Movie.objects.filter(letterboxd_uri__startswith=FILM_URI_PREFIX).order_by("id")
+    return list(qs.values_list("title", "release_date", "letterboxd_uri"))
+
+
+# ---------- fixture RSS server ----------
+def feed_xml(username, films, rng, items=20):
+    """
+    A Letterboxd-shaped RSS feed: diary permalinks plus the letterboxd:film* fields.
+    """
+    now = datetime.now(timezone.utc)
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<rss version="2.0" xmlns:letterboxd="https://letterboxd.com">',
+        f"<channel><title>Letterboxd - {escape(username)}</title><link>https://letterboxd.com/{escape(username)}/</link>",
+    ]
+    for title, release, uri in rng.sample(films, min(items, len(films))):
+        slug = uri.rstrip("/").rsplit("/", 1)[-1]
+        year = release.year if release else ""
+        published = format_datetime(now - timedelta(hours=rng.randint(0, 24 * 14)))
+        parts.append(
+            f"<item><title>{escape(title)}, {year} - ★★★★</title>"
+            f"<link>https://letterboxd.com/{escape(username)}/film/{slug}/</link>"
+            f"<pubDate>{published}</pubDate>"
+            f"<letterboxd:filmTitle>{escape(title)}</letterboxd:filmTitle>"
+            f"<letterboxd:filmYear>{year}</letterboxd:filmYear></item>"
+        )
+    parts.append("</channel></rss>")
+    return "\n".join(parts).encode("utf-8")
+
+
+class FixtureFeedServer:
+    """
+    Serves /<username>/rss/ on 127.0.0.1 with random recent diary entries
+    drawn from `films`, so the RSS sync runs end to end without the network.
+    """
+
+    def __init__(self, films, port=0):
+        lock, rng = threading.Lock(), random.Random()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                username = self.path.strip("/").split("/")[0]
+                with lock:
+                    body = feed_xml(username, films, rng)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def feed_url(self, username):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{username.split('@')[0]}/rss/"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ---------- transports ----------
+class ClientTransport:
+    """
+    Drives the URL conf in-process through Django's test Client (full middleware
+    and DRF stack, no socket). One client per worker thread.
+    """
+    name = "in-process"
+
+    def __init__(self):
+        self._client = Client(raise_request_exception=False)
+
+    def request(self, method, path, token=None, data=None, files=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        if method == "GET":
+            resp = self._client.get(path, headers=headers)
+        elif files:
+            uploads = {name: SimpleUploadedFile(filename, content) for name, (filename, content) in files.items()}
+            resp = self._client.post(path, {**(data or {}), **uploads}, headers=headers)
+        else:
+            resp = self._client.post(path, json.dumps(data or {}), content_type="application/json", headers=headers)
+        return resp.status_code, resp.content
+
+    def close(self):
+        # each worker thread opened its own connection
+        connections.close_all()
+
+
+class HttpTransport:
+    """
+    Drives a running server (runserver, gunicorn, uvicorn) over HTTP.
+    """
+    name = "http"
+
+    def __init__(self, base_url, timeout=60):
+        self._base = base_url.rstrip("/")
+        self._timeout = timeout
+
+    def request(self, method, path, token=None, data=None, files=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        body = None
+        if files:
+            boundary = uuid.uuid4().hex
+            body = _multipart(boundary, data or {}, files)
+            headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+        elif method != "GET":
+            body = json.dumps(data or {}).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        try:
+            with urlopen(Request(self._base + path, data=body, headers=headers, method=method),
+                         timeout=self._timeout) as resp:
+                return resp.status, resp.read()
+        except HTTPError as exc:
+            return exc.code, exc.read()
+        except (URLError, TimeoutError, ConnectionError) as exc:
+            # status 0: the request never got a response
+            return 0, str(exc).encode("utf-8")
+
+    def close(self):
+        pass
+
+
+def _multipart(boundary, fields, files):
+    out = []
+    for name, value in fields.items():
+        out.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    for name, (filename, content) in files.items():
+        out.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: text/csv\r\n\r\n".encode("utf-8") + content + b"\r\n"
+        )
+    out.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(out)
+
+
+# ---------- scenarios ----------
+class Session:
+    """
+    One simulated user on one worker thread.
+    """
+
+    def __init__(self, transport, email, films, feeds, rng):
+        self.transport, self.email, self.films, self.feeds, self.rng = transport, email, films, feeds, rng
+        self.token = None
+
+    def login(self):
+        status, body = self.transport.request("POST", "/api/login/", data={"email": self.email, "password": PASSWORD})
+        if status == 200:
+            self.token = json.loads(body)["access_token"]
+        return status, body
+
+    def get(self, path):
+        return self.transport.request("GET", path, token=self.token)
+
+    def import_csv(self):
+        # a diary export: mostly known films, a couple the catalog hasn't seen
+        lines = ["Date,Name,Year,Letterboxd URI,Rating,Rewatch,Review,Tags,Watched Date"]
+        today = date.today()
+        for title, release, uri in self.rng.sample(self.films, min(50, len(self.films))):
+            watched = today - timedelta(days=self.rng.randint(0, 60))
+            rating = self.rng.choices(RATINGS, RATING_WEIGHTS)[0]
+            lines.append(f"{watched},{title},{release.year if release else ''},{uri},{rating},,,,{watched}")
+        for _ in range(2):
+            slug = f"new-{uuid.uuid4().hex[:12]}"
+            lines.append(f"{today},Loadtest Import {slug},2024,{FILM_URI.format(slug)},3.5,,,,{today}")
+        csv_bytes = "\n".join(lines).encode("utf-8")
+        return self.transport.request("POST", "/api/letterboxd/import/", token=self.token,
+                                      files={"reviews": ("reviews.csv", csv_bytes)})
+
+    def rss(self):
+        return self.transport.request("POST", "/api/letterboxd/rss/", token=self.token,
+                                      data={"rss": self.feeds.feed_url(self.email)})
+
+
+# Scenarios return (status, body).
+SCENARIOS = {
+    "login": Session.login,
+    "ping": lambda s: s.get("/api/ping/"),
+    "stats": lambda s: s.get("/api/stats/"),
+    "all_time": lambda s: s.get("/api/stats/all-time"),
+    "import": Session.import_csv,
+    "rss": Session.rss,
+}
+# roughly a Stats-page heavy day: most traffic reads, a few users sync
+DEFAULT_MIX = {"login": 5, "ping": 15, "stats": 40, "all_time": 25, "import": 5, "rss": 10}
+
+
+def parse_mix(text):
+    """
+    "stats=40,all_time=25" -> {"stats": 40, "all_time": 25}
+    """
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(SCENARIOS)}.")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one endpoint with a positive weight.")
+    return mix
+
+
+def _is_shared(status, body):
+    # an import / sync answered with another run's result (see services/single_flight)
+    return status == 200 and b'"shared"' in body
+
+
+def run_load(make_transport, accounts, films, feeds, *, mix, concurrency, duration, max_requests=None, seed=0):
+    """
+    Run `concurrency` workers, each a logged-in seeded user issuing requests
+    picked from `mix`, for `duration` seconds (or until `max_requests`).
+    Returns the report from summarize().
+
+    In-process runs disable LETTERBOXD_SYNC_MIN_INTERVAL so every sync and
+    import really runs instead of returning the user's last result; a server
+    loaded over HTTP needs it set to 0 itself. Responses that were still
+    shared are counted separately.
+    """
+    with override_settings(LETTERBOXD_SYNC_MIN_INTERVAL=0):
+        return _run_load(make_transport, accounts, films, feeds, mix=mix, concurrency=concurrency,
+                         duration=duration, max_requests=max_requests, seed=seed)
+
+
+def _run_load(make_transport, accounts, films, feeds, *, mix, concurrency, duration, max_requests, seed):
+    names, weights = list(mix), list(mix.values())
+    samples = defaultdict(list)     # endpoint -> [(seconds, status, shared)]
+    lock = threading.Lock()
+    stop = threading.Event()
+    issued = [0]
+
+    def take_slot():
+        with lock:
+            if max_requests is not None and issued[0] >= max_requests:
+                return False
+            issued[0] += 1
+            return True
+
+    def record(name, started, response):
+        elapsed = time.perf_counter() - started
+        status, body = response
+        with lock:
+            samples[name].append((elapsed, status, _is_shared(status, body)))
+
+    def worker(n):
+        rng = random.Random(seed * 100003 + n)
+        transport = make_transport()
+        try:
+            session = Session(transport, accounts[n % len(accounts)], films, feeds, rng)
+            started = time.perf_counter()
+            record("login", started, session.login())
+            while not stop.is_set() and take_slot():
+                name = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = SCENARIOS[name](session)
+                except Exception:
+                    response = (0, b"")
+                record(name, started, response)
+        finally:
+            transport.close()
+
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(concurrency)]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    deadline = wall_start + duration
+    for t in threads:
+        t.join(max(0.0, deadline - time.perf_counter()))
+    stop.set()
+    for t in threads:
+        t.join()
+    return summarize(samples, time.perf_counter() - wall_start)
+
+
+def _percentile(sorted_values, pct):
+    # nearest-rank percentile
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def summarize(samples, wall_seconds):
+    endpoints = {}
+    total = errors_total = shared_total = 0
+    for name in sorted(samples):
+        rows = samples[name]
+        latencies = sorted(elapsed for elapsed, _, _ in rows)
+        statuses = defaultdict(int)
+        for _, status, _ in rows:
+            statuses[str(status)] += 1
+        errors = sum(1 for _, status, _ in rows if not 200 <= status < 400)
+        shared = sum(1 for _, _, was_shared in rows if was_shared)
+        total += len(rows)
+        errors_total += errors
+        shared_total += shared
+        endpoints[name] = {
+            "requests": len(rows),
+            "errors": errors,
+            "shared": shared,
+            "errorRate": round(errors / len(rows), 4),
+            "throughput": round(len(rows) / wall_seconds, 2),
+            "p50Ms": _ms(_percentile(latencies, 50)),
+            "p95Ms": _ms(_percentile(latencies, 95)),
+            "p99Ms": _ms(_percentile(latencies, 99)),
+            "meanMs": _ms(sum(latencies) / len(latencies)),
+            "maxMs": _ms(latencies[-1]),
+            "statuses": dict(statuses),
+        }
+    return {
+        "wallSeconds": round(wall_seconds, 2),
+        "requests": total,
+        "errors": errors_total,
+        "errorRate": round(errors_total / total, 4) if total else 0.0,
+        "shared": shared_total,
+        "throughput": round(total / wall_seconds, 2) if wall_seconds else 0.0,
+        "endpoints": endpoints,
+    }
@@ -0,0 +1,333 @@
+from django.db import connection, transaction
+from django.db.models import Case, Count, Value, When
+
+from ..models import (
+    Movie, MovieActor, MovieDirector, MovieGenre, MovieNeighborState, MovieUser,
+)
+from ..utils.batching import chunks
+from ..utils.letterboxd import normalize_letterboxd_uri
+from ..utils.titles import normalize_title
+from .search_index import remove_movieusers, sync_movies
+
+# Movies read per round trip while computing keys, and duplicate groups
+# merged per transaction.
+SCAN_CHUNK_SIZE = 5000
+GROUPS_PER_BATCH = 200
+
+KEYS_TABLE = "api_dedupe_keys"
+
+# When two rows of one user are merged, the stronger status wins.
+STATUS_RANK = {"Watched": 3, "Want to Watch": 2, "Not Interested": 1}
+MERGED_FIELDS = ["watch_status", "watched_date", "rating", "review", "liked", "in_watchlist", "rewatch"]
+
+# Movie columns a survivor inherits from a duplicate when its own are empty.
+FILL_FIELDS = ["description", "release_date", "avg_rating", "budget", "revenue", "runtime",
+               "language", "country", "poster_url"]
+
+LINK_MODELS = [
+    (MovieDirector, "director", []),
+    (MovieGenre, "genre", []),
+    (MovieActor, "actor", ["character_name", "casting_order"]),
+]
+
+
+# ---------- keys ----------
+def _slug_key(movie_id, uri, title, release_date):
+    return normalize_letterboxd_uri(uri)
+
+
+def _title_year_key(movie_id, uri, title, release_date):
+    title = normalize_title(title or "")
+    if not title or not release_date:
+        return None
+    return f"{title}|{release_date.year}"
+
+
+# Passes run in this order; each sees the result of the previous one. There's no
+# TMDb id pass: tmdb_id is unique, so only a row that has one and a row that
+# doesn't can be the same film, and the two passes above already pair those.
+PASSES = [
+    ("slug", _slug_key),
+    ("title_year", _title_year_key),
+]
+
+
+def _fill_keys(key_fn):
+    """
+    Stream every Movie, compute its key and spool (key, movie_id) into a temp
+    table, so grouping happens in the database instead of a Python dict.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {KEYS_TABLE}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {KEYS_TABLE} (dedupe_key VARCHAR(600) NOT NULL, movie_id BIGINT NOT NULL)")
+        batch = []
+        rows = Movie.objects.values_list("id", "letterboxd_uri", "title", "release_date")
+        for row in rows.iterator(chunk_size=SCAN_CHUNK_SIZE):
+            key = key_fn(*row)
+            if key:
+                batch.append((key, row[0]))
+            if len(batch) >= SCAN_CHUNK_SIZE:
+                cursor.executemany(f"INSERT INTO {KEYS_TABLE} (dedupe_key, movie_id) VALUES (%s, %s)", batch)
+                batch = []
+        if batch:
+            cursor.executemany(f"INSERT INTO {KEYS_TABLE} (dedupe_key, movie_id) VALUES (%s, %s)", batch)
+        cursor.execute(f"CREATE INDEX {KEYS_TABLE}_key ON {KEYS_TABLE} (dedupe_key, movie_id)")
+
+
+def _duplicate_groups():
+    """
+    Yield lists of GROUPS_PER_BATCH duplicate groups (movie ids sharing a key),
+    paging through the keys table by key so only one page is held at a time.
+    """
+    last_key = ""
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                f"SELECT dedupe_key FROM {KEYS_TABLE} WHERE dedupe_key > %s "
+                f"GROUP BY dedupe_key HAVING COUNT(*) > 1 ORDER BY dedupe_key LIMIT %s",
+                [last_key, GROUPS_PER_BATCH],
+            )
+            keys = [row[0] for row in cursor.fetchall()]
+            if not keys:
+                return
+            cursor.execute(
+                f"SELECT dedupe_key, movie_id FROM {KEYS_TABLE} "
+                f"WHERE dedupe_key IN ({', '.join(['%s'] * len(keys))}) ORDER BY dedupe_key, movie_id",
+                keys,
+            )
+            groups = {}
+            for key, movie_id in cursor.fetchall():
+                groups.setdefault(key, []).append(movie_id)
+            yield list(groups.values())
+            last_key = keys[-1]
+
+
+def _drop_keys():
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {KEYS_TABLE}")
+
+
+# ---------- survivor ----------
+def _survivor_order(movie, logged):
+    # canonical URI first, then enriched rows, then the most-logged row, then the oldest
+    uri = movie.letterboxd_uri
+    return (
+        bool(uri) and uri == normalize_letterboxd_uri(uri),
+        movie.tmdb_id is not None,
+        movie.runtime is not None,
+        logged,
+        -movie.pk,
+    )
+
+
+def _conflicting(movies):
+    # distinct canonical slugs or TMDb ids are proof of different films
+    slugs = {normalize_letterboxd_uri(m.letterboxd_uri) for m in movies} - {None}
+    tmdb_ids = {m.tmdb_id for m in movies} - {None}
+    return len(slugs) > 1 or len(tmdb_ids) > 1
+
+
+# ---------- merge ----------
+def merge_movieuser_rows(rows):
+    """
+    Fold one user's rows for the same film into the first one (the survivor's
+    row if it has one). Returns the field updates for that row.
+    """
+    keep = rows[0]
+    status = max((r.watch_status for r in rows), key=lambda s: STATUS_RANK.get(s, 0))
+    dates = [r.watched_date for r in rows if r.watched_date]
+    # the rating of the most recent watch that has one
+    rated = sorted((r for r in rows if r.rating is not None),
+                   key=lambda r: r.watched_date.toordinal() if r.watched_date else 0, reverse=True)
+    reviews = [r.review for r in rows if (r.review or "").strip()]
+    return {
+        "watch_status": status,
+        "watched_date": max(dates) if dates else None,
+        "rating": rated[0].rating if rated else keep.rating,
+        "review": max(reviews, key=len) if reviews else keep.review,
+        "liked": any(r.liked for r in rows),
+        "in_watchlist": any(r.in_watchlist for r in rows),
+        # logged on different days through different rows: that's a rewatch
+        "rewatch": any(r.rewatch for r in rows) or len(set(dates)) > 1,
+    }
+
+
+def _merge_movieusers(survivor_of, counters):
+    """
+    Move the duplicates' MovieUser rows onto their survivors. Where a user ends
+    up with several rows for one survivor (uniq_user_movie), they're folded
+    into one. Returns the ids of the folded-away rows.
+    """
+    loser_rows = MovieUser.objects.filter(movie_id__in=list(survivor_of)).values_list("id", "user_id", "movie_id")
+    by_target = {}
+    for pk, user_id, movie_id in loser_rows:
+        by_target.setdefault((user_id, survivor_of[movie_id]), []).append(pk)
+    if not by_target:
+        return []
+
+    survivor_rows = MovieUser.objects.filter(
+        movie_id__in=set(survivor_of.values()),
+        user_id__in=MovieUser.objects.filter(movie_id__in=list(survivor_of)).values("user_id"),
+    ).values_list("id", "user_id", "movie_id")
+    existing = {(user_id, movie_id): pk for pk, user_id, movie_id in survivor_rows}
+
+    conflicts = {key: pks for key, pks in by_target.items() if len(pks) > 1 or key in existing}
+    moving = [pk for key, pks in by_target.items() if key not in conflicts for pk in pks]
+
+    deleted_ids = []
+    if conflicts:
+        rows = MovieUser.objects.in_bulk(
+            [pk for key, pks in conflicts.items() for pk in pks] + [existing[k] for k in conflicts if k in existing]
+        )
+        kept = []
+        for (user_id, survivor_id), pks in conflicts.items():
+            # the survivor's own row (if any) is the one that's kept
+            ordered = ([rows[existing[(user_id, survivor_id)]]] if (user_id, survivor_id) in existing else []) + \
+                sorted((rows[pk] for pk in pks), key=lambda mu: mu.pk)
+            keep = ordered[0]
+            for field, value in merge_movieuser_rows(ordered).items():
+                setattr(keep, field, value)
+            keep.movie_id = survivor_id
+            kept.append(keep)
+            deleted_ids.extend(mu.pk for mu in ordered[1:])
+        # drop the folded rows first so moving a kept row onto the survivor can't collide
+        for chunk in chunks(deleted_ids):
+            MovieUser.objects.filter(pk__in=chunk).delete()
+        MovieUser.objects.bulk_update(kept, ["movie", *MERGED_FIELDS], batch_size=500)
+        counters["movieusers_merged"] += len(deleted_ids)
+
+    retarget = Case(*(When(movie_id=loser, then=Value(survivor)) for loser, survivor in survivor_of.items()))
+    for chunk in chunks(moving):
+        counters["movieusers_moved"] += MovieUser.objects.filter(pk__in=chunk).update(movie_id=retarget)
+    return deleted_ids
+
+
+def _merge_links(survivor_of):
+    # copy the duplicates' credits onto the survivors; the originals go with the loser rows
+    for model, other, extra in LINK_MODELS:
+        rows = model.objects.filter(movie_id__in=list(survivor_of)).values("movie_id", f"{other}_id", *extra)
+        model.objects.bulk_create(
+            (model(**{**row, "movie_id": survivor_of[row["movie_id"]]}) for row in rows),
+            ignore_conflicts=True, batch_size=500,
+        )
+
+
+def _fill_survivor(survivor, losers):
+    """
+    Copy empty columns over from the duplicates. Returns the names of the
+    columns it changed, plus the TMDb id and canonical URI the survivor should
+    end up with; those are unique, so they can only be set once the
+    duplicates are deleted.
+    """
+    changed = []
+    for field in FILL_FIELDS:
+        if getattr(survivor, field) in (None, ""):
+            value = next((getattr(m, field) for m in losers if getattr(m, field) not in (None, "")), None)
+            if value is not None:
+                setattr(survivor, field, value)
+                changed.append(field)
+    if (not survivor.title or survivor.title == "Unknown") and any(m.title for m in losers):
+        survivor.title = next(m.title for m in losers if m.title)
+        changed.append("title")
+
+    tmdb_id = survivor.tmdb_id or next((m.tmdb_id for m in losers if m.tmdb_id), None)
+    slugs = (normalize_letterboxd_uri(m.letterboxd_uri) for m in [survivor, *losers])
+    canonical = next((uri for uri in slugs if uri), survivor.letterboxd_uri)
+    return changed, tmdb_id, canonical
+
+
+def _merge_batch(groups, counters):
+    """
+    Merge a page of duplicate groups [(survivor, losers)] with a fixed number
+    of set-based queries, whatever the page size.
+    """
+    survivor_of, pending = {}, []
+    for survivor, losers in groups:
+        pending.append((survivor, *_fill_survivor(survivor, losers)))
+        survivor_of.update((m.pk, survivor.pk) for m in losers)
+
+    deleted_mu_ids = _merge_movieusers(survivor_of, counters)
+    _merge_links(survivor_of)
+
+    # Recommendation / MovieNeighbor rows of the duplicates cascade away; they're
+    # rebuilt by score_recommendations and build_similar_films, and the state rows
+    # are dropped so the survivors' neighbours are recomputed with their new watchers.
+    survivor_ids = [survivor.pk for survivor, _ in groups]
+    Movie.objects.filter(pk__in=list(survivor_of)).delete()
+    MovieNeighborState.objects.filter(movie_id__in=survivor_ids).delete()
+
+    taken = set(
+        Movie.objects.filter(letterboxd_uri__in=[uri for *_, uri in pending if uri])
+        .values_list("letterboxd_uri", flat=True)
+    )
+    updated, fields = [], set()
+    for survivor, changed, tmdb_id, canonical in pending:
+        if tmdb_id != survivor.tmdb_id:
+            survivor.tmdb_id = tmdb_id
+            changed.append("tmdb_id")
+        if canonical and canonical != survivor.letterboxd_uri and canonical not in taken:
+            survivor.letterboxd_uri = canonical
+            taken.add(canonical)
+            changed.append("letterboxd_uri")
+        if changed:
+            updated.append(survivor)
+            fields.update(changed)
+    if updated:
+        Movie.objects.bulk_update(updated, sorted(fields), batch_size=500)
+
+    remove_movieusers(deleted_mu_ids)
+    sync_movies(survivor_ids)
+    counters["groups_merged"] += len(groups)
+    counters["movies_removed"] += len(survivor_of)
+
+
+def _run_pass(name, key_fn, counters):
+    _fill_keys(key_fn)
+    try:
+        for groups in _duplicate_groups():
+            movies = Movie.objects.in_bulk([pk for group in groups for pk in group])
+            logged = dict(
+                MovieUser.objects.filter(movie_id__in=list(movies))
+                .values("movie_id").annotate(n=Count("id")).values_list("movie_id", "n")
+            )
+            plans = []
+            for group in groups:
+                members = [movies[pk] for pk in group]
+                if name == "title_year" and _conflicting(members):
+                    counters["groups_skipped"] += 1
+                    continue
+                survivor = max(members, key=lambda m: _survivor_order(m, logged.get(m.pk, 0)))
+                plans.append((survivor, [m for m in members if m.pk != survivor.pk]))
+            if plans:
+                with transaction.atomic():
+                    _merge_batch(plans, counters)
+                counters[f"{name}_groups"] += len(plans)
+    finally:
+        _drop_keys()
+
+
+def dedupe_movies(*, dry_run=False):
+    """
+    Merge duplicate Movie rows: same canonical Letterboxd slug, then same
+    normalized title + year (unless the rows carry different slugs or TMDb
+    ids). Each group keeps one survivor, which inherits a duplicate's TMDb id
+    if it has none; MovieUser rows and credits move onto it, per-user
+    conflicts are merged field by field.
+
+    Memory is bounded by the page of groups being merged, not by the table.
+    With dry_run everything runs inside one transaction that is rolled back.
+    Returns counters.
+    """
+    counters = {
+        "slug_groups": 0, "title_year_groups": 0, "groups_skipped": 0,
+        "groups_merged": 0, "movies_removed": 0, "movieusers_moved": 0, "movieusers_merged": 0,
+    }
+    if dry_run:
+        with transaction.atomic():
+            for name, key_fn in PASSES:
+                _run_pass(name, key_fn, counters)
+            transaction.set_rollback(True)
+    else:
+        for name, key_fn in PASSES:
+            _run_pass(name, key_fn, counters)
+    return counters
@@ -0,0 +1,283 @@
+import hashlib
+import io
+import mimetypes
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import IntegrityError, connection
+from django.utils import timezone
+
+from ..models import CachedImage
+
+# Resized variants, by width in pixels (TMDb's own w185 / w342 buckets).
+VARIANTS = {"small": 185, "medium": 342}
+ORIGINAL = "original"
+
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+_executor = None
+_pending_variants = {}
+_pending_downloads = {}
+_executor_lock = threading.RLock()      # done-callbacks can run inside schedule_variants / schedule_download
+
+
+# ---------- storage ----------
+def blob_path(sha256, variant=ORIGINAL):
+    # two-level fan-out keeps directories small: <dir>/<variant>/ab/abcdef...
+    return Path(settings.POSTER_CACHE_DIR) / variant / sha256[:2] / sha256
+
+
+def _write_blob(path, data):
+    # write-then-rename so readers (and other processes) never see a partial file
+    if path.exists():
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# ---------- download ----------
+def _read_source(url):
+    """
+    Returns (bytes, content_type), or None if the image can't be had.
+    With POSTER_CACHE_SEED_DIR set the seed file is the only source.
+    """
+    if settings.POSTER_CACHE_SEED_DIR:
+        name = os.path.basename(urlsplit(url).path)
+        path = Path(settings.POSTER_CACHE_SEED_DIR) / name
+        if not name or not path.is_file():
+            return None
+        return path.read_bytes(), mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    try:
+        with urlopen(Request(url, headers={"Accept": "image/*"}), timeout=settings.TMDB_TIMEOUT_SECONDS) as resp:
+            data = resp.read(MAX_IMAGE_BYTES + 1)
+            content_type = resp.headers.get_content_type()
+    except (HTTPError, URLError, TimeoutError, ValueError):
+        return None
+    if len(data) > MAX_IMAGE_BYTES or not content_type.startswith("image/"):
+        return None
+    return data, content_type
+
+
+def _download(url):
+    source = _read_source(url)
+    now = timezone.now()
+    if source is None:
+        # remember the miss so the source isn't asked again on every request
+        fields = {"sha256": "", "content_type": "", "byte_size": 0, "fetched_at": now,
+                  "status": CachedImage.MISSING,
+                  "retry_at": now + timedelta(seconds=settings.POSTER_CACHE_MISS_TTL)}
+        try:
+            CachedImage.objects.update_or_create(url=url, defaults=fields)
+        except IntegrityError:
+            pass                        # another process recorded it first
+        return None
+    data, content_type = source
+    sha256 = hashlib.sha256(data).hexdigest()
+    _write_blob(blob_path(sha256), data)
+
+    fields = {"sha256": sha256, "content_type": content_type[:50], "byte_size": len(data),
+              "fetched_at": now, "status": CachedImage.OK, "retry_at": None}
+    try:
+        image, _ = CachedImage.objects.update_or_create(url=url, defaults=fields)
+    except IntegrityError:
+        # another process stored the same URL first
+        image = CachedImage.objects.get(url=url)
+    schedule_variants(image.sha256)
+    return image
+
+
+def cached_image(url):
+    """
+    (image, retry) without touching the source: the CachedImage if its file is
+    on disk, else None, and whether a download is worth trying (False while a
+    recorded miss is within POSTER_CACHE_MISS_TTL).
+    """
+    image = CachedImage.objects.filter(url=url).first() if url else None
+    if image is None:
+        return None, bool(url)
+    if image.status == CachedImage.MISSING:
+        return None, image.retry_at is None or image.retry_at <= timezone.now()
+    if blob_path(image.sha256).exists():
+        return image, False
+    return None, True
+
+
+def get_image(url):
+    """
+    CachedImage for a remote URL, downloading it on first use. Returns None if
+    the image is unavailable (including a recent recorded miss).
+
+    Concurrent calls for the same URL share one download: later callers wait
+    on the first caller's Future.
+    """
+    image, retry = cached_image(url)
+    if image or not retry:
+        return image
+
+    with _inflight_lock:
+        future = _inflight.get(url)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[url] = future
+
+    if not owner:
+        return future.result()
+
+    try:
+        image = _download(url)
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(image)
+        return image
+    finally:
+        with _inflight_lock:
+            _inflight.pop(url, None)
+
+
+def _download_in_background(url):
+    try:
+        return get_image(url)
+    finally:
+        connection.close()          # pool threads each opened their own
+
+
+def _download_done(url):
+    with _executor_lock:
+        _pending_downloads.pop(url, None)
+
+
+def schedule_download(url):
+    """
+    Queue get_image(url) on the background pool so a request never waits on
+    the source. Returns the Future (shared with an already-queued download).
+    """
+    with _executor_lock:
+        future = _pending_downloads.get(url)
+        if future is None:
+            future = _executor_instance().submit(_download_in_background, url)
+            _pending_downloads[url] = future
+            future.add_done_callback(lambda _: _download_done(url))
+    return future
+
+
+# ---------- variants ----------
+def _executor_instance():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.POSTER_CACHE_WORKERS,
+                                       thread_name_prefix="poster-cache")
+    return _executor
+
+
+def _resize(sha256):
+    try:
+        from PIL import Image
+    except ImportError:
+        # without Pillow every variant is served from the original
+        return
+    source = blob_path(sha256)
+    for variant, width in VARIANTS.items():
+        target = blob_path(sha256, variant)
+        if target.exists():
+            continue
+        try:
+            with Image.open(source) as img:
+                img = img.convert("RGB")
+                img.thumbnail((width, width * 3))
+                buf = io.BytesIO()
+                img.save(buf, "JPEG", quality=85, optimize=True)
+        except OSError:
+            # not a decodable image; the original is still served
+            return
+        _write_blob(target, buf.getvalue())
+
+
+def _resize_done(sha256):
+    with _executor_lock:
+        _pending_variants.pop(sha256, None)
+
+
+def schedule_variants(sha256):
+    """
+    Queue resized variants for a stored image on the background pool.
+    Returns the Future (shared with any already-queued job for the same hash).
+    """
+    with _executor_lock:
+        future = _pending_variants.get(sha256)
+        if future is None:
+            future = _executor_instance().submit(_resize, sha256)
+            _pending_variants[sha256] = future
+            future.add_done_callback(lambda _: _resize_done(sha256))
+    return future
+
+
+def wait_for_variants():
+    with _executor_lock:
+        futures = list(_pending_variants.values())
+    for future in futures:
+        future.result()
+
+
+def variants_supported():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def variant_file(image, variant):
+    """
+    (path, content_type, served_variant, final) for a cached image. Variants
+    that haven't been generated yet fall back to the original; `final` is False
+    in that case so the response isn't cached as if it were the thumbnail.
+    """
+    if variant in VARIANTS:
+        path = blob_path(image.sha256, variant)
+        if path.exists():
+            return path, "image/jpeg", variant, True
+        if variants_supported():
+            schedule_variants(image.sha256)
+            return blob_path(image.sha256), image.content_type, ORIGINAL, False
+    return blob_path(image.sha256), image.content_type, ORIGINAL, True
+
+
+def warm_images(urls, *, max_workers=8):
+    """
+    Download every URL not cached yet and wait for its variants.
+    Returns counters.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    cached = set(CachedImage.objects.filter(url__in=urls, status=CachedImage.OK).values_list("url", flat=True))
+    todo = [u for u in urls if u not in cached]
+
+    counters = {"urls": len(urls), "already_cached": len(cached), "downloaded": 0, "unavailable": 0}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for image in pool.map(_download_in_background, todo):
+            counters["downloaded" if image else "unavailable"] += 1
+    wait_for_variants()
+    counters["variants"] = "generated" if variants_supported() else "unavailable (Pillow not installed)"
+    return counters
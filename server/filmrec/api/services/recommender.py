@@ -0,0 +1,265 @@
+import numpy as np
+
+from ..utils.arrays import csr_from_pairs, gather_rows
+
+
+class Interactions:
+    """
+    Implicit user x movie interactions stored as CSR (rows = users, cols = movies).
+
+    user_ids / movie_ids map row / column indices back to database ids so the
+    same universe can be shared between a train and a test split.
+    """
+
+    def __init__(self, indptr, indices, user_ids, movie_ids):
+        self.indptr = indptr
+        self.indices = indices
+        self.user_ids = user_ids
+        self.movie_ids = movie_ids
+
+    @classmethod
+    def from_pairs(cls, pair_user_ids, pair_movie_ids, user_ids=None, movie_ids=None):
+        pu = np.asarray(pair_user_ids, dtype=np.int64)
+        pm = np.asarray(pair_movie_ids, dtype=np.int64)
+        user_ids = np.unique(pu) if user_ids is None else np.asarray(user_ids, dtype=np.int64)
+        movie_ids = np.unique(pm) if movie_ids is None else np.asarray(movie_ids, dtype=np.int64)
+
+        rows = np.searchsorted(user_ids, pu)
+        cols = np.searchsorted(movie_ids, pm)
+
+        # drop duplicate (user, movie) pairs, sort by row then col
+        keys = np.unique(rows * len(movie_ids) + cols)
+        rows = keys // max(len(movie_ids), 1)
+        cols = keys % max(len(movie_ids), 1)
+
+        indptr = np.zeros(len(user_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(user_ids)), out=indptr[1:])
+        return cls(indptr, cols.astype(np.int32), user_ids, movie_ids)
+
+    @property
+    def n_users(self):
+        return len(self.user_ids)
+
+    @property
+    def n_items(self):
+        return len(self.movie_ids)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def items_for(self, row):
+        return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+    def row_of_pairs(self):
+        # row index for every stored entry (COO rows)
+        return np.repeat(np.arange(self.n_users, dtype=np.int32), np.diff(self.indptr))
+
+    def dense_rows(self, rows, dtype=np.float32):
+        out = np.zeros((len(rows), self.n_items), dtype=dtype)
+        for i, row in enumerate(rows):
+            out[i, self.items_for(row)] = 1
+        return out
+
+    def item_counts(self):
+        return np.bincount(self.indices, minlength=self.n_items)
+
+
+def load_interactions(queryset=None):
+    """
+    Watched MovieUser rows as Interactions.
+    """
+    # imported here so batch-scoring workers can load this module without Django
+    from ..models import MovieUser
+
+    if queryset is None:
+        queryset = MovieUser.objects.filter(watch_status="Watched")
+    pairs = np.array(list(queryset.values_list("user_id", "movie_id")), dtype=np.int64).reshape(-1, 2)
+    return Interactions.from_pairs(pairs[:, 0], pairs[:, 1])
+
+
+# ---------- models ----------
+class BaseRecommender:
+    """
+    Every model scores a block of users as user_side(rows) @ item_side, so
+    single-user and batch scoring share the same code path.
+    """
+    name = "base"
+
+    def fit(self, interactions):
+        raise NotImplementedError
+
+    def user_side(self, interactions, rows):
+        raise NotImplementedError
+
+    def arrays(self):
+        """
+        Arrays needed for scoring (shared with batch workers).
+        """
+        raise NotImplementedError
+
+    def load_arrays(self, arrays):
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        return self
+
+    @property
+    def index_nbytes(self):
+        return sum(a.nbytes for a in self.arrays().values())
+
+    def score_block(self, interactions, rows):
+        return self.user_side(interactions, rows) @ self.item_side
+
+    def recommend_block(self, interactions, rows, k=10, exclude_seen=True):
+        """
+        Returns (item indices, scores), both shaped (len(rows), k), best first.
+        """
+        rows = np.asarray(rows)
+        scores = np.asarray(self.score_block(interactions, rows), dtype=np.float32)
+        if exclude_seen:
+            for i, row in enumerate(rows):
+                scores[i, interactions.items_for(row)] = -np.inf
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+class PopularityRecommender(BaseRecommender):
+    """
+    Most-watched films first. Baseline every other model should beat.
+    """
+    name = "popularity"
+
+    def fit(self, interactions):
+        self.item_side = interactions.item_counts().astype(np.float32).reshape(1, -1)
+        return self
+
+    def user_side(self, interactions, rows):
+        return np.ones((len(rows), 1), dtype=np.float32)
+
+    def arrays(self):
+        return {"item_side": self.item_side}
+
+
+class ItemKNNRecommender(BaseRecommender):
+    """
+    Item-item cosine similarity over co-watches, pruned to the top `neighbours`
+    per film. A user's score for a film is the summed similarity to films they watched.
+
+    Co-watch counts are built sparsely for `block_size` films at a time, so
+    memory follows the co-watch pairs in one block rather than n_items^2, and
+    scoring reads the neighbour table directly.
+    """
+    name = "itemknn"
+
+    def __init__(self, neighbours=50, block_size=256):
+        self.neighbours = neighbours
+        self.block_size = block_size
+
+    def fit(self, interactions):
+        n = interactions.n_items
+        k = min(self.neighbours, max(n - 1, 1))
+        # item -> users CSR, the transpose of the interactions
+        t_indptr, t_users = csr_from_pairs(interactions.indices, interactions.row_of_pairs(), n)
+        norms = np.sqrt(interactions.item_counts()).astype(np.float32)
+        norms[norms == 0] = 1.0
+
+        nbr = np.zeros((n, k), dtype=np.int32)
+        weights = np.zeros((n, k), dtype=np.float32)
+        for start in range(0, n, self.block_size):
+            block = np.arange(start, min(start + self.block_size, n))
+            users, user_owner = gather_rows(t_indptr, t_users, block)
+            others, other_owner = gather_rows(interactions.indptr, interactions.indices, users)
+            local = user_owner[other_owner]
+            keys, counts = np.unique(local * n + others, return_counts=True)
+            rows, cols = keys // n, keys % n
+            keep = cols != block[rows]
+            rows, cols, counts = rows[keep], cols[keep], counts[keep]
+            sim = counts / norms[block[rows]] / norms[cols]
+
+            # best k per row: sort by row then similarity, keep each row's first k
+            order = np.lexsort((-sim, rows))
+            rows, cols, sim = rows[order], cols[order], sim[order]
+            first = np.searchsorted(rows, rows)
+            rank = np.arange(len(rows)) - first
+            top = rank < k
+            nbr[block[rows[top]], rank[top]] = cols[top]
+            weights[block[rows[top]], rank[top]] = sim[top]
+
+        # rows with fewer than k co-watched films are padded with weight 0
+        self.neighbour_table = nbr
+        self.neighbour_weights = weights
+        return self
+
+    def score_block(self, interactions, rows):
+        items, owner = gather_rows(interactions.indptr, interactions.indices, rows)
+        scores = np.zeros((len(rows), interactions.n_items), dtype=np.float32)
+        k = self.neighbour_table.shape[1]
+        np.add.at(
+            scores,
+            (np.repeat(owner, k), self.neighbour_table[items].ravel()),
+            self.neighbour_weights[items].ravel(),
+        )
+        return scores
+
+    def arrays(self):
+        return {"neighbour_table": self.neighbour_table, "neighbour_weights": self.neighbour_weights}
+
+
+class ALSRecommender(BaseRecommender):
+    """
+    Unweighted alternating least squares on the binary watch matrix.
+    """
+    name = "als"
+
+    def __init__(self, factors=32, regularization=0.1, iterations=10, seed=0):
+        self.factors = factors
+        self.regularization = regularization
+        self.iterations = iterations
+        self.seed = seed
+
+    def fit(self, interactions):
+        rng = np.random.default_rng(self.seed)
+        rows = interactions.row_of_pairs()
+        cols = interactions.indices
+        f = self.factors
+        reg = self.regularization * np.eye(f, dtype=np.float32)
+
+        u = np.zeros((interactions.n_users, f), dtype=np.float32)
+        v = (rng.standard_normal((interactions.n_items, f)) * 0.01).astype(np.float32)
+        for _ in range(self.iterations):
+            # U = X V (VtV + lI)^-1, X never materialised
+            xv = np.zeros_like(u)
+            np.add.at(xv, rows, v[cols])
+            u = np.linalg.solve(v.T @ v + reg, xv.T).T.astype(np.float32)
+
+            xtu = np.zeros_like(v)
+            np.add.at(xtu, cols, u[rows])
+            v = np.linalg.solve(u.T @ u + reg, xtu.T).T.astype(np.float32)
+
+        self.user_factors = u
+        self.item_side = np.ascontiguousarray(v.T)
+        return self
+
+    def user_side(self, interactions, rows):
+        return self.user_factors[rows]
+
+    def arrays(self):
+        return {"user_factors": self.user_factors, "item_side": self.item_side}
+
+
+RECOMMENDERS = {
+    cls.name: cls
+    for cls in (PopularityRecommender, ItemKNNRecommender, ALSRecommender)
+}
+
+
+def build_recommender(name, **params):
+    try:
+        cls = RECOMMENDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown recommender '{name}'. Choose from: {', '.join(RECOMMENDERS)}")
+    return cls(**params)
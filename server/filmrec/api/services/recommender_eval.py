@@ -0,0 +1,173 @@
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from ..models import MovieUser
+from .recommender import Interactions, build_recommender
+
+
+# ---------- datasets ----------
+def generate_synthetic_interactions(*, n_users=1000, n_movies=2000, mean_per_user=30,
+                                    n_tastes=12, seed=0, start=date(2015, 1, 1), days=3650):
+    """
+    Fake MovieUser rows shaped like MovieUser.values_list("user_id", "movie_id", "watched_date").
+
+    Films belong to taste clusters and have Zipf-like popularity; users mostly
+    watch inside a couple of favourite clusters, so there is real signal for
+    a recommender to find.
+    """
+    rng = np.random.default_rng(seed)
+
+    movie_taste = rng.integers(0, n_tastes, size=n_movies)
+    popularity = 1.0 / np.arange(1, n_movies + 1) ** 0.8
+    rng.shuffle(popularity)
+
+    by_taste = []
+    for t in range(n_tastes):
+        members = np.flatnonzero(movie_taste == t)
+        p = popularity[members]
+        by_taste.append((members, p / p.sum()))
+    global_p = popularity / popularity.sum()
+
+    rows = []
+    for user_id in range(1, n_users + 1):
+        count = min(int(rng.geometric(1.0 / mean_per_user)), n_movies)
+        favourites = rng.choice(n_tastes, size=2, replace=False)
+
+        from_taste = rng.random(count) < 0.75
+        picks = set()
+        for fav in rng.choice(favourites, size=int(from_taste.sum())):
+            members, p = by_taste[fav]
+            if len(members):
+                picks.add(int(rng.choice(members, p=p)))
+        picks.update(int(m) for m in rng.choice(n_movies, size=int((~from_taste).sum()), p=global_p))
+
+        # each user is active over their own window of the date range
+        active_from = int(rng.integers(0, days))
+        for movie_idx in picks:
+            offset = active_from + int(rng.integers(0, days - active_from + 1))
+            rows.append((user_id, movie_idx + 1, start + timedelta(days=min(offset, days))))
+    return rows
+
+
+def load_movieuser_rows(queryset=None):
+    if queryset is None:
+        queryset = MovieUser.objects.filter(watch_status="Watched")
+    return list(queryset.values_list("user_id", "movie_id", "watched_date"))
+
+
+def time_split(rows, *, holdout=0.2):
+    """
+    Global time-based holdout: the latest `holdout` fraction of dated rows is the
+    test set, everything earlier (or undated) is training data.
+
+    Returns (train Interactions, {user row: set(test item cols)}, cutoff date).
+    Train and test share the same user / movie universe.
+    """
+    user_ids = np.unique([r[0] for r in rows])
+    movie_ids = np.unique([r[1] for r in rows])
+
+    dates = sorted(r[2] for r in rows if r[2] is not None)
+    if not dates:
+        raise ValueError("No dated rows to split on.")
+    cutoff = dates[min(int(len(dates) * (1 - holdout)), len(dates) - 1)]
+
+    train = [r for r in rows if r[2] is None or r[2] < cutoff]
+    test = [r for r in rows if r[2] is not None and r[2] >= cutoff]
+
+    train_inter = Interactions.from_pairs(
+        [r[0] for r in train], [r[1] for r in train], user_ids=user_ids, movie_ids=movie_ids,
+    )
+
+    test_sets = {}
+    test_rows = np.searchsorted(user_ids, [r[0] for r in test])
+    test_cols = np.searchsorted(movie_ids, [r[1] for r in test])
+    for row, col in zip(test_rows.tolist(), test_cols.tolist()):
+        test_sets.setdefault(row, set()).add(col)
+
+    # only users with some history can be scored; drop re-watches of training films
+    for row in list(test_sets):
+        seen = set(train_inter.items_for(row).tolist())
+        test_sets[row] -= seen
+        if not seen or not test_sets[row]:
+            del test_sets[row]
+
+    return train_inter, test_sets, cutoff
+
+
+# ---------- metrics ----------
+def ranking_metrics(recommended, relevant, k):
+    hits = [1 if item in relevant else 0 for item in recommended[:k]]
+    n_hits = sum(hits)
+    dcg = sum(h / np.log2(i + 2) for i, h in enumerate(hits))
+    idcg = sum(1 / np.log2(i + 2) for i in range(min(len(relevant), k)))
+    return {
+        "precision": n_hits / k,
+        "recall": n_hits / len(relevant),
+        "ndcg": dcg / idcg if idcg else 0.0,
+    }
+
+
+def evaluate_model(model, train, test_sets, *, k=10, block_size=256, latency_sample=200, seed=0):
+    t0 = time.perf_counter()
+    model.fit(train)
+    train_seconds = time.perf_counter() - t0
+
+    users = np.array(sorted(test_sets), dtype=np.int64)
+    totals = {"precision": 0.0, "recall": 0.0, "ndcg": 0.0}
+    recommended_items = set()
+    for start in range(0, len(users), block_size):
+        block = users[start:start + block_size]
+        top, _ = model.recommend_block(train, block, k=k)
+        for row, items in zip(block.tolist(), top.tolist()):
+            recommended_items.update(items)
+            for name, value in ranking_metrics(items, test_sets[row], k).items():
+                totals[name] += value
+
+    # per-user latency: one user per call, as an API request would score it
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(users, size=min(latency_sample, len(users)), replace=False) if len(users) else []
+    latencies = []
+    for row in sample:
+        t0 = time.perf_counter()
+        model.recommend_block(train, [row], k=k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    n = max(len(users), 1)
+    return {
+        "model": model.name,
+        "k": k,
+        "users_evaluated": len(users),
+        f"precision@{k}": totals["precision"] / n,
+        f"recall@{k}": totals["recall"] / n,
+        f"ndcg@{k}": totals["ndcg"] / n,
+        "catalog_coverage": len(recommended_items) / max(train.n_items, 1),
+        "train_seconds": train_seconds,
+        "index_bytes": int(model.index_nbytes),
+        "latency_ms_p50": float(np.percentile(latencies, 50)) if latencies else None,
+        "latency_ms_p99": float(np.percentile(latencies, 99)) if latencies else None,
+    }
+
+
+def run_benchmark(rows, *, models=("popularity", "itemknn", "als"), k=10, holdout=0.2,
+                  latency_sample=200, seed=0):
+    """
+    Split `rows` by watched_date and evaluate every named model on the same split.
+    """
+    train, test_sets, cutoff = time_split(rows, holdout=holdout)
+    results = []
+    for name in models:
+        result = evaluate_model(
+            build_recommender(name), train, test_sets,
+            k=k, latency_sample=latency_sample, seed=seed,
+        )
+        result["cutoff"] = cutoff.isoformat()
+        results.append(result)
+    return {
+        "users": train.n_users,
+        "movies": train.n_items,
+        "train_interactions": train.nnz,
+        "test_users": len(test_sets),
+        "results": results,
+    }
@@ -0,0 +1,198 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from ..models import Movie, MovieUser
+from ..utils.batching import chunks
+
+# One FTS5 row per MovieUser (rowid = MovieUser.id). Movie text is copied onto
+# each user's row so a search is a single index lookup scoped by user_key.
+FTS_TABLE = "api_history_fts"
+
+# bm25 column weights: user_key, movie_id, title, description, review
+BM25_WEIGHTS = (0.0, 0.0, 10.0, 1.0, 4.0)
+
+SNIPPET_OPEN, SNIPPET_CLOSE = "[", "]"
+MAX_QUERY_TERMS = 12
+# Columns free-text terms are matched against (never user_key).
+SEARCH_COLUMNS = ("title", "description", "review")
+# Shorter last words are matched whole: a 1-2 letter prefix expands to most of the index.
+# Keep the table's prefix index (ensure_search_table) in step with this.
+MIN_PREFIX_LENGTH = 3
+
+_tables_ready = set()
+
+
+def search_available():
+    return connection.vendor == "sqlite"
+
+
+def ensure_search_table():
+    key = str(connection.settings_dict["NAME"])
+    if key in _tables_ready:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "user_key, movie_id UNINDEXED, title, description, review, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '3')"
+        )
+    # a CREATE inside a transaction that later rolls back leaves no table behind
+    transaction.on_commit(lambda: _tables_ready.add(key))
+
+
+def _user_key(user_id):
+    return f"u{user_id}"
+
+
+def _reindex(where_sql, params):
+    mu_table = MovieUser._meta.db_table
+    movie_table = Movie._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT mu.id FROM {mu_table} mu WHERE {where_sql})",
+            params,
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, user_key, movie_id, title, description, review) "
+            f"SELECT mu.id, 'u' || mu.user_id, mu.movie_id, m.title, "
+            f"COALESCE(m.description, ''), COALESCE(mu.review, '') "
+            f"FROM {mu_table} mu JOIN {movie_table} m ON m.id = mu.movie_id WHERE {where_sql}",
+            params,
+        )
+
+
+def sync_movieusers(movieuser_ids):
+    """
+    Re-index the given MovieUser rows (call after imports / RSS syncs).
+    """
+    if not search_available() or not movieuser_ids:
+        return
+    ensure_search_table()
+    for chunk in chunks(movieuser_ids):
+        _reindex(f"mu.id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+
+def sync_movies(movie_ids):
+    """
+    Re-index every user's row for the given movies (call after title/description changes).
+    """
+    if not search_available() or not movie_ids:
+        return
+    ensure_search_table()
+    for chunk in chunks(movie_ids):
+        _reindex(f"mu.movie_id IN ({', '.join(['%s'] * len(chunk))})", chunk)
+
+
+def remove_movieusers(movieuser_ids):
+    if not search_available() or not movieuser_ids:
+        return
+    ensure_search_table()
+    with connection.cursor() as cursor:
+        for chunk in chunks(movieuser_ids):
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})", chunk,
+            )
+
+
+def rebuild_search_index():
+    if not search_available():
+        return 0
+    # recreated rather than emptied so table options (e.g. the prefix index) follow the code
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _tables_ready.discard(str(connection.settings_dict["NAME"]))
+    ensure_search_table()
+    with connection.cursor() as cursor:
+        _reindex("1 = 1", [])
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def _snippet_sql(column):
+    return f"snippet({FTS_TABLE}, {column}, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', 12)"
+
+
+def build_match_query(text):
+    """
+    Free text -> FTS5 query over SEARCH_COLUMNS. Every word must match; the
+    last one is a prefix (if at least MIN_PREFIX_LENGTH long) so results show
+    up while the user is still typing.
+    """
+    terms = re.findall(r"\w+", text or "")[:MAX_QUERY_TERMS]
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += "*"
+    return f"{{{' '.join(SEARCH_COLUMNS)}}} : ({' '.join(quoted)})"
+
+
+def search_history(user, text, *, page=1, page_size=20):
+    """
+    Ranked search over one user's films and reviews.
+
+    Returns (results, has_more). Each result carries the MovieUser fields the
+    client shows plus a snippet around the best-matching text.
+    """
+    match = build_match_query(text)
+    if not match:
+        return [], False
+
+    offset = (page - 1) * page_size
+    if not search_available():
+        return _search_fallback(user, text, offset, page_size)
+
+    ensure_search_table()
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, {_snippet_sql(4)}, {_snippet_sql(3)} FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s OFFSET %s",
+            [f'user_key:"{_user_key(user.id)}" AND ({match})', page_size + 1, offset],
+        )
+        # prefer the review snippet, fall back to the description when only it matched
+        hits = [
+            (rowid, review if SNIPPET_OPEN in review or SNIPPET_OPEN not in description else description)
+            for rowid, review, description in cursor.fetchall()
+        ]
+
+    has_more = len(hits) > page_size
+    hits = hits[:page_size]
+    rows = {
+        r["id"]: r
+        for r in MovieUser.objects.filter(id__in=[h[0] for h in hits], user=user).values(
+            "id", "movie_id", "movie__title", "movie__release_date", "rating", "watched_date", "liked",
+        )
+    }
+    results = []
+    for rowid, snippet in hits:
+        row = rows.get(rowid)
+        if row:
+            results.append(_result(row, snippet))
+    return results, has_more
+
+
+def _search_fallback(user, text, offset, page_size):
+    # non-SQLite databases: unranked substring match, same response shape
+    qs = MovieUser.objects.filter(user=user).filter(
+        Q(movie__title__icontains=text) | Q(review__icontains=text) | Q(movie__description__icontains=text)
+    ).order_by("-watched_date", "-id")
+    rows = list(qs.values(
+        "id", "movie_id", "movie__title", "movie__release_date", "rating", "watched_date", "liked", "review",
+    )[offset:offset + page_size + 1])
+    return [_result(r, (r["review"] or "")[:120]) for r in rows[:page_size]], len(rows) > page_size
+
+
+def _result(row, snippet):
+    return {
+        "movieId": row["movie_id"],
+        "title": row["movie__title"],
+        "year": row["movie__release_date"].year if row["movie__release_date"] else None,
+        "rating": row["rating"],
+        "watchedDate": row["watched_date"],
+        "liked": row["liked"],
+        "snippet": snippet,
+    }
@@ -0,0 +1,200 @@
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+import numpy as np
+
+from ..models import (
+    Movie,
+    MovieActor,
+    MovieDirector,
+    MovieGenre,
+    MovieNeighbor,
+    MovieNeighborState,
+    MovieUser,
+)
+from ..utils.arrays import csr_from_pairs, gather_rows
+from ..utils.batching import chunks
+
+# How much each signal contributes to the blended similarity.
+SIGNAL_WEIGHTS = {
+    "cowatch": 0.55,
+    "genre": 0.15,
+    "director": 0.15,
+    "cast": 0.15,
+}
+# Only billed cast counts towards similarity; extras add noise.
+CAST_DEPTH = 10
+# Movies scored per sparse product; memory follows the shared-feature pairs in one block.
+BLOCK_SIZE = 128
+
+
+class _Signal:
+    """
+    Bipartite movie <-> feature incidence in both directions (CSR), e.g.
+    movie <-> user for co-watches or movie <-> genre.
+    """
+
+    def __init__(self, movie_idx, feature_ids, n_movies):
+        movie_idx = np.asarray(movie_idx, dtype=np.int64)
+        feature_ids = np.asarray(feature_ids, dtype=np.int64)
+        _, feature_idx = np.unique(feature_ids, return_inverse=True)
+        n_features = int(feature_idx.max()) + 1 if len(feature_idx) else 0
+
+        self.m2f_ptr, self.m2f = csr_from_pairs(movie_idx, feature_idx, n_movies)
+        self.f2m_ptr, self.f2m = csr_from_pairs(feature_idx, movie_idx, n_features)
+        self.degree = np.diff(self.m2f_ptr)
+        self.n_movies = n_movies
+
+    def shared_pairs(self, block):
+        """
+        (row, other, shared): how many features movie block[row] shares with
+        each movie it shares any with, i.e. the block's rows of M @ M.T.
+        """
+        features, owner = gather_rows(self.m2f_ptr, self.m2f, block)
+        others, other_owner = gather_rows(self.f2m_ptr, self.f2m, features)
+        keys, shared = np.unique(owner[other_owner] * self.n_movies + others, return_counts=True)
+        return keys // self.n_movies, keys % self.n_movies, shared
+
+
+def movie_signatures():
+    """
+    {movie_id: signature} summarising the watches and credits behind each movie.
+    A changed signature marks the movie's neighbour list as stale.
+    """
+    parts = {}
+    sources = [
+        ("w", MovieUser.objects.filter(watch_status="Watched")),
+        ("g", MovieGenre.objects.all()),
+        ("d", MovieDirector.objects.all()),
+        ("a", MovieActor.objects.filter(Q(casting_order__isnull=True) | Q(casting_order__lt=CAST_DEPTH))),
+    ]
+    for tag, qs in sources:
+        for movie_id, n, last in qs.values("movie_id").annotate(n=Count("id"), last=Max("id")).values_list(
+            "movie_id", "n", "last"
+        ):
+            parts.setdefault(movie_id, []).append(f"{tag}{n}.{last}")
+    return {movie_id: "|".join(p) for movie_id, p in parts.items()}
+
+
+def _load_signals(movie_ids):
+    n = len(movie_ids)
+
+    def signal(qs, feature_field):
+        pairs = np.array(list(qs.values_list("movie_id", feature_field)), dtype=np.int64).reshape(-1, 2)
+        return _Signal(np.searchsorted(movie_ids, pairs[:, 0]), pairs[:, 1], n)
+
+    return {
+        "cowatch": signal(MovieUser.objects.filter(watch_status="Watched"), "user_id"),
+        "genre": signal(MovieGenre.objects.all(), "genre_id"),
+        "director": signal(MovieDirector.objects.all(), "director_id"),
+        "cast": signal(
+            MovieActor.objects.filter(Q(casting_order__isnull=True) | Q(casting_order__lt=CAST_DEPTH)),
+            "actor_id",
+        ),
+    }
+
+
+def _top_neighbours(block, signals, n, k):
+    """
+    Best k neighbours of every movie index in `block`, as flat
+    (row, neighbour, score, rank) arrays sorted by row then rank.
+    """
+    keys, sims = [], []
+    for name, sig in signals.items():
+        rows, cols, shared = sig.shared_pairs(block)
+        deg_m, deg_o = sig.degree[block[rows]], sig.degree[cols]
+        if name == "cowatch":
+            sim = shared / np.sqrt(np.maximum(deg_m * deg_o, 1))
+        else:
+            sim = shared / np.maximum(deg_m + deg_o - shared, 1)
+        keys.append(rows * n + cols)
+        sims.append(SIGNAL_WEIGHTS[name] * sim)
+
+    keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    score = np.bincount(inverse, weights=np.concatenate(sims)).astype(np.float32)
+    rows, cols = keys // n, keys % n
+    keep = (cols != block[rows]) & (score > 0)
+    rows, cols, score = rows[keep], cols[keep], score[keep]
+
+    # best k per row: sort by row, then score, then movie; keep each row's first k
+    order = np.lexsort((cols, -score, rows))
+    rows, cols, score = rows[order], cols[order], score[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows)
+    top = rank < k
+    return rows[top], cols[top], score[top], rank[top] + 1
+
+
+def _affected_by(changed, movie_ids, signals, k):
+    """
+    Movies whose neighbour lists are refreshed along with the `changed` ones:
+    movies currently listing a changed movie (it may have moved or dropped
+    out), the changed movies' current neighbours, and their new top k (which
+    may now list the changed movie in return). Bounded by ~3k per changed
+    movie; a movie that would only pick a changed one up further down its
+    list waits for its own next change or a --full rebuild.
+    """
+    affected = set(changed)
+    for chunk in chunks(changed):
+        affected.update(MovieNeighbor.objects.filter(neighbor_id__in=chunk).values_list("movie_id", flat=True))
+        affected.update(MovieNeighbor.objects.filter(movie_id__in=chunk).values_list("neighbor_id", flat=True))
+    changed_idx = np.searchsorted(movie_ids, changed)
+    for start in range(0, len(changed_idx), BLOCK_SIZE):
+        _, cols, _, _ = _top_neighbours(changed_idx[start:start + BLOCK_SIZE], signals, len(movie_ids), k)
+        affected.update(movie_ids[cols].tolist())
+    return sorted(affected)
+
+
+def rebuild_neighbours(*, full=False, k=20, batch_size=500):
+    """
+    Recompute the MovieNeighbor table.
+
+    Incremental by default: movies whose signature changed since the last run
+    (or that were never computed) are rebuilt, together with the movies
+    around them in the current and new neighbour lists (see _affected_by).
+    Returns counters.
+    """
+    movie_ids = np.array(sorted(Movie.objects.values_list("id", flat=True)), dtype=np.int64)
+    signatures = movie_signatures()
+
+    if full:
+        changed = movie_ids.tolist()
+    else:
+        known = dict(MovieNeighborState.objects.values_list("movie_id", "signature"))
+        changed = [m for m in movie_ids.tolist() if known.get(m) != signatures.get(m, "")]
+
+    if not changed:
+        return {"movies": len(movie_ids), "changed": 0, "recomputed": 0, "neighbors_written": 0}
+
+    signals = _load_signals(movie_ids)
+    dirty = changed if full else _affected_by(changed, movie_ids, signals, k)
+    n = len(movie_ids)
+    written = 0
+    now = timezone.now()
+
+    for start in range(0, len(dirty), batch_size):
+        batch = dirty[start:start + batch_size]
+        batch_idx = np.searchsorted(movie_ids, batch)
+        rows = []
+        for offset in range(0, len(batch_idx), BLOCK_SIZE):
+            block = batch_idx[offset:offset + BLOCK_SIZE]
+            owner, cols, score, rank = _top_neighbours(block, signals, n, k)
+            rows.extend(
+                MovieNeighbor(movie_id=movie_id, neighbor_id=neighbor_id, score=value, rank=r)
+                for movie_id, neighbor_id, value, r in zip(
+                    movie_ids[block[owner]].tolist(), movie_ids[cols].tolist(), score.tolist(), rank.tolist(),
+                )
+            )
+        states = [
+            MovieNeighborState(movie_id=movie_id, signature=signatures.get(movie_id, ""), computed_at=now)
+            for movie_id in batch
+        ]
+
+        with transaction.atomic():
+            MovieNeighbor.objects.filter(movie_id__in=batch).delete()
+            MovieNeighborState.objects.filter(movie_id__in=batch).delete()
+            MovieNeighbor.objects.bulk_create(rows, batch_size=1000)
+            MovieNeighborState.objects.bulk_create(states, batch_size=1000)
+        written += len(rows)
+
+    return {"movies": len(movie_ids), "changed": len(changed), "recomputed": len(dirty), "neighbors_written": written}
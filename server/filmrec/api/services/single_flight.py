@@ -0,0 +1,250 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import SingleFlight
+
+# How long the owner may hold a key's lease before it's considered dead.
+LOCK_TIMEOUT = 300
+# How long a caller waits for an identical call that's already running before giving up.
+WAIT_TIMEOUT = 30
+# Finished rows older than this are pruned; they only serve min_interval and waiters.
+RESULT_RETENTION = 24 * 3600
+POLL_INTERVAL = 0.1
+
+# Why a caller got a result it didn't compute itself.
+JOINED = "in-flight"        # waited for an identical call that was already running
+RECENT = "recent"           # a call in the same scope finished less than min_interval ago
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+_ainflight = {}
+
+
+class SingleFlightTimeout(Exception):
+    pass
+
+
+# ---------- SingleFlight rows ----------
+# The lease and the last result live in the database, so every worker process
+# sees them whatever the cache backend.
+
+def _lookup_query(key, scope, min_interval, since):
+    now = timezone.now()
+    q = Q(scope=scope, finished_at__gt=now - timedelta(seconds=min_interval)) if min_interval else Q(pk__in=[])
+    if since is not None:
+        q |= Q(key=key, finished_at__gte=since)
+    return SingleFlight.objects.filter(q).order_by("-finished_at").values("key", "result", "finished_at")
+
+
+def _found(row, key, since):
+    # (value, shared) for a row _lookup_query matched, None if it matched nothing
+    if row is None:
+        return None
+    joined = since is not None and row["key"] == key and row["finished_at"] >= since
+    return row["result"], JOINED if joined else RECENT
+
+
+def _lease_query(key):
+    # the key's row if it's idle or its owner's lease ran out
+    return SingleFlight.objects.filter(Q(token="") | Q(locked_until__lt=timezone.now()), key=key)
+
+
+def _lease_values(token):
+    return {"token": token, "locked_until": timezone.now() + timedelta(seconds=LOCK_TIMEOUT)}
+
+
+def _finish_values(value):
+    return {"token": "", "locked_until": None, "result": value, "finished_at": timezone.now()}
+
+
+def _stale_rows():
+    return SingleFlight.objects.filter(
+        token="", finished_at__lt=timezone.now() - timedelta(seconds=RESULT_RETENTION),
+    )
+
+
+def _lookup(key, scope, min_interval, since=None):
+    return _found(_lookup_query(key, scope, min_interval, since).first(), key, since)
+
+
+def _acquire(key, scope, token):
+    SingleFlight.objects.get_or_create(key=key, defaults={"scope": scope})
+    return _lease_query(key).update(**_lease_values(token)) == 1
+
+
+def _finish(key, token, value):
+    # a no-op if the lease lapsed and another owner took the key over
+    SingleFlight.objects.filter(key=key, token=token).update(**_finish_values(value))
+    _stale_rows().delete()
+
+
+def _release(key, token):
+    # drop the lease without a result; a row that never finished goes entirely
+    SingleFlight.objects.filter(key=key, token=token, finished_at__isnull=True).delete()
+    SingleFlight.objects.filter(key=key, token=token).update(token="", locked_until=None)
+
+
+def _run_locked(key, scope, fn, min_interval, since, wait_timeout):
+    """
+    Cross-process half: take the key's lease and run fn, or wait for the
+    process holding it to publish its result. Returns (value, shared).
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait_timeout
+    while True:
+        if _acquire(key, scope, token):
+            try:
+                # another process may have finished between our check and the lease
+                found = _lookup(key, scope, min_interval, since)
+                value = found[0] if found else fn()
+            except BaseException:
+                _release(key, token)
+                raise
+            if found:
+                _release(key, token)
+                return found
+            _finish(key, token, value)
+            return value, None
+
+        found = _lookup(key, scope, min_interval, since)
+        if found:
+            return found
+        if time.monotonic() >= deadline:
+            raise SingleFlightTimeout(key)
+        time.sleep(POLL_INTERVAL)
+
+
+def single_flight(key, fn, *, scope=None, min_interval=0, wait_timeout=WAIT_TIMEOUT):
+    """
+    Run fn() once for concurrent callers with the same key and hand them all
+    its result. Returns (value, shared): shared is None for the caller that
+    ran fn, JOINED for callers that waited on it, RECENT when a call in the
+    same scope (default: the key itself) finished less than min_interval
+    seconds ago and its result was returned instead of running again.
+
+    Callers in one process wait on the first caller's Future; other processes
+    are serialized by a lease on the key's SingleFlight row and read its
+    result from there. fn's result must be JSON-serializable. Exceptions
+    aren't stored: they reach the in-process waiters and the next caller runs
+    fn again. Waiting callers give up with SingleFlightTimeout after wait_timeout.
+    """
+    scope = scope or key
+    since = timezone.now()
+    found = _lookup(key, scope, min_interval)
+    if found:
+        return found
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight[key] = future
+
+    if not owner:
+        try:
+            value, _ = future.result(timeout=wait_timeout)
+        except FutureTimeout:
+            raise SingleFlightTimeout(key)
+        return value, JOINED
+
+    try:
+        result = _run_locked(key, scope, fn, min_interval, since, wait_timeout)
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+# ---------- async ----------
+async def _alookup(key, scope, min_interval, since=None):
+    return _found(await _lookup_query(key, scope, min_interval, since).afirst(), key, since)
+
+
+async def _aacquire(key, scope, token):
+    await SingleFlight.objects.aget_or_create(key=key, defaults={"scope": scope})
+    return await _lease_query(key).aupdate(**_lease_values(token)) == 1
+
+
+async def _afinish(key, token, value):
+    await SingleFlight.objects.filter(key=key, token=token).aupdate(**_finish_values(value))
+    await _stale_rows().adelete()
+
+
+async def _arelease(key, token):
+    await SingleFlight.objects.filter(key=key, token=token, finished_at__isnull=True).adelete()
+    await SingleFlight.objects.filter(key=key, token=token).aupdate(token="", locked_until=None)
+
+
+async def asingle_flight(key, fn, *, scope=None, min_interval=0, wait_timeout=WAIT_TIMEOUT):
+    """
+    single_flight() for coroutine functions: callers on the same event loop
+    await one asyncio Future, other threads / processes go through the same
+    SingleFlight rows (and share results with the sync version).
+    """
+    scope = scope or key
+    since = timezone.now()
+    found = await _alookup(key, scope, min_interval)
+    if found:
+        return found
+
+    loop = asyncio.get_running_loop()
+    future = _ainflight.get((loop, key))
+    if future is not None:
+        try:
+            value, _ = await asyncio.wait_for(asyncio.shield(future), wait_timeout)
+        except asyncio.TimeoutError:
+            raise SingleFlightTimeout(key)
+        return value, JOINED
+    future = loop.create_future()
+    _ainflight[(loop, key)] = future
+
+    try:
+        result = await _arun_locked(key, scope, fn, min_interval, since, wait_timeout)
+    except Exception as exc:
+        future.set_exception(exc)
+        # nobody may be waiting; don't let asyncio report it as never retrieved
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _ainflight.pop((loop, key), None)
+
+
+async def _arun_locked(key, scope, fn, min_interval, since, wait_timeout):
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait_timeout
+    while True:
+        if await _aacquire(key, scope, token):
+            try:
+                found = await _alookup(key, scope, min_interval, since)
+                value = found[0] if found else await fn()
+            except BaseException:
+                await _arelease(key, token)
+                raise
+            if found:
+                await _arelease(key, token)
+                return found
+            await _afinish(key, token, value)
+            return value, None
+
+        found = await _alookup(key, scope, min_interval, since)
+        if found:
+            return found
+        if time.monotonic() >= deadline:
+            raise SingleFlightTimeout(key)
+        await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,176 @@
+from datetime import date
+
+import numpy as np
+from django.db.models import Q
+
+from ..models import Movie
+from ..utils.arrays import csr_from_pairs, gather_rows
+from ..utils.titles import normalize_title, parse_year, sequel_numbers, title_trigrams
+
+DEFAULT_THRESHOLD = 0.6
+YEAR_TOLERANCE = 1
+
+# Trigrams shared by a large slice of the catalog ("  t", "the", ...) carry
+# almost no signal but dominate candidate generation, so they are ignored on
+# both sides of the similarity.
+STOPGRAM_FRACTION = 0.02
+STOPGRAM_MIN_DF = 500
+
+
+class TitleTrigramIndex:
+    """
+    In-memory trigram index over normalized Movie titles (+ release year).
+
+    match_many() resolves a whole batch of (title, year) lookups in one
+    vectorized pass: the postings of every query trigram are gathered at once
+    and overlap counts come from a single np.unique over (query, movie) keys.
+
+    entries are (movie id, title, year, letterboxd_uri) tuples.
+    """
+
+    def __init__(self, entries):
+        movie_ids, years, numbers, uris = [], [], [], []
+        pair_movies, pair_grams = [], []
+        self.vocab = {}
+        # sequel numbers / URIs as small ints, so candidates can be ruled out with array compares
+        self.number_ids = {frozenset(): 0}
+        self.uri_ids = {None: 0}
+        for movie_id, title, year, uri in entries:
+            normalized = normalize_title(title)
+            grams = title_trigrams(normalized)
+            if not grams:
+                continue
+            m = len(movie_ids)
+            movie_ids.append(movie_id)
+            years.append(year or 0)
+            numbers.append(self.number_ids.setdefault(sequel_numbers(normalized), len(self.number_ids)))
+            uris.append(self.uri_ids.setdefault(uri, len(self.uri_ids)))
+            for g in grams:
+                pair_movies.append(m)
+                pair_grams.append(self.vocab.setdefault(g, len(self.vocab)))
+
+        self.movie_ids = np.array(movie_ids, dtype=np.int64)
+        self.years = np.array(years, dtype=np.int64)
+        self.numbers = np.array(numbers, dtype=np.int64)
+        self.uris = np.array(uris, dtype=np.int64)
+
+        pair_movies = np.array(pair_movies, dtype=np.int64)
+        pair_grams = np.array(pair_grams, dtype=np.int64)
+        df = np.bincount(pair_grams, minlength=len(self.vocab))
+        self.stopgrams = df > max(STOPGRAM_MIN_DF, int(len(movie_ids) * STOPGRAM_FRACTION))
+        keep = ~self.stopgrams[pair_grams]
+
+        self.sizes = np.bincount(pair_movies[keep], minlength=len(movie_ids))
+        self.postings_ptr, self.postings = csr_from_pairs(pair_grams[keep], pair_movies[keep], len(self.vocab))
+
+    @classmethod
+    def from_movies(cls, queryset=None):
+        if queryset is None:
+            queryset = Movie.objects.all()
+        rows = queryset.values_list("id", "title", "release_date", "letterboxd_uri").iterator()
+        return cls(
+            (movie_id, title, release_date.year if release_date else None, uri)
+            for movie_id, title, release_date, uri in rows
+        )
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    def match_many(self, queries, *, uris=None, threshold=DEFAULT_THRESHOLD, year_tolerance=YEAR_TOLERANCE):
+        """
+        queries: iterable of (title, year). Returns a list of Movie ids (or None)
+        aligned with the input, using trigram Jaccard similarity >= threshold.
+
+        Candidates are ruled out when the sequel numbers in the titles differ
+        ("Scream" vs "Scream 2"), when both sides have a year more than
+        year_tolerance apart, or when both sides have a canonical Letterboxd
+        URI (`uris`, aligned with queries) and they differ.
+        """
+        queries = list(queries)
+        result = [None] * len(queries)
+        if not queries or not len(self):
+            return result
+        uris = list(uris) if uris is not None else [None] * len(queries)
+
+        q_idx, q_grams, q_sizes, q_years, q_numbers, q_uris = [], [], [], [], [], []
+        for i, (title, year) in enumerate(queries):
+            normalized = normalize_title(title)
+            grams = title_trigrams(normalized)
+            size = 0
+            for g in grams:
+                gid = self.vocab.get(g)
+                if gid is None:
+                    size += 1           # unseen trigram: counts against similarity
+                elif not self.stopgrams[gid]:
+                    size += 1
+                    q_idx.append(i)
+                    q_grams.append(gid)
+            q_sizes.append(size)
+            q_years.append(parse_year(year) or 0)
+            # unseen values get -1: different from every movie's
+            q_numbers.append(self.number_ids.get(sequel_numbers(normalized), -1))
+            q_uris.append(self.uri_ids.get(uris[i], -1))
+        if not q_idx:
+            return result
+
+        q_idx = np.array(q_idx, dtype=np.int64)
+        q_sizes = np.array(q_sizes, dtype=np.int64)
+        q_years = np.array(q_years, dtype=np.int64)
+        q_numbers = np.array(q_numbers, dtype=np.int64)
+        q_uris = np.array(q_uris, dtype=np.int64)
+        movies, owner = gather_rows(self.postings_ptr, self.postings, q_grams)
+
+        n = len(self.movie_ids)
+        keys, shared = np.unique(q_idx[owner] * n + movies, return_counts=True)
+        qi, mi = keys // n, keys % n
+
+        sim = shared / (q_sizes[qi] + self.sizes[mi] - shared)
+        both_dated = (q_years[qi] > 0) & (self.years[mi] > 0)
+        sim[both_dated & (np.abs(q_years[qi] - self.years[mi]) > year_tolerance)] = 0.0
+        sim[q_numbers[qi] != self.numbers[mi]] = 0.0
+        both_linked = (q_uris[qi] != 0) & (self.uris[mi] != 0)
+        sim[both_linked & (q_uris[qi] != self.uris[mi])] = 0.0
+
+        # best candidate per query: sort by query, then similarity descending
+        order = np.lexsort((-sim, qi))
+        qi, mi, sim = qi[order], mi[order], sim[order]
+        first = np.flatnonzero(np.r_[True, qi[1:] != qi[:-1]])
+        for q, m, score in zip(qi[first].tolist(), mi[first].tolist(), sim[first].tolist()):
+            if score >= threshold:
+                result[q] = int(self.movie_ids[m])
+        return result
+
+
+def candidate_movies(queries, *, year_tolerance=YEAR_TOLERANCE):
+    """
+    Movies that can match any of `queries`: with a year inside the tolerance of
+    some query's year, or undated. Only undated queries need the whole catalog.
+    """
+    years = {parse_year(year) for _, year in queries}
+    if None in years:
+        return Movie.objects.all()
+    # date ranges rather than __year, so the release_date index is used
+    condition = Q(release_date__isnull=True)
+    start = end = None
+    for year in sorted(years):
+        lo, hi = year - year_tolerance, year + year_tolerance
+        if start is not None and lo <= end + 1:
+            end = max(end, hi)
+            continue
+        if start is not None:
+            condition |= Q(release_date__gte=date(start, 1, 1), release_date__lt=date(end + 1, 1, 1))
+        start, end = lo, hi
+    condition |= Q(release_date__gte=date(start, 1, 1), release_date__lt=date(end + 1, 1, 1))
+    return Movie.objects.filter(condition)
+
+
+def match_titles(queries, *, uris=None, **options):
+    """
+    match_many() against an index over candidate_movies() only, so a batch of
+    lookups reads the films from a few release years instead of the catalog.
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+    index = TitleTrigramIndex.from_movies(candidate_movies(queries))
+    return index.match_many(queries, uris=uris, **options)
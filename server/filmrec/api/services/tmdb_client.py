@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from concurrent.futures import Future
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+
+from ..utils.titles import normalize_title
+from .http_cache import ResponseCache, normalize_url
+
+MAX_RETRIES = 3
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+class TMDbError(Exception):
+    pass
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`.
+    acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def default_response_cache():
+    """
+    Process-wide ResponseCache from settings, or None when caching is disabled.
+    """
+    global _default_cache
+    if not settings.TMDB_CACHE_PATH:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.path != str(settings.TMDB_CACHE_PATH):
+            _default_cache = ResponseCache(
+                settings.TMDB_CACHE_PATH,
+                ttls=settings.TMDB_CACHE_TTLS,
+                default_ttl=settings.TMDB_CACHE_DEFAULT_TTL,
+                max_entries=settings.TMDB_CACHE_MAX_ENTRIES,
+            )
+        return _default_cache
+
+
+def is_same_film(result, title, year=None):
+    wanted = normalize_title(title)
+    if wanted not in {normalize_title(result.get("title")), normalize_title(result.get("original_title"))}:
+        return False
+    released = (result.get("release_date") or "")[:4]
+    return not (year and released.isdigit()) or abs(int(released) - year) <= 1
+
+
+class TMDbClient:
+    """
+    Minimal TMDb v3 client shared by enrichment worker threads.
+
+    - fresh responses come from the on-disk ResponseCache without touching
+      the network or the rate limiter; stale ones are revalidated
+    - every network call takes a token from the rate limiter first
+    - identical in-flight GETs are coalesced: later callers wait on the first
+      caller's Future instead of issuing their own request
+    """
+
+    def __init__(self, *, base_url=None, api_key=None, access_token=None,
+                 requests_per_second=None, timeout=None, cache=False):
+        self.base_url = (base_url or settings.TMDB_API_BASE_URL).rstrip("/")
+        self.api_key = settings.TMDB_API_KEY if api_key is None else api_key
+        self.access_token = settings.TMDB_READ_ACCESS_TOKEN if access_token is None else access_token
+        self.timeout = timeout or settings.TMDB_TIMEOUT_SECONDS
+        self.limiter = TokenBucket(requests_per_second or settings.TMDB_REQUESTS_PER_SECOND)
+        # cache=False -> settings default, cache=None -> no caching
+        self.cache = default_response_cache() if cache is False else cache
+
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.requests_sent = 0
+        self.requests_coalesced = 0
+
+    def build_url(self, path, params=None):
+        params = dict(params or {})
+        if self.api_key:
+            params["api_key"] = self.api_key
+        query = urlencode(sorted(params.items()))
+        return f"{self.base_url}/{path.lstrip('/')}" + (f"?{query}" if query else "")
+
+    def get(self, path, params=None):
+        """
+        GET a JSON resource. Returns the decoded body, or None on 404.
+        """
+        url = self.build_url(path, params)
+        key = normalize_url(url)
+        cached = self.cache.lookup(key) if self.cache else None
+        if cached and cached.fresh:
+            return self._decode(cached.status, cached.body)
+
+        with self._inflight_lock:
+            future = self._inflight.get(url)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[url] = future
+            else:
+                self.requests_coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._fetch(url, path, key, cached)
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(url, None)
+
+    @staticmethod
+    def _decode(status, body):
+        if status == 404 or not body:
+            return None
+        return json.loads(body.decode("utf-8") if isinstance(body, bytes) else body)
+
+    def _fetch(self, url, path, key, cached=None):
+        headers = {"Accept": "application/json"}
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        if cached:
+            headers.update(cached.conditional_headers())
+
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.acquire()
+            with self._counter_lock:
+                self.requests_sent += 1
+            try:
+                with urlopen(Request(url, headers=headers), timeout=self.timeout) as resp:
+                    body = resp.read()
+                    if self.cache:
+                        self.cache.store(
+                            key, path, resp.status, body,
+                            resp.headers.get("ETag"), resp.headers.get("Last-Modified"),
+                        )
+                    return self._decode(resp.status, body)
+            except HTTPError as exc:
+                if exc.code == 304 and cached:
+                    self.cache.revalidated(key, path)
+                    return self._decode(cached.status, cached.body)
+                if exc.code == 404:
+                    # remember misses too, so failed lookups aren't repeated every run
+                    if self.cache:
+                        self.cache.store(key, path, 404, None)
+                    return None
+                if exc.code == 429 and attempt < MAX_RETRIES:
+                    time.sleep(float(exc.headers.get("Retry-After") or 1))
+                    continue
+                raise TMDbError(f"TMDb request failed ({exc.code}): {url}") from exc
+            except (URLError, TimeoutError, ValueError) as exc:
+                if attempt < MAX_RETRIES:
+                    time.sleep(0.5 * (attempt + 1))
+                    continue
+                raise TMDbError(f"TMDb request failed: {exc}") from exc
+
+    # ---------- endpoints ----------
+    def search_movie(self, title, year=None):
+        """
+        Best search hit that is plausibly the same film: same normalized title
+        (or original title) and, when both are known, a release year within
+        one of `year`. None rather than whatever TMDb ranked first.
+        """
+        params = {"query": title, "include_adult": "false"}
+        if year:
+            params["year"] = year
+        data = self.get("/search/movie", params) or {}
+        for result in data.get("results") or []:
+            if is_same_film(result, title, year):
+                return result
+        return None
+
+    def movie_details(self, tmdb_id):
+        # details and credits in one round trip
+        return self.get(f"/movie/{tmdb_id}", {"append_to_response": "credits"})
@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Movie
+from ..utils.dates import parse_iso_date
+from .credits_writer import image_url, write_credits_bulk
+from .search_index import sync_movies
+from .tmdb_client import TMDbClient, TMDbError
+
+MOVIE_FIELDS = [
+    "tmdb_id", "description", "release_date", "avg_rating", "budget", "revenue",
+    "runtime", "language", "country", "poster_url", "enrichment_attempts", "enrichment_retry_at", "enriched_at",
+]
+
+
+def movies_missing_metadata(queryset=None, now=None):
+    """
+    Movies still missing metadata that TMDb hasn't been asked about
+    successfully yet, minus those whose last failed lookup is still backing
+    off (see mark_failed). A match without a runtime counts as enriched.
+    """
+    if queryset is None:
+        queryset = Movie.objects.all()
+    now = now or timezone.now()
+    return queryset.filter(
+        Q(tmdb_id__isnull=True) | Q(runtime__isnull=True),
+        Q(enriched_at__isnull=True),
+        Q(enrichment_retry_at__isnull=True) | Q(enrichment_retry_at__lte=now),
+    ).order_by("id")
+
+
+def retry_delay(attempts):
+    base = settings.TMDB_RETRY_BACKOFF_SECONDS
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), settings.TMDB_RETRY_MAX_BACKOFF_SECONDS))
+
+
+def mark_failed(movies, now=None):
+    """
+    Record a failed lookup (nothing matched, a TMDb error, or a TMDb id owned
+    by another row) so the movie is skipped until its backoff runs out.
+    """
+    if not movies:
+        return
+    now = now or timezone.now()
+    for movie in movies:
+        movie.enrichment_attempts += 1
+        movie.enrichment_retry_at = now + retry_delay(movie.enrichment_attempts)
+    Movie.objects.bulk_update(movies, ["enrichment_attempts", "enrichment_retry_at"], batch_size=500)
+
+
+def fetch_movie(client, movie):
+    """
+    Look a Movie up on TMDb (by tmdb_id, else by title + year).
+    Returns the details payload with credits, or None if nothing matched.
+    """
+    tmdb_id = movie.tmdb_id
+    if not tmdb_id:
+        hit = client.search_movie(movie.title, movie.release_date.year if movie.release_date else None)
+        if not hit:
+            return None
+        tmdb_id = hit["id"]
+    return client.movie_details(tmdb_id)
+
+
+def _apply_details(movie, details, now):
+    movie.tmdb_id = details.get("id") or movie.tmdb_id
+    movie.description = details.get("overview") or movie.description
+    movie.release_date = movie.release_date or _parse_release_date(details.get("release_date"))
+    movie.avg_rating = details.get("vote_average", movie.avg_rating)
+    movie.budget = details.get("budget") or movie.budget
+    movie.revenue = details.get("revenue") or movie.revenue
+    movie.runtime = details.get("runtime") or movie.runtime
+    movie.language = (details.get("original_language") or movie.language or "")[:50] or None
+    countries = details.get("production_countries") or []
+    if countries:
+        movie.country = (countries[0].get("name") or "")[:100] or movie.country
+    movie.poster_url = image_url(details.get("poster_path")) or movie.poster_url
+    movie.enrichment_attempts = 0
+    movie.enrichment_retry_at = None
+    movie.enriched_at = now
+
+
+def _parse_release_date(value):
+    try:
+        return parse_iso_date(value)
+    except ValueError:
+        return None
+
+
+def write_batch(results):
+    """
+    Persist a batch of (movie, details) pairs in one transaction.
+    Returns the number of movies updated.
+    """
+    if not results:
+        return 0
+
+    # a TMDb id already owned by another row means a duplicate Movie; leave it alone
+    wanted = {details["id"] for _, details in results if details.get("id")}
+    taken = dict(Movie.objects.filter(tmdb_id__in=wanted).values_list("tmdb_id", "id"))
+
+    now = timezone.now()
+    updated, duplicates = [], []
+    for movie, details in results:
+        owner = taken.get(details.get("id"))
+        if owner is not None and owner != movie.pk:
+            duplicates.append(movie)
+            continue
+        _apply_details(movie, details, now)
+        taken[movie.tmdb_id] = movie.pk
+        updated.append((movie, details))
+
+    with transaction.atomic():
+        Movie.objects.bulk_update([m for m, _ in updated], MOVIE_FIELDS, batch_size=500)
+        write_credits_bulk(updated)
+        sync_movies([m.pk for m, _ in updated])
+        mark_failed(duplicates, now)
+    return len(updated)
+
+
+def enrich_movies(movies=None, *, client=None, max_workers=None, batch_size=50, limit=None):
+    """
+    Fetch TMDb details + credits for movies missing metadata.
+
+    Lookups run on a bounded thread pool; the client rate-limits and coalesces
+    requests. Results are written in batches of `batch_size` as they complete.
+    Returns counters.
+    """
+    client = client or TMDbClient()
+    movies = movies_missing_metadata() if movies is None else movies
+    if limit:
+        movies = movies[:limit]
+    movies = list(movies)
+
+    counters = {"movies_considered": len(movies), "movies_enriched": 0, "not_found": 0, "errors": 0}
+    pending, failed = [], []
+    with ThreadPoolExecutor(max_workers=max_workers or settings.TMDB_MAX_WORKERS) as pool:
+        futures = {pool.submit(fetch_movie, client, movie): movie for movie in movies}
+        for future in as_completed(futures):
+            try:
+                details = future.result()
+            except TMDbError:
+                counters["errors"] += 1
+                failed.append(futures[future])
+                continue
+            if not details:
+                counters["not_found"] += 1
+                failed.append(futures[future])
+                continue
+            pending.append((futures[future], details))
+            if len(pending) >= batch_size:
+                counters["movies_enriched"] += write_batch(pending)
+                pending = []
+    counters["movies_enriched"] += write_batch(pending)
+    mark_failed(failed)
+
+    counters["requests_sent"] = client.requests_sent
+    counters["requests_coalesced"] = client.requests_coalesced
+    if client.cache:
+        stats = client.cache.stats()
+        counters["cache_hits"] = stats["hits"]
+        counters["cache_revalidated"] = stats["revalidated"]
+        counters["cache_hit_rate"] = round(stats["hit_rate"], 3)
+    return counters
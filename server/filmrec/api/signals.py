@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+
+
+@receiver(pre_save, sender=get_user_model())
+def revoke_tokens_on_credential_change(sender, instance, **kwargs):
+    # deactivation or a new password revokes every token issued before it
+    if instance.pk is None:
+        return
+    before = sender.objects.filter(pk=instance.pk).values("is_active", "password", "token_version").first()
+    if before is None or before["token_version"] != instance.token_version:
+        return
+    if (before["is_active"] and not instance.is_active) or before["password"] != instance.password:
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def drop_cached_jwt_user(sender, instance, **kwargs):
+    # deactivation, token version bumps and profile edits are picked up on the next request
+    invalidate_cached_user(instance)
@@ -1,3 +1,1044 @@
-from django.test import TestCase
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .db_routers import (
+    RECENT_WRITE_COOKIE, _read_alias, mark_recent_write, recent_write_middleware, use_read_replica,
+)
+from .models import (
+    Actor, CachedImage, Director, Genre, Movie, MovieActor, MovieDirector, MovieGenre, MovieNeighbor, MovieUser,
+    Recommendation, SingleFlight, User,
+)
+from .renderers import ORJSONRenderer
+from .serializer import HistoryEntrySerializer
+from .services.loadtest import (
+    FILM_URI_PREFIX, SCENARIOS, ClientTransport, FixtureFeedServer, clear_dataset, parse_mix, run_load, seed_dataset,
+    seeded_accounts, seeded_films,
+)
+from .services.movie_dedupe import dedupe_movies
+from .services.poster_cache import get_image
+from .services import letterboxd_import
+from .services.letterboxd_import import (
+    FeedUnavailable, fetch_feed, resolve_rss_movies, run_letterboxd_import,
+)
+from .services.batch_scoring import iter_scored_blocks, score_all_users
+from .services.import_profile import best_of, heavy_modules_loaded, measure_boot
+from .services.recommender import ALSRecommender, Interactions, ItemKNNRecommender, load_interactions
+from .services.search_index import build_match_query, rebuild_search_index, search_history, sync_movieusers
+from .services.credits_writer import write_credits_bulk
+from .services.global_stats import compute_global_stats, global_stats_for
+from .services.http_cache import ResponseCache, normalize_url
+from .services.tmdb_client import TMDbClient, TMDbError
+from .services.tmdb_enrichment import enrich_movies, movies_missing_metadata
+from .services.title_matcher import TitleTrigramIndex, match_titles
+from .services.similar_films import rebuild_neighbours
+from .services.single_flight import JOINED, RECENT, SingleFlightTimeout, single_flight
+from .services.recommender_eval import generate_synthetic_interactions, ranking_metrics, time_split
+from .views import async_views
+from .views.auth_views import get_user_tokens
+
+
+class StubServer:
+    """
+    Local HTTP server for code that talks to TMDb, image hosts or RSS feeds.
+    `respond(path, query, headers)` returns (status, headers, body); every
+    request path is recorded in `requests`.
+    """
+
+    def __init__(self, respond):
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                server.requests.append(parts.path)
+                status, headers, body = respond(parts.path, parse_qs(parts.query), self.headers)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = "http://127.0.0.1:%d" % self._server.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def json_response(payload, status=200, **headers):
+    return status, {"Content-Type": "application/json", **headers}, json.dumps(payload).encode()
+
+
+# ---------- recommender ----------
+class RecommenderTests(SimpleTestCase):
+    def setUp(self):
+        rows = generate_synthetic_interactions(n_users=120, n_movies=80, mean_per_user=12, seed=1)
+        self.inter = Interactions.from_pairs([r[0] for r in rows], [r[1] for r in rows])
+
+    def test_ranking_metrics(self):
+        metrics = ranking_metrics([1, 2, 3, 4], {2, 9}, k=4)
+        self.assertEqual(metrics["precision"], 0.25)
+        self.assertEqual(metrics["recall"], 0.5)
+        self.assertAlmostEqual(metrics["ndcg"], (1 / np.log2(3)) / (1 + 1 / np.log2(3)))
+
+    def test_time_split_holds_out_latest_unseen_films(self):
+        rows = generate_synthetic_interactions(n_users=50, n_movies=40, seed=2)
+        train, test_sets, cutoff = time_split(rows, holdout=0.2)
+        for row, items in test_sets.items():
+            self.assertTrue(items)
+            self.assertFalse(items & set(train.items_for(row).tolist()))
+
+    def test_itemknn_matches_dense_cosine(self):
+        model = ItemKNNRecommender(neighbours=5, block_size=7).fit(self.inter)
+        x = self.inter.dense_rows(np.arange(self.inter.n_users))
+        co = x.T @ x
+        norms = np.sqrt(np.diag(co))
+        norms[norms == 0] = 1
+        sim = co / norms[:, None] / norms[None, :]
+        np.fill_diagonal(sim, 0)
+        expected = -np.sort(-sim, axis=1)[:, :5]
+        np.testing.assert_allclose(model.neighbour_weights, expected, rtol=1e-5)
+        # scoring sums the pruned similarities of watched films
+        pruned = np.zeros_like(sim)
+        np.put_along_axis(pruned, model.neighbour_table, model.neighbour_weights, axis=1)
+        rows = np.arange(10)
+        np.testing.assert_allclose(model.score_block(self.inter, rows), x[rows] @ pruned, rtol=1e-5)
+        self.assertEqual(model.index_nbytes, model.neighbour_table.nbytes + model.neighbour_weights.nbytes)
+
+    def test_recommendations_exclude_seen_films(self):
+        for model in (ItemKNNRecommender(neighbours=10), ALSRecommender(factors=4, iterations=3)):
+            top, scores = model.fit(self.inter).recommend_block(self.inter, np.arange(20), k=5)
+            self.assertEqual(top.shape, (20, 5))
+            for row, items in enumerate(top.tolist()):
+                self.assertFalse(set(items) & set(self.inter.items_for(row).tolist()))
+            self.assertTrue((np.diff(scores, axis=1) <= 0).all())
+
+
+# ---------- batch scoring ----------
+class BatchScoringTests(TestCase):
+    def test_process_pool_matches_in_process_scoring(self):
+        rows = generate_synthetic_interactions(n_users=60, n_movies=50, mean_per_user=8, seed=3)
+        inter = Interactions.from_pairs([r[0] for r in rows], [r[1] for r in rows])
+        model = ItemKNNRecommender(neighbours=10).fit(inter)
+        serial = {start: top for start, top, _ in iter_scored_blocks(model, inter, k=5, processes=1, block_size=16)}
+        pooled = {start: top for start, top, _ in iter_scored_blocks(model, inter, k=5, processes=2, block_size=16)}
+        self.assertEqual(serial.keys(), pooled.keys())
+        for start in serial:
+            np.testing.assert_array_equal(serial[start], pooled[start])
+
+    def test_score_all_users_replaces_recommendations(self):
+        users = [User.objects.create(username=f"u{i}") for i in range(3)]
+        movies = [Movie.objects.create(title=f"Film {i}") for i in range(6)]
+        for user, picks in zip(users, ([0, 1, 2], [1, 2, 3], [2, 3, 4])):
+            MovieUser.objects.bulk_create(
+                MovieUser(user=user, movie=movies[i], watch_status="Watched") for i in picks
+            )
+        Recommendation.objects.create(user=users[0], movie=movies[5], score=1, rank=1,
+                                      model_name="stale", generated_at="2020-01-01T00:00Z")
+        inter = load_interactions()
+        counters = score_all_users(ItemKNNRecommender().fit(inter), inter, k=2, processes=1)
+
+        self.assertEqual(counters["users_scored"], 3)
+        self.assertFalse(Recommendation.objects.filter(model_name="stale").exists())
+        watched = set(MovieUser.objects.values_list("user_id", "movie_id"))
+        recs = list(Recommendation.objects.values_list("user_id", "movie_id", "rank"))
+        self.assertTrue(recs)
+        self.assertFalse({(u, m) for u, m, _ in recs} & watched)
+
+    def test_score_all_users_commits_each_block_separately(self):
+        users = [User.objects.create(username=f"u{i}") for i in range(4)]
+        movies = [Movie.objects.create(title=f"Film {i}") for i in range(6)]
+        for n, user in enumerate(users):
+            MovieUser.objects.bulk_create(
+                MovieUser(user=user, movie=movies[i], watch_status="Watched") for i in (n, n + 1)
+            )
+        inter = load_interactions()
+        model = ItemKNNRecommender().fit(inter)
+        with CaptureQueriesContext(connection) as ctx:
+            score_all_users(model, inter, k=2, processes=1, block_size=2)
+        # one savepoint per block inside the test's transaction, not one around the run
+        savepoints = [q for q in ctx.captured_queries if q["sql"].startswith("SAVEPOINT")]
+        self.assertEqual(len(savepoints), 2)
+
+
+# ---------- similar films ----------
+class SimilarFilmsTests(TestCase):
+    def setUp(self):
+        self.drama, self.war = Genre.objects.create(name="Drama"), Genre.objects.create(name="War")
+        self.a, self.b, self.c = (Movie.objects.create(title=t) for t in ("A", "B", "C"))
+        MovieGenre.objects.bulk_create([
+            MovieGenre(movie=self.a, genre=self.drama), MovieGenre(movie=self.a, genre=self.war),
+            MovieGenre(movie=self.b, genre=self.drama),
+        ])
+
+    def neighbours(self, movie):
+        return list(MovieNeighbor.objects.filter(movie=movie).order_by("rank").values_list("neighbor_id", flat=True))
+
+    def test_incremental_rebuild_refreshes_lists_that_gain_a_candidate(self):
+        rebuild_neighbours()
+        self.assertEqual(self.neighbours(self.a), [self.b.id])
+
+        # only C's inputs change, but A's list must now rank C (shares both genres) first
+        MovieGenre.objects.bulk_create([
+            MovieGenre(movie=self.c, genre=self.drama), MovieGenre(movie=self.c, genre=self.war),
+        ])
+        counters = rebuild_neighbours()
+        self.assertEqual(counters["changed"], 1)
+        self.assertEqual(self.neighbours(self.a), [self.c.id, self.b.id])
+        self.assertEqual(rebuild_neighbours()["recomputed"], 0)
+
+    def test_incremental_rebuild_stays_near_the_changed_movie(self):
+        films = [Movie.objects.create(title=f"Drama {i}") for i in range(20)]
+        pairs = [Genre.objects.create(name=f"Pair {i}") for i in range(10)]
+        MovieGenre.objects.bulk_create(MovieGenre(movie=m, genre=self.drama) for m in films)
+        MovieGenre.objects.bulk_create(MovieGenre(movie=m, genre=pairs[i // 2]) for i, m in enumerate(films))
+        rebuild_neighbours(k=2)
+
+        # every drama shares a genre with films[0], but only the lists around it are redone
+        MovieGenre.objects.create(movie=films[0], genre=self.war)
+        counters = rebuild_neighbours(k=2)
+        self.assertEqual(counters["changed"], 1)
+        self.assertLessEqual(counters["recomputed"], 1 + 3 * 2)
+        self.assertEqual(set(self.neighbours(films[0])), {self.a.id, films[1].id})
+
+    def test_similar_endpoint(self):
+        rebuild_neighbours()
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="viewer"))
+        response = client.get(f"/api/movies/{self.a.id}/similar/?k=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()["similar"]], [self.b.id])
+        self.assertEqual(client.get("/api/movies/999999/similar/").status_code, 404)
+
+
+# ---------- history search ----------
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="searcher")
+        other = User.objects.create(username="other")
+        heat = Movie.objects.create(title="Heat", description="A heist in Los Angeles.")
+        dune = Movie.objects.create(title="Dune", description="Spice and sandworms.")
+        MovieUser.objects.create(user=self.user, movie=heat, watch_status="Watched", review="Best shootout ever")
+        MovieUser.objects.create(user=self.user, movie=dune, watch_status="Watched", review="")
+        MovieUser.objects.create(user=other, movie=dune, watch_status="Watched", review="shootout? no")
+        rebuild_search_index()
+
+    def titles(self, text):
+        results, _ = search_history(self.user, text)
+        return [r["title"] for r in results]
+
+    def test_matches_title_description_and_review_of_own_rows(self):
+        self.assertEqual(self.titles("dune"), ["Dune"])
+        self.assertEqual(self.titles("sandw"), ["Dune"])
+        self.assertEqual(self.titles("shootout"), ["Heat"])
+
+    def test_terms_do_not_match_user_key_and_short_prefixes_are_whole_words(self):
+        self.assertEqual(self.titles(f"u{self.user.id}"), [])
+        self.assertEqual(build_match_query("he"), '{title description review} : ("he")')
+        self.assertEqual(self.titles("he"), [])
+
+    def test_sync_picks_up_new_reviews(self):
+        row = MovieUser.objects.get(user=self.user, movie__title="Dune")
+        row.review = "Hypnotic"
+        row.save()
+        sync_movieusers([row.id])
+        self.assertEqual(self.titles("hypnotic"), ["Dune"])
+
+    def test_prefix_index_matches_min_prefix_length(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'api_history_fts'")
+            self.assertIn("prefix = '3'", cursor.fetchone()[0])
+
+
+# ---------- fuzzy title matching ----------
+def rss_entry(title, year, link):
+    return SimpleNamespace(
+        title=f"{title}, {year}", link=link, letterboxd_filmtitle=title, letterboxd_filmyear=str(year),
+        published_parsed=time.gmtime(0), published="",
+    )
+
+
+class TitleMatcherTests(TestCase):
+    def setUp(self):
+        self.scream = Movie.objects.create(
+            title="Scream", release_date=date(1996, 12, 20), letterboxd_uri="https://letterboxd.com/film/scream/",
+        )
+
+    def test_sequels_do_not_match_the_original(self):
+        self.assertEqual(match_titles([("Scream 2", 1997), ("Scream", 1996), ("scream!", None)]),
+                         [None, self.scream.id, self.scream.id])
+        rocky = Movie.objects.create(title="Rocky II", release_date=date(1979, 1, 1))
+        self.assertEqual(match_titles([("Rocky II", 1979), ("Rocky", 1979)]), [rocky.id, None])
+
+    def test_candidates_linked_to_another_film_are_rejected(self):
+        index = TitleTrigramIndex.from_movies()
+        self.assertEqual(index.match_many([("Scream", 1996)], uris=["https://letterboxd.com/film/scream-1981/"]),
+                         [None])
+        self.assertEqual(index.match_many([("Scream", 1996)], uris=["https://letterboxd.com/film/scream/"]),
+                         [self.scream.id])
+
+    def test_rss_entry_with_its_own_film_uri_is_never_fuzzy_matched(self):
+        [(movie, created)] = resolve_rss_movies([
+            rss_entry("Scream 2", 1997, "https://letterboxd.com/someone/film/scream-2/"),
+        ])
+        self.assertTrue(created)
+        self.assertNotEqual(movie.id, self.scream.id)
+        self.assertEqual(movie.letterboxd_uri, "https://letterboxd.com/film/scream-2/")
+
+    def test_slugless_rss_entry_and_csv_row_are_fuzzy_matched(self):
+        [(movie, created)] = resolve_rss_movies([rss_entry("Scream", 1996, "https://boxd.it/abc")])
+        self.assertEqual((movie.id, created), (self.scream.id, False))
+
+        user = User.objects.create(username="importer")
+        csv_file = SimpleUploadedFile(
+            "diary.csv", b"Date,Name,Year,Letterboxd URI,Rating,Watched Date\n2024-01-01,Scream,1996,,4,2024-01-01\n",
+        )
+        counters = run_letterboxd_import(user=user, reviews_file=csv_file)
+        self.assertEqual(counters["movies_fuzzy_matched"], 1)
+        self.assertTrue(MovieUser.objects.filter(user=user, movie=self.scream, rating=4).exists())
+
+
+# ---------- TMDb client / enrichment ----------
+class TMDbClientTests(SimpleTestCase):
+    def client_for(self, server, **kwargs):
+        return TMDbClient(base_url=server.url, api_key="k", access_token="", requests_per_second=1000,
+                          cache=kwargs.pop("cache", None), **kwargs)
+
+    def test_retries_after_429(self):
+        calls = []
+
+        def respond(path, query, headers):
+            calls.append(path)
+            if len(calls) == 1:
+                return 429, {"Retry-After": "0"}, b""
+            return json_response({"id": 1})
+
+        with StubServer(respond) as server:
+            client = self.client_for(server)
+            self.assertEqual(client.get("/movie/1"), {"id": 1})
+        self.assertEqual(client.requests_sent, 2)
+
+    def test_server_errors_raise(self):
+        with StubServer(lambda *a: (500, {}, b"")) as server:
+            with self.assertRaises(TMDbError):
+                self.client_for(server).get("/movie/1")
+
+    def test_concurrent_identical_requests_are_coalesced(self):
+        release = threading.Event()
+
+        def respond(path, query, headers):
+            release.wait(5)
+            return json_response({"id": 7})
+
+        with StubServer(respond) as server:
+            client = self.client_for(server)
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(client.get("/movie/7"))) for _ in range(5)]
+            for t in threads:
+                t.start()
+            time.sleep(0.2)
+            release.set()
+            for t in threads:
+                t.join()
+        self.assertEqual(results, [{"id": 7}] * 5)
+        self.assertEqual(len(server.requests), 1)
+        self.assertEqual(client.requests_coalesced, 4)
+
+    def test_cache_serves_hits_and_remembers_misses(self):
+        def respond(path, query, headers):
+            return json_response({"id": 3}) if path == "/movie/3" else (404, {}, b"")
+
+        with tempfile.TemporaryDirectory() as tmp, StubServer(respond) as server:
+            cache = ResponseCache(f"{tmp}/tmdb.sqlite3", default_ttl=60)
+            client = self.client_for(server, cache=cache)
+            for _ in range(2):
+                self.assertEqual(client.get("/movie/3"), {"id": 3})
+                self.assertIsNone(client.get("/movie/4"))
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_search_skips_hits_for_other_films(self):
+        def respond(path, query, headers):
+            return json_response({"results": [
+                {"id": 1, "title": "Heat Wave", "release_date": "1995-06-01"},
+                {"id": 2, "title": "Heat", "release_date": "1972-10-05"},
+                {"id": 3, "title": "Heat", "release_date": "1995-12-15"},
+            ]})
+
+        with StubServer(respond) as server:
+            client = self.client_for(server)
+            self.assertEqual(client.search_movie("Heat", 1995)["id"], 3)
+            self.assertEqual(client.search_movie("heat")["id"], 2)
+            self.assertIsNone(client.search_movie("Heat", 1986))
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = f"{self.tmp.name}/cache.sqlite3"
+
+    def test_normalize_url_drops_credentials_and_sorts_params(self):
+        self.assertEqual(
+            normalize_url("HTTPS://API.example.com:443/3/movie/1/?b=2&api_key=secret&a=1"),
+            "https://api.example.com/3/movie/1?a=1&b=2",
+        )
+
+    def test_stale_entries_are_revalidated_with_etag(self):
+        etags_seen = []
+
+        def respond(path, query, headers):
+            etags_seen.append(headers.get("If-None-Match"))
+            if headers.get("If-None-Match") == '"v1"':
+                return 304, {"ETag": '"v1"'}, b""
+            return json_response({"id": 5}, ETag='"v1"')
+
+        cache = ResponseCache(self.path, ttls={"/movie/": 0}, default_ttl=60)
+        with StubServer(respond) as server:
+            client = TMDbClient(base_url=server.url, requests_per_second=1000, cache=cache)
+            self.assertEqual(client.get("/movie/5"), {"id": 5})
+            self.assertEqual(client.get("/movie/5"), {"id": 5})
+        self.assertEqual(etags_seen, [None, '"v1"'])
+        self.assertEqual(cache.stats()["revalidated"], 1)
+
+    def test_longest_prefix_ttl_and_lru_eviction(self):
+        cache = ResponseCache(self.path, ttls={"/movie/": 10, "/movie/popular": 1}, max_entries=2)
+        self.assertEqual(cache.ttl_for("/movie/popular"), 1)
+        self.assertEqual(cache.ttl_for("/movie/9"), 10)
+        for key in ("a", "b", "c"):
+            cache.store(key, "/movie/1", 200, b"{}")
+            time.sleep(0.01)
+        # small caches check the cap on every store: the least recently used entry went
+        self.assertEqual(cache.counters["evictions"], 1)
+        self.assertIsNone(cache.lookup("a"))
+        self.assertIsNotNone(cache.lookup("c"))
+
+
+class EnrichmentTests(TestCase):
+    def respond(self, path, query, headers):
+        if path == "/search/movie":
+            hits = {
+                "Heat": [{"id": 949, "title": "Heat", "release_date": "1995-12-15"}],
+                "Shorts": [{"id": 950, "title": "Shorts", "release_date": ""}],
+                "Lost Film 0": [{"id": 951, "title": "Lost Films", "release_date": "2001-01-01"}],
+            }
+            return json_response({"results": hits.get(query["query"][0], [])})
+        if path == "/movie/950":
+            return json_response({"id": 950, "overview": "No runtime on TMDb.", "runtime": 0})
+        if path == "/movie/949":
+            return json_response({
+                "id": 949, "overview": "Cops and robbers.", "runtime": 170, "release_date": "1995-12-15",
+                "genres": [{"id": 80, "name": "Crime"}],
+                "credits": {"cast": [{"id": 1158, "name": "Al Pacino", "character": "Hanna", "order": 0}],
+                            "crew": [{"id": 638, "name": "Michael Mann", "job": "Director"}]},
+            })
+        return 404, {}, b""
+
+    def test_unmatched_movies_back_off_instead_of_blocking_the_queue(self):
+        unknown = [Movie.objects.create(title=f"Lost Film {i}") for i in range(3)]
+        heat = Movie.objects.create(title="Heat")
+        with StubServer(self.respond) as server:
+            client = TMDbClient(base_url=server.url, requests_per_second=1000, cache=None)
+            first = enrich_movies(client=client, limit=3, max_workers=2)
+            second = enrich_movies(client=client, limit=3, max_workers=2)
+
+        self.assertEqual((first["not_found"], first["movies_enriched"]), (3, 0))
+        self.assertEqual((second["movies_considered"], second["movies_enriched"]), (1, 1))
+        heat.refresh_from_db()
+        self.assertEqual((heat.tmdb_id, heat.runtime, heat.enrichment_attempts), (949, 170, 0))
+
+        lost = Movie.objects.get(pk=unknown[0].pk)
+        self.assertEqual(lost.enrichment_attempts, 1)
+        self.assertFalse(movies_missing_metadata().filter(pk=lost.pk).exists())
+        later = lost.enrichment_retry_at + timedelta(seconds=1)
+        self.assertTrue(movies_missing_metadata(now=later).filter(pk=lost.pk).exists())
+
+    def test_match_without_runtime_is_not_looked_up_again(self):
+        shorts = Movie.objects.create(title="Shorts")
+        with StubServer(self.respond) as server:
+            client = TMDbClient(base_url=server.url, requests_per_second=1000, cache=None)
+            self.assertEqual(enrich_movies(client=client)["movies_enriched"], 1)
+            self.assertEqual(enrich_movies(client=client)["movies_considered"], 0)
+        shorts.refresh_from_db()
+        self.assertEqual((shorts.tmdb_id, shorts.runtime), (950, None))
+        self.assertIsNotNone(shorts.enriched_at)
+
+
+# ---------- credits ----------
+class CreditsWriterTests(TestCase):
+    def details(self, genres, directors, cast):
+        return {
+            "genres": [{"name": g} for g in genres],
+            "credits": {
+                "crew": [{"id": pid, "name": f"Director {pid}", "job": "Director"} for pid in directors]
+                + [{"id": 999, "name": "Composer", "job": "Original Music Composer"}],
+                "cast": [{"id": pid, "name": f"Actor {pid}", "character": f"Role {pid}", "order": i}
+                         for i, pid in enumerate(cast)],
+            },
+        }
+
+    def test_batch_is_written_in_a_fixed_number_of_queries_and_is_idempotent(self):
+        a, b = Movie.objects.create(title="A"), Movie.objects.create(title="B")
+        Genre.objects.create(name="Drama")
+        results = [
+            (a, self.details(["Drama", "Crime"], [10], [1, 2, 2])),
+            (b, self.details(["Drama"], [10, 11], list(range(3, 40)))),
+        ]
+        with self.assertNumQueries(12):
+            counters = write_credits_bulk(results)
+        self.assertEqual((counters["genres"], counters["directors"]), (2, 2))
+
+        write_credits_bulk(results)
+        self.assertEqual(Genre.objects.count(), 2)
+        self.assertEqual(Director.objects.count(), 2)
+        self.assertEqual(MovieDirector.objects.filter(movie=b).count(), 2)
+        # billed cast only, and the first billing of a duplicated person wins
+        self.assertEqual(MovieActor.objects.filter(movie=b).count(), 20)
+        self.assertEqual(MovieActor.objects.get(movie=a, actor__tmdb_id=2).casting_order, 1)
+        self.assertEqual(Actor.objects.get(tmdb_id=1).name, "Actor 1")
+
+
+# ---------- image cache ----------
+class PosterCacheTests(TestCase):
+    IMAGE = b"\x89PNG\r\n\x1a\n" + b"0" * 64
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(POSTER_CACHE_DIR=tmp.name, POSTER_CACHE_SEED_DIR="")
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def respond(self, path, query, headers):
+        if path == "/poster.png":
+            return 200, {"Content-Type": "image/png"}, self.IMAGE
+        return 200, {"Content-Type": "text/html"}, b"<html>not an image</html>"
+
+    def test_downloads_in_background_and_serves_with_etag(self):
+        client = Client()
+        # the pool's own DB connection can't write inside the test transaction, so run it inline
+        with StubServer(self.respond) as server, \
+                mock.patch("api.views.image_views.schedule_download", side_effect=get_image) as scheduled:
+            movie = Movie.objects.create(title="Heat", poster_url=f"{server.url}/poster.png")
+            pending = client.get(f"/api/movies/{movie.id}/poster/original/")
+            first = client.get(f"/api/movies/{movie.id}/poster/original/")
+            second = client.get(f"/api/movies/{movie.id}/poster/original/",
+                                headers={"If-None-Match": first["ETag"]})
+            small = client.get(f"/api/movies/{movie.id}/poster/small/")
+
+        self.assertEqual(pending.status_code, 404)
+        self.assertEqual(scheduled.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(b"".join(first.streaming_content), self.IMAGE)
+        self.assertIn("public", first["Cache-Control"])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(small.status_code, 200)
+        self.assertEqual(server.requests, ["/poster.png"])
+
+    def test_missing_images_are_not_refetched_until_retry(self):
+        with StubServer(self.respond) as server, \
+                mock.patch("api.views.image_views.schedule_download", side_effect=get_image):
+            movie = Movie.objects.create(title="Heat", poster_url=f"{server.url}/page.html")
+            for _ in range(3):
+                self.assertEqual(Client().get(f"/api/movies/{movie.id}/poster/original/").status_code, 404)
+            self.assertEqual(Client().get(f"/api/movies/{movie.id}/poster/huge/").status_code, 404)
+            self.assertEqual(server.requests, ["/page.html"])
+
+            miss = CachedImage.objects.get(url=movie.poster_url)
+            self.assertEqual(miss.status, CachedImage.MISSING)
+            CachedImage.objects.filter(pk=miss.pk).update(retry_at=timezone.now())
+            self.assertIsNone(get_image(movie.poster_url))
+            self.assertEqual(len(server.requests), 2)
+
+
+# ---------- query plans ----------
+class QueryPlanTests(TestCase):
+    def test_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)       # NORMAL
+            cursor.execute("PRAGMA temp_store")
+            self.assertEqual(cursor.fetchone()[0], 2)       # MEMORY
+
+    def test_stats_and_import_queries_have_no_full_scans(self):
+        out = io.StringIO()
+        call_command("audit_query_plans", "--json", "--fail-on-scan", "--movies", "60", stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertTrue(report)
+        for name, result in report.items():
+            self.assertNotIn("error", result, name)
+            self.assertEqual(result["fullScans"], [], name)
+
+
+# ---------- read replica ----------
+@override_settings(DATABASES={**settings.DATABASES, "replica": settings.DATABASES["default"]})
+class ReplicaRoutingTests(TestCase):
+    def test_reads_stay_on_primary_after_a_write(self):
+        user, other = User.objects.create(username="ana"), User.objects.create(username="ben")
+        view = use_read_replica(lambda request: _read_alias.get())
+
+        def write(request):
+            mark_recent_write(request)
+            return HttpResponse()
+
+        def request_as(who, cookies):
+            request = RequestFactory().get("/")
+            request.user, request.COOKIES = who, cookies
+            return request
+
+        self.assertEqual(view(request_as(user, {})), "replica")
+        cookies = recent_write_middleware(write)(request_as(user, {})).cookies
+        marker = {RECENT_WRITE_COOKIE: cookies[RECENT_WRITE_COOKIE].value}
+
+        # checked from the signed cookie alone: no query, nothing per-process
+        with self.assertNumQueries(0):
+            self.assertIsNone(view(request_as(user, marker)))
+        self.assertEqual(view(request_as(other, marker)), "replica")
+        later = time.time() + settings.DB_REPLICA_STICKY_SECONDS + 1
+        with mock.patch("django.core.signing.time.time", return_value=later):
+            self.assertEqual(view(request_as(user, marker)), "replica")
+
+
+# ---------- async views ----------
+RSS_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:letterboxd="https://letterboxd.com">
+<channel><title>ana</title>
+<item><title>Heat, 1995 - 4.5</title><link>https://letterboxd.com/ana/film/heat/</link>
+<pubDate>Sun, 05 Jan 2025 20:00:00 +0000</pubDate>
+<letterboxd:filmTitle>Heat</letterboxd:filmTitle><letterboxd:filmYear>1995</letterboxd:filmYear></item>
+</channel></rss>"""
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="ana", password="x")
+        self.client = Client(HTTP_AUTHORIZATION=f"Bearer {get_user_tokens(self.user)['access_token']}")
+
+    @skipUnless(importlib.util.find_spec("httpx"), "httpx is not installed")
+    def test_rss_sync_through_async_endpoint(self):
+        with StubServer(lambda path, query, headers: (200, {"Content-Type": "application/rss+xml"}, RSS_FEED)) as server, \
+                mock.patch.object(async_views, "_build_letterboxd_rss_url", return_value=f"{server.url}/ana/rss/"):
+            resp = self.client.post("/api/async/letterboxd/rss/", {"rss": "ana"}, content_type="application/json")
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(resp.json()["entries_processed"], 1)
+        mu = MovieUser.objects.get(user=self.user)
+        self.assertEqual((mu.movie.title, mu.watched_date), ("Heat", date(2025, 1, 5)))
+
+    def test_sync_endpoint_fetches_with_the_same_limits(self):
+        def slow(path, query, headers):
+            time.sleep(1.5)
+            return 200, {}, RSS_FEED
+
+        with StubServer(lambda path, query, headers: (200, {}, RSS_FEED * 4)) as server, \
+                mock.patch.object(letterboxd_import, "MAX_FEED_BYTES", len(RSS_FEED) * 2):
+            with self.assertRaises(FeedUnavailable):
+                fetch_feed(server.url)
+        with StubServer(slow) as server, mock.patch.object(letterboxd_import, "RSS_FETCH_TIMEOUT", 0.3):
+            started = time.monotonic()
+            with self.assertRaises(FeedUnavailable):
+                fetch_feed(server.url)
+            self.assertLess(time.monotonic() - started, 1.2)
+
+        with StubServer(lambda path, query, headers: (200, {}, RSS_FEED)) as server, \
+                mock.patch("api.views.letterboxd_views._build_letterboxd_rss_url", return_value=f"{server.url}/ana/rss/"):
+            resp = self.client.post("/api/letterboxd/rss/", {"rss": "ana"}, content_type="application/json")
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(resp.json()["entries_processed"], 1)
+
+    def test_async_stats_match_sync_stats(self):
+        movie = Movie.objects.create(title="Heat", release_date=date(1995, 12, 15))
+        MovieUser.objects.create(user=self.user, movie=movie, watch_status="Watched", watched_date=timezone.localdate())
+        sync_resp = self.client.get("/api/stats/all-time")
+        async_resp = self.client.get("/api/async/stats/all-time")
+        self.assertEqual(async_resp.status_code, 200)
+        self.assertEqual(async_resp.json(), sync_resp.json())
+        self.assertEqual(async_resp.json()["totalWatches"], 1)
+
+
+# ---------- JWT user cache ----------
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="ana", password="x")
+        self.client = Client(HTTP_AUTHORIZATION=f"Bearer {get_user_tokens(self.user)['access_token']}")
+
+    def test_user_is_served_from_cache(self):
+        self.assertEqual(self.client.get("/api/ping/").status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/ping/").status_code, 200)
+
+    def test_revocation_applies_to_cached_users(self):
+        self.assertEqual(self.client.get("/api/ping/").status_code, 200)
+        self.user.set_password("new")
+        self.user.save()        # bumps token_version; the signal drops the cached entry
+        self.assertEqual(self.client.get("/api/ping/").status_code, 401)
+        self.assertEqual(self.client.get("/api/async/stats/all-time").status_code, 401)
+
+    def deactivate_in_other_process(self, alias):
+        with override_settings(JWT_USER_CACHE_ALIAS=alias):
+            user = User.objects.get(pk=self.user.pk)
+            user.is_active = False
+            user.save()
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+        "proc-a": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "proc-a"},
+        "proc-b": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "proc-b"},
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "proc-a"},
+    })
+    def test_deactivation_across_cache_instances(self):
+        # "shared" reads the same store as proc-a, like two workers on one Redis
+        with override_settings(JWT_USER_CACHE_ALIAS="proc-a"):
+            self.assertEqual(self.client.get("/api/ping/").status_code, 200)
+        self.deactivate_in_other_process("shared")
+        with override_settings(JWT_USER_CACHE_ALIAS="proc-a"):
+            self.assertEqual(self.client.get("/api/ping/").status_code, 401)
+
+        # separate per-process caches: the other worker's copy lasts at most JWT_USER_CACHE_TTL
+        User.objects.filter(pk=self.user.pk).update(is_active=True, token_version=0)
+        with override_settings(JWT_USER_CACHE_ALIAS="proc-b"):
+            self.assertEqual(self.client.get("/api/ping/").status_code, 200)
+        self.deactivate_in_other_process("proc-a")
+        later = time.time() + settings.JWT_USER_CACHE_TTL + 1
+        with override_settings(JWT_USER_CACHE_ALIAS="proc-b"), \
+                mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(self.client.get("/api/ping/").status_code, 401)
+
+        # and the bumped token version keeps old tokens out after reactivation
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        with override_settings(JWT_USER_CACHE_ALIAS="proc-b"):
+            self.assertEqual(self.client.get("/api/ping/").status_code, 401)
+
+
+# ---------- history list / rendering ----------
+class HistoryListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="ana", password="x")
+        for i in range(3):
+            movie = Movie.objects.create(title=f"Film {i}", description="long text " * 50,
+                                         release_date=date(2000 + i, 1, 1))
+            MovieUser.objects.create(user=self.user, movie=movie, watch_status="Watched",
+                                     watched_date=date(2024, 1, 1 + i), rating=3.5)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_history_is_lean_and_rendered_by_orjson(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get("/api/history/", {"page_size": 2})
+        self.assertIsInstance(resp.accepted_renderer, ORJSONRenderer)
+        body = resp.json()
+        self.assertTrue(body["hasMore"])
+        self.assertEqual([r["movie"]["title"] for r in body["results"]], ["Film 2", "Film 1"])
+        self.assertEqual(set(body["results"][0]), set(HistoryEntrySerializer.Meta.fields))
+        self.assertEqual(set(body["results"][0]["movie"]), {"id", "title", "release_date", "poster_url"})
+        self.assertEqual(body["results"][0]["watched_date"], "2024-01-03")
+
+        last = self.client.get("/api/history/", {"page_size": 2, "page": 2}).json()
+        self.assertFalse(last["hasMore"])
+        self.assertEqual([r["movie"]["title"] for r in last["results"]], ["Film 0"])
+
+    def test_bench_renderers_leaves_no_rows(self):
+        out = io.StringIO()
+        call_command("bench_renderers", "--rows", "40", "--repeat", "1", "--json", stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual({r["shape"] for r in results}, {"full_serializer", "lean_serializer", "values_projection"})
+        self.assertTrue(all(r["rows"] == 40 for r in results))
+        sizes = {r["shape"]: r["bytes"] for r in results if r["renderer"] == "orjson"}
+        self.assertLess(sizes["values_projection"], sizes["full_serializer"])
+        self.assertFalse(User.objects.filter(username="bench-renderers").exists())
+
+
+# ---------- history export ----------
+class HistoryExportTests(TestCase):
+    def test_csv_export_imports_back_unchanged(self):
+        ana = User.objects.create_user(username="ana", password="x")
+        heat = Movie.objects.create(title="Heat", release_date=date(1995, 12, 15),
+                                    letterboxd_uri="https://letterboxd.com/film/heat/")
+        alien = Movie.objects.create(title="Alien", release_date=date(1979, 5, 25),
+                                     letterboxd_uri="https://letterboxd.com/film/alien/")
+        MovieUser.objects.create(user=ana, movie=heat, watch_status="Watched", watched_date=date(2024, 3, 9),
+                                 rating=4.5, review="Still great, \"Heat\" holds up.", liked=True, rewatch=True)
+        MovieUser.objects.create(user=ana, movie=alien, watch_status="Want to Watch", in_watchlist=True)
+
+        client = APIClient()
+        client.force_authenticate(ana)
+        files = {}
+        for kind, slot in (("reviews", "reviews_file"), ("watchlist", "watchlist_file"), ("likes", "films_file")):
+            resp = client.get("/api/export/", {"output": "csv", "kind": kind})
+            self.assertEqual(resp.status_code, 200)
+            files[slot] = SimpleUploadedFile(f"{kind}.csv", b"".join(resp.streaming_content))
+
+        bea = User.objects.create_user(username="bea", password="x")
+        counters = run_letterboxd_import(user=bea, **files)
+        self.assertEqual(counters["movies_created"], 0)
+
+        fields = ("movie_id", "watch_status", "watched_date", "rating", "review", "liked", "in_watchlist", "rewatch")
+        exported = list(MovieUser.objects.filter(user=ana).order_by("movie_id").values_list(*fields))
+        imported = list(MovieUser.objects.filter(user=bea).order_by("movie_id").values_list(*fields))
+        self.assertEqual(imported, exported)
+
+
+# ---------- load test ----------
+class LoadTestHarnessTests(TransactionTestCase):
+    def test_seeded_users_drive_every_scenario(self):
+        counts = seed_dataset(users=3, movies=40, median_history=10)
+        self.assertEqual((counts["users"], counts["movies"]), (3, 40))
+        accounts, films = seeded_accounts(), seeded_films()
+
+        with FixtureFeedServer(films) as feeds:
+            # the in-memory test database is shared-cache SQLite, where concurrent writers
+            # fail rather than wait, so the write scenarios run on a single worker
+            writes = run_load(ClientTransport, accounts, films, feeds, mix=parse_mix(",".join(SCENARIOS)),
+                              concurrency=1, duration=60, max_requests=30)
+            reads = run_load(ClientTransport, accounts, films, feeds, mix=parse_mix("ping,stats,all_time"),
+                             concurrency=3, duration=60, max_requests=15)
+
+        # plus each worker's first login
+        self.assertEqual((writes["requests"], reads["requests"]), (31, 18))
+        for report in (writes, reads):
+            self.assertEqual(report["errorRate"], 0, report["endpoints"])
+        self.assertEqual(set(writes["endpoints"]), set(SCENARIOS))
+        # LETTERBOXD_SYNC_MIN_INTERVAL is off for the run, so repeated syncs really ran
+        self.assertGreater(writes["endpoints"]["rss"]["requests"], 1)
+        self.assertEqual(writes["shared"], 0, writes["endpoints"])
+        self.assertTrue(MovieUser.objects.filter(movie__title__startswith="Loadtest Import").exists())
+
+        self.assertEqual(clear_dataset()["users"], 3)
+        self.assertFalse(Movie.objects.filter(letterboxd_uri__startswith=FILM_URI_PREFIX).exists())
+
+
+# ---------- movie dedupe ----------
+class MovieDedupeTests(TestCase):
+    def test_duplicates_merge_onto_one_survivor(self):
+        ana = User.objects.create_user(username="ana", password="x")
+        # an RSS permalink row and the canonical row of the same film
+        heat = Movie.objects.create(title="Heat", release_date=date(1995, 12, 15),
+                                    letterboxd_uri="https://letterboxd.com/film/heat/")
+        heat_rss = Movie.objects.create(title="Heat", letterboxd_uri="https://letterboxd.com/ana/film/heat/")
+        # an enriched row and a bare title + year row: only one of them has a TMDb id
+        alien = Movie.objects.create(title="Alien", release_date=date(1979, 5, 25), tmdb_id=348, runtime=117)
+        alien_bare = Movie.objects.create(title="alien", release_date=date(1979, 1, 1))
+        # same title + year, different TMDb ids: different films
+        Movie.objects.create(title="Dune", release_date=date(2021, 1, 1), tmdb_id=438631)
+        Movie.objects.create(title="Dune", release_date=date(2021, 6, 1), tmdb_id=999999)
+
+        MovieUser.objects.create(user=ana, movie=heat, watch_status="Want to Watch", in_watchlist=True)
+        MovieUser.objects.create(user=ana, movie=heat_rss, watch_status="Watched", watched_date=date(2024, 2, 1))
+        MovieUser.objects.create(user=ana, movie=alien_bare, watch_status="Watched", rating=4.5)
+
+        counters = dedupe_movies()
+        self.assertEqual(
+            {k: counters[k] for k in ("slug_groups", "title_year_groups", "groups_skipped", "movies_removed")},
+            {"slug_groups": 1, "title_year_groups": 1, "groups_skipped": 1, "movies_removed": 2},
+        )
+        self.assertEqual(Movie.objects.count(), 4)
+
+        row = MovieUser.objects.get(user=ana, movie=heat)
+        self.assertEqual((row.watch_status, row.watched_date, row.in_watchlist), ("Watched", date(2024, 2, 1), True))
+        self.assertEqual(MovieUser.objects.get(user=ana, movie__tmdb_id=348).rating, 4.5)
+        self.assertEqual(Movie.objects.filter(title__iexact="alien").get().pk, alien.pk)
+
+
+# ---------- single flight ----------
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def fn(self):
+        self.calls.append(1)
+        return {"run": len(self.calls)}
+
+    def test_min_interval_is_per_scope(self):
+        self.assertEqual(single_flight("sync:1:a", self.fn, scope="sync:1", min_interval=60), ({"run": 1}, None))
+        cache.clear()       # results are shared through the database, not the cache
+        self.assertEqual(single_flight("sync:1:a", self.fn, scope="sync:1", min_interval=60), ({"run": 1}, RECENT))
+        self.assertEqual(single_flight("sync:1:b", self.fn, scope="sync:1", min_interval=60), ({"run": 1}, RECENT))
+        self.assertEqual(single_flight("sync:2:a", self.fn, scope="sync:2", min_interval=60), ({"run": 2}, None))
+        self.assertEqual(single_flight("sync:1:a", self.fn, scope="sync:1"), ({"run": 3}, None))
+
+    def test_waits_on_another_process_lease(self):
+        now = timezone.now()
+        SingleFlight.objects.create(key="k", scope="k", token="other", locked_until=now + timedelta(minutes=5))
+        started = time.monotonic()
+        with self.assertRaises(SingleFlightTimeout):
+            single_flight("k", self.fn, wait_timeout=0.3)
+        self.assertLess(time.monotonic() - started, 2)
+
+        def other_process_finishes(seconds):
+            SingleFlight.objects.filter(key="k").update(
+                token="", locked_until=None, result={"run": "other"}, finished_at=timezone.now())
+
+        with mock.patch("api.services.single_flight.time.sleep", side_effect=other_process_finishes):
+            self.assertEqual(single_flight("k", self.fn), ({"run": "other"}, JOINED))
+        self.assertEqual(self.calls, [])
+
+    def test_lapsed_lease_is_taken_over_and_failures_are_not_stored(self):
+        SingleFlight.objects.create(key="k", scope="k", token="dead", locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(single_flight("k", self.fn), ({"run": 1}, None))
+        row = SingleFlight.objects.get(key="k")
+        self.assertEqual((row.token, row.locked_until, row.result), ("", None, {"run": 1}))
+
+        def fail():
+            raise FeedUnavailable("down")
+
+        with self.assertRaises(FeedUnavailable):
+            single_flight("k2", fail)
+        self.assertFalse(SingleFlight.objects.filter(key="k2").exists())
+
+    def test_back_to_back_syncs_of_two_feeds_both_run(self):
+        user = User.objects.create_user(username="ana", password="x")
+        client = APIClient()
+        client.force_authenticate(user)
+        feed_a, feed_b = "/ana/rss/", "/ana-alt/rss/"
+        with StubServer(lambda path, query, headers: (200, {"Content-Type": "application/rss+xml"}, RSS_FEED)) as server:
+            first = client.post("/api/letterboxd/rss/", {"rss": server.url + feed_a}, format="json").json()
+            second = client.post("/api/letterboxd/rss/", {"rss": server.url + feed_b}, format="json").json()
+            again = client.post("/api/letterboxd/rss/", {"rss": server.url + feed_a}, format="json").json()
+
+        self.assertEqual(server.requests, [feed_a, feed_b])
+        self.assertNotIn("shared", first)
+        self.assertNotIn("shared", second)
+        self.assertEqual(second["rss_url"], server.url + feed_b)
+        # only a repeat of the same feed reuses the last result
+        self.assertEqual(again["shared"], RECENT)
+        self.assertEqual(again["entries_processed"], first["entries_processed"])
+
+
+# ---------- global stats ----------
+class GlobalStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        today = timezone.localdate()
+        self.users = {}
+        for name, days_ago in (("ana", [0, 1, 2, 40]), ("bea", [3, 20]), ("cy", [100, 200])):
+            user = User.objects.create_user(username=name, password="x")
+            for i, days in enumerate(days_ago):
+                movie = Movie.objects.create(title=f"{name} {i}", release_date=date(1990 + i, 1, 1))
+                MovieUser.objects.create(user=user, movie=movie, watch_status="Watched",
+                                         watched_date=today - timedelta(days=days))
+            self.users[name] = user
+        compute_global_stats()
+
+    def stats(self, name, path="/api/stats/"):
+        client = APIClient()
+        client.force_authenticate(self.users[name])
+        return client.get(path).json()["vsEveryone"]
+
+    def test_user_counts_come_from_the_job(self):
+        first = self.stats("ana")
+        self.assertEqual((first["users"], first["last7Days"]["you"], first["last30Days"]["you"]), (3, 3, 3))
+        self.assertEqual(first["last7Days"]["median"], 1)
+        self.assertGreater(first["last7Days"]["percentile"], 50)
+        self.assertEqual(self.stats("ana", "/api/stats/all-time")["allTime"]["you"], 4)
+
+        # a watch logged after the run is compared once the next run has counted everyone's
+        movie = Movie.objects.create(title="Later")
+        MovieUser.objects.create(user=self.users["ana"], movie=movie, watch_status="Watched",
+                                 watched_date=timezone.localdate())
+        client = APIClient()
+        client.force_authenticate(self.users["ana"])
+        # the weekly payload's own queries only: the comparison is served from the cache
+        with self.assertNumQueries(7):
+            again = client.get("/api/stats/").json()["vsEveryone"]
+        self.assertEqual(again["last7Days"]["you"], 3)
+
+    def test_run_in_another_process_is_picked_up_consistently(self):
+        before = self.stats("ana")
+        # the job in another process can't clear this process's cache
+        with mock.patch("api.services.global_stats.cache"):
+            compute_global_stats(now=timezone.now() + timedelta(minutes=1))
+
+        # ana's cached figures stay on the previous run until they expire
+        self.assertEqual(self.stats("ana")["computedAt"], before["computedAt"])
+        # bea's counts are read fresh from the new run, so the comparison moves to it too
+        bea = self.stats("bea")
+        self.assertNotEqual(bea["computedAt"], before["computedAt"])
+        self.assertEqual(bea["last7Days"]["you"], 1)
+        self.assertEqual(self.stats("ana")["computedAt"], bea["computedAt"])
+
+    @override_settings(TIME_ZONE="America/New_York")
+    def test_cohort_year_at_the_new_year_boundary(self):
+        # 04:30 UTC on 1 Jan is still 31 Dec in New York: the job and the views must both say 2023
+        joined = {"eve": datetime(2023, 12, 31, 23, 30), "jan": datetime(2024, 1, 1, 0, 30)}
+        for name, local in joined.items():
+            user = User.objects.create_user(username=name, password="x", date_joined=timezone.make_aware(local))
+            MovieUser.objects.create(user=user, movie=Movie.objects.create(title=name), watch_status="Watched",
+                                     watched_date=timezone.localdate())
+            self.users[name] = user
+        compute_global_stats()
+
+        for name, year in (("eve", "2023"), ("jan", "2024")):
+            _, cohort, _ = global_stats_for(User.objects.get(username=name))
+            self.assertEqual((cohort["cohort"], cohort["users"]), (year, 1))
+
+
+class WorkerBootTests(SimpleTestCase):
+    """
+    Cold start of a worker, measured in a fresh interpreter (see profile_imports).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.boot = measure_boot()
+
+    def test_boot_within_generous_budget(self):
+        # wall-clock time depends on the machine and its load: this catches a regression
+        # several times over the budget on any box, the exact check is opt-in below
+        boot_ms = self.boot["seconds"] * 1000
+        self.assertLessEqual(
+            boot_ms, 3 * settings.WORKER_BOOT_BUDGET_MS,
+            f"worker boot took {boot_ms:.0f}ms; run `manage.py profile_imports` to see which imports grew",
+        )
+
+    def test_boot_module_count_within_ceiling(self):
+        # deterministic for a given set of installed packages, unlike the timing
+        self.assertLessEqual(len(self.boot["modules"]), settings.WORKER_BOOT_MAX_MODULES)
+
+    @skipUnless(os.environ.get("FILMREC_TIMING_TESTS"), "timing tests are opt-in (FILMREC_TIMING_TESTS=1)")
+    def test_boot_within_budget(self):
+        boot_ms = best_of(3)["seconds"] * 1000
+        self.assertLessEqual(
+            boot_ms, settings.WORKER_BOOT_BUDGET_MS,
+            f"worker boot took {boot_ms:.0f}ms; run `manage.py profile_imports` to see which imports grew",
+        )
+
+    def test_heavy_modules_load_lazily(self):
+        # numpy / feedparser / httpx / Pillow belong to the import, RSS, recommendation
+        # and image paths and must be imported inside them, not at module level
+        self.assertEqual(heavy_modules_loaded(self.boot), [])
@@ -0,0 +1,29 @@
+import numpy as np
+
+
+def csr_from_pairs(rows, cols, n_rows):
+    """
+    (rows, cols) pairs -> (indptr, indices) with indices sorted per row.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order]
+
+
+def gather_rows(indptr, indices, rows):
+    """
+    Concatenation of indices[indptr[r]:indptr[r+1]] for every r in rows,
+    without a Python loop. Also returns which position in `rows` each value came from.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=indices.dtype), np.empty(0, dtype=np.int64)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    return indices[np.repeat(starts, lengths) + offsets], owner
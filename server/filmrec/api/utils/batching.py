@@ -0,0 +1,8 @@
+def chunks(ids, size=500):
+    """
+    Yield `ids` in lists of at most `size`, e.g. to keep `__in` lookups under
+    SQLite's bound-parameter limit.
+    """
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
@@ -8,6 +8,17 @@ def parse_iso_date(s: str):
     # Letterboxd export uses YYY-MM-DD
     return datetime.strptime(s, "%Y-%m-%d").date()
 
+DECADE_ORDER = ["Pre-1960s", "60s", "70s", "80s", "90s", "00s", "10s", "20s"]
+
+
+def getDecadeLabel(year: int) -> str:
+    if year < 1960:
+        return "Pre-1960s"
+    decade = (year // 10) * 10
+    two = decade % 100
+    return f"{two:02d}s"
+
+
 # creates week windows
 def week_window_sunday_anchor(now=None):
     # returns prev start, prev_end, curr_start, curr_end
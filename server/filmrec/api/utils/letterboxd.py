@@ -9,6 +9,7 @@ def normalize_letterboxd_uri(uri: str):
       - https://letterboxd.com/film/<slug>
       - /film/<slug>/
       - film/<slug>
+      - https://letterboxd.com/<member>/film/<slug>/[<n>/]   (review / diary permalinks, e.g. RSS links)
     Returns canonical: https://letterboxd.com/film/<slug>/
     or None if it can't parse.
     """
@@ -28,12 +29,15 @@ def normalize_letterboxd_uri(uri: str):
         except Exception:
             return None
 
-    # Expect /film/<slug>/...
+    # Expect /film/<slug>/... or /<member>/film/<slug>/...
     parts = [p for p in path.split("/") if p]
-    if len(parts) < 2 or parts[0] != "film":
+    if len(parts) >= 2 and parts[0] == "film":
+        slug = parts[1]
+    elif len(parts) >= 3 and parts[1] == "film":
+        slug = parts[2]
+    else:
         return None
 
-    slug = parts[1]
     if not slug:
         return None
 
@@ -0,0 +1,56 @@
+import re
+import unicodedata
+
+LEADING_ARTICLES = ("the ", "a ", "an ")
+
+
+def normalize_title(title: str) -> str:
+    """
+    Loose form of a film title for matching:
+    "The Thing (1982)" / "thing" / "Thíng!" -> "thing 1982" / "thing" / "thing"
+    Accents, punctuation, case and a leading article are dropped.
+    """
+    s = unicodedata.normalize("NFKD", title or "")
+    s = "".join(c for c in s if not unicodedata.combining(c))
+    s = s.casefold().replace("&", " and ")
+    s = re.sub(r"[^\w]+", " ", s).strip()
+    for article in LEADING_ARTICLES:
+        if s.startswith(article) and len(s) > len(article):
+            s = s[len(article):]
+            break
+    return s
+
+
+def title_trigrams(normalized: str) -> set:
+    # pg_trgm style: each word padded with two leading and one trailing space
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+ROMAN_NUMERALS = {"ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10}
+
+
+def sequel_numbers(normalized: str) -> frozenset:
+    """
+    Numbers in a normalized title that tell instalments apart:
+    "scream 2" -> {2}, "rocky ii" -> {2}, "scream" -> {}. Years are left out
+    ("thing 1982"), they're compared separately.
+    """
+    numbers = set()
+    for word in normalized.split():
+        if word.isdigit() and not (len(word) == 4 and parse_year(word)):
+            numbers.add(int(word))
+        elif word in ROMAN_NUMERALS:
+            numbers.add(ROMAN_NUMERALS[word])
+    return frozenset(numbers)
+
+
+def parse_year(value):
+    try:
+        year = int(str(value).strip()[:4])
+    except (TypeError, ValueError):
+        return None
+    return year if 1800 < year < 2200 else None
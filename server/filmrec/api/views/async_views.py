@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from ..authentication import CachedJWTAuthentication
+from ..db_routers import mark_recent_write, use_read_replica
+from ..models import Movie
+from ..services.global_stats import global_stats_for
+from ..services.letterboxd_import import (
+    FeedUnavailable, _build_letterboxd_rss_url, afetch_feed, rss_sync_key, sync_rss_entries,
+)
+from ..services.single_flight import SingleFlightTimeout, asingle_flight
+from ..services.tmdb_enrichment import enrich_movies, movies_missing_metadata
+from .movie_views import MAX_ENRICH_PER_REQUEST
+from .stats_views import (
+    allTimePayload, allTimeQueries, vsEveryoneAllTime, vsEveryoneWeekly, weeklyPayload, weeklyQueries,
+)
+
+_jwt = CachedJWTAuthentication()
+
+
+# ---------- auth ----------
+async def _authenticate(request):
+    """
+    Async counterpart of DRF's authentication step: the token is checked in
+    the event loop and the user resolved through the cache / async ORM.
+    Returns None if the request isn't authenticated.
+    """
+    header = _jwt.get_header(request)
+    raw_token = _jwt.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return await _jwt.aget_user(_jwt.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def async_jwt_required(view):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await _authenticate(request)
+        if user is None:
+            return JsonResponse({"error": "Authentication credentials were not provided or are invalid."},
+                                status=401)
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def _json_body(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+    return request.POST
+
+
+# ---------- RSS ----------
+async def _parse_feed(body):
+    import feedparser
+    # parsing is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(feedparser.parse, body)
+
+
+# --- Async RSS Import Endpoint ---
+@csrf_exempt
+@require_POST
+@async_jwt_required
+async def async_letterboxd_rss(request):
+    """
+    POST {rss : "<username OR profile url OR rss url>"}
+    Same as letterboxd_rss, but the feed download doesn't hold a worker thread.
+    """
+    rss_url = _build_letterboxd_rss_url((_json_body(request).get("rss") or "").strip())
+    if not rss_url:
+        return JsonResponse({"error": "Invalid RSS input"}, status=400)
+
+    async def run():
+        feed = await _parse_feed(await afetch_feed(rss_url))
+        # feed.bozo indicates a parsing error
+        if getattr(feed, "bozo", False):
+            raise FeedUnavailable(rss_url)
+        # the write path is the sync view's ORM code, run on Django's sync thread
+        return await sync_to_async(sync_rss_entries)(request.user, feed.entries)
+
+    # shares locks and results with letterboxd_rss, so a sync on either endpoint runs once
+    try:
+        counters, shared = await asingle_flight(rss_sync_key(request.user, rss_url), run,
+                                                min_interval=settings.LETTERBOXD_SYNC_MIN_INTERVAL)
+    except FeedUnavailable:
+        return JsonResponse(
+            {"error": "Could not read that RSS feed. Make sure the profile is public and the input is correct."},
+            status=400,
+        )
+    except SingleFlightTimeout:
+        return JsonResponse({"error": "A sync of this feed is already running."}, status=409)
+
+    mark_recent_write(request)
+    payload = {"status": "ok", "rss_url": rss_url, **counters}
+    if shared:
+        payload["shared"] = shared
+    return JsonResponse(payload)
+
+
+# --- Async Metadata Enrichment Trigger ---
+def _enrich_for_user(user):
+    try:
+        movies = movies_missing_metadata(Movie.objects.filter(movieuser__user=user))
+        return enrich_movies(movies, limit=MAX_ENRICH_PER_REQUEST)
+    finally:
+        # runs on an executor thread outside the request cycle, so nothing else closes its connection
+        connection.close()
+
+
+@csrf_exempt
+@require_POST
+@async_jwt_required
+async def async_enrich_my_movies(request):
+    # not thread_sensitive: a long enrichment mustn't block the shared sync thread
+    counters = await sync_to_async(_enrich_for_user, thread_sensitive=False)(request.user)
+    mark_recent_write(request)
+    return JsonResponse({"status": "ok", **counters})
+
+
+# --- Async Stats Endpoints ---
+async def _evaluate(queries):
+    return {name: [row async for row in qs] for name, qs in queries.items()}
+
+
+@require_GET
+@async_jwt_required
+@use_read_replica
+async def async_stats_payload(request):
+    window, queries = weeklyQueries(request.user)
+    rows = await _evaluate(queries)
+    payload = weeklyPayload(window, rows)
+    payload["vsEveryone"] = vsEveryoneWeekly(*await sync_to_async(global_stats_for)(request.user))
+    return JsonResponse(payload)
+
+
+@require_GET
+@async_jwt_required
+@use_read_replica
+async def async_stats_all_time(request):
+    rows = await _evaluate(allTimeQueries(request.user))
+    payload = allTimePayload(rows)
+    payload["vsEveryone"] = vsEveryoneAllTime(rows, *await sync_to_async(global_stats_for)(request.user))
+    return JsonResponse(payload)
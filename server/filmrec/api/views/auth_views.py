@@ -12,6 +12,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt import tokens
 
+from ..authentication import TOKEN_VERSION_CLAIM
 from ..serializer import LoginSerializer, RegistrationSerializer
 
 User = get_user_model()
@@ -20,6 +21,8 @@ token_generator = PasswordResetTokenGenerator()
 # create a user token once logged in, store in local storage (frontend)
 def get_user_tokens(user):
     refresh = tokens.RefreshToken.for_user(user)
+    # token version: bumping User.token_version revokes this token (see api/authentication.py)
+    refresh[TOKEN_VERSION_CLAIM] = user.token_version
     return {"access_token": str(refresh.access_token)}
 
 # Log in
@@ -29,7 +32,8 @@ def loginView(request):
     serializer = LoginSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
 
-    username = serializer.validated_data["username"]
+    # accounts are registered with username = email
+    username = serializer.validated_data["email"]
     password = serializer.validated_data["password"]
     user = authenticate(username=username, password=password)
 
@@ -58,6 +62,7 @@ def ping(request):
 
 # Pass Reset Request
 @api_view(["POST"])
+@permission_classes([AllowAny])
 def password_reset_request(request):
     email = request.data.get("email")
 
@@ -98,6 +103,7 @@ def password_reset_request(request):
 
 # Set new password
 @api_view(["POST"])
+@permission_classes([AllowAny])
 def password_reset_confirm(request):
     uid = request.data.get("uid")
     token = request.data.get("token")
@@ -129,6 +135,8 @@ def password_reset_confirm(request):
     
     # passed checks save new password
     user.set_password(new_password)
+    # revoke every token issued with the old password
+    user.token_version += 1
     user.save()
 
     return Response({"detail": "Password has been reset successfuly."})
\ No newline at end of file
@@ -0,0 +1,50 @@
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..services.history_export import CSV_HEADERS, gzip_stream, iter_csv, iter_json
+
+OUTPUTS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "json": (iter_json, "application/json"),
+}
+
+
+# --- Film History Export ---
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_history(request):
+    """
+    GET /api/export/?output=csv|json&kind=reviews|watchlist|likes[&gzip=1]
+
+    Streams the user's history; the CSV kinds are the Letterboxd export files
+    and can be uploaded back through /api/letterboxd/import/.
+    JSON also accepts kind=all. ("output" rather than "format": DRF reserves that.)
+    """
+    output = request.query_params.get("output", "csv")
+    if output not in OUTPUTS:
+        return Response({"error": "output must be csv or json."}, status=status.HTTP_400_BAD_REQUEST)
+
+    kind = request.query_params.get("kind", "reviews" if output == "csv" else "all")
+    allowed = list(CSV_HEADERS) + ([] if output == "csv" else ["all"])
+    if kind not in allowed:
+        return Response({"error": f"kind must be one of: {', '.join(allowed)}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    generate, content_type = OUTPUTS[output]
+    filename = f"filmrec-{kind}.{output}"
+    chunks = generate(request.user, kind)
+
+    if request.query_params.get("gzip") in ("1", "true"):
+        # a .gz download rather than Content-Encoding, so the saved file is what was sent
+        response = StreamingHttpResponse(gzip_stream(chunks), content_type="application/gzip")
+        filename += ".gz"
+    else:
+        response = StreamingHttpResponse((c.encode("utf-8") for c in chunks), content_type=content_type)
+
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    # rows are read as the body streams, so nothing in between may buffer it
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,40 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..db_routers import use_read_replica
+from ..models import MovieUser
+from ..serializer import HistoryEntrySerializer, history_values
+
+MAX_PAGE_SIZE = 1000
+
+
+# --- Watch History Endpoint ---
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def history(request):
+    """
+    GET ?page=<n>&page_size=<n> -> the user's films, most recently watched first.
+    Rows are read with history_values() (only the columns HistoryEntrySerializer
+    needs, no description text) and rendered by the default ORJSONRenderer.
+    """
+    try:
+        page = max(1, int(request.query_params.get("page", 1)))
+        page_size = max(1, min(int(request.query_params.get("page_size", 200)), MAX_PAGE_SIZE))
+    except ValueError:
+        return Response({"error": "page and page_size must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    offset = (page - 1) * page_size
+    qs = MovieUser.objects.filter(user=request.user).order_by("-watched_date", "-id")
+    rows = history_values(qs[offset:offset + page_size + 1])
+    return Response(
+        {
+            "page": page,
+            "pageSize": page_size,
+            "hasMore": len(rows) > page_size,
+            "results": HistoryEntrySerializer(rows[:page_size], many=True).data,
+        },
+        status=status.HTTP_200_OK,
+    )
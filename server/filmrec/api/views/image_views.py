@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET
+
+from ..models import Actor, Movie
+from ..services.poster_cache import ORIGINAL, VARIANTS, cached_image, schedule_download, variant_file
+
+# Cache lifetime while a thumbnail is still being generated and the original
+# is served in its place, or while the image itself isn't cached yet.
+PENDING_MAX_AGE = 60
+
+
+def _serve_image(request, url, variant):
+    if variant != ORIGINAL and variant not in VARIANTS:
+        return JsonResponse({"error": "Unknown image variant."}, status=404)
+
+    # never wait on the source here: a miss is answered at once and the
+    # download (if one is due) runs on the background pool
+    image, retry = cached_image(url)
+    if image is None:
+        if retry:
+            schedule_download(url)
+        response = JsonResponse({"error": "Image not available."}, status=404)
+        patch_cache_control(response, public=True, max_age=PENDING_MAX_AGE)
+        return response
+
+    path, content_type, served, final = variant_file(image, variant)
+    etag = f'"{image.sha256[:32]}-{served}"'
+    max_age = settings.POSTER_CACHE_MAX_AGE if final else PENDING_MAX_AGE
+
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    response["ETag"] = etag
+    # public: the images are the same for every user
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+# --- Cached Poster / Profile Images ---
+# Plain Django views (no DRF auth): images are public and served to <img> tags.
+@require_GET
+def movie_poster(request, movie_id, variant):
+    """
+    GET /api/movies/<id>/poster/<small|medium|original>/ from the local cache.
+    """
+    url = Movie.objects.filter(pk=movie_id).values_list("poster_url", flat=True).first()
+    if not url:
+        return JsonResponse({"error": "Poster not found."}, status=404)
+    return _serve_image(request, url, variant)
+
+
+@require_GET
+def actor_profile(request, actor_id, variant):
+    """
+    GET /api/actors/<id>/profile/<small|medium|original>/ from the local cache.
+    """
+    url = Actor.objects.filter(pk=actor_id).values_list("profile_url", flat=True).first()
+    if not url:
+        return JsonResponse({"error": "Profile image not found."}, status=404)
+    return _serve_image(request, url, variant)
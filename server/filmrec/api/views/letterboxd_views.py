@@ -3,14 +3,18 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 
 from ..services.letterboxd_import import (
     run_letterboxd_import, 
     _build_letterboxd_rss_url,
-    _parse_published_date)
-from ..models import Movie, MovieUser
-
-import feedparser
+    sync_rss_entries,
+    FeedUnavailable,
+    fetch_feed,
+    import_key,
+    rss_sync_key)
+from ..services.single_flight import SingleFlightTimeout, single_flight
+from ..db_routers import mark_recent_write
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -25,14 +29,28 @@ def letterboxd_import(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    counters = run_letterboxd_import(
-        user=request.user,
-        reviews_file=reviews_file,
-        watchlist_file=watchlist_file,
-        films_file=films_file,
-    )
+    files = {"reviews_file": reviews_file, "watchlist_file": watchlist_file, "films_file": films_file}
+
+    def run():
+        return run_letterboxd_import(user=request.user, **files)
+
+    # a double-submitted upload of the same files runs once; both requests get its counters
+    try:
+        counters, shared = single_flight(import_key(request.user, **files), run,
+                                         min_interval=settings.LETTERBOXD_SYNC_MIN_INTERVAL)
+    except SingleFlightTimeout:
+        return Response({"error": "This import is already running."}, status=status.HTTP_409_CONFLICT)
 
-    return Response({"status": "ok", **counters}, status=status.HTTP_200_OK)
+    # shared results count too: the user's rows changed moments ago either way
+    mark_recent_write(request)
+    return Response(_with_shared({"status": "ok", **counters}, shared), status=status.HTTP_200_OK)
+
+
+def _with_shared(payload, shared):
+    # "in-flight" / "recent": this request reused another run's result
+    if shared:
+        payload["shared"] = shared
+    return payload
 
 # --- RSS Import Endpoint ---
 @api_view(['POST'])
@@ -49,63 +67,27 @@ def letterboxd_rss(request):
             {"error": "Invalid RSS input"}, 
             status=status.HTTP_400_BAD_REQUEST,
             )
-    feed = feedparser.parse(rss_url)
-    # feed.bozo indicates a parsing error
-    if getattr(feed, "bozo", False):
+
+    def run():
+        # imported here so workers that never sync a feed don't pay for it at boot
+        import feedparser
+        feed = feedparser.parse(fetch_feed(rss_url))
+        # feed.bozo indicates a parsing error
+        if getattr(feed, "bozo", False):
+            raise FeedUnavailable(rss_url)
+        return sync_rss_entries(request.user, feed.entries)
+
+    # double-clicked "Sync": concurrent syncs of one feed share a single download and write
+    try:
+        counters, shared = single_flight(rss_sync_key(request.user, rss_url), run,
+                                         min_interval=settings.LETTERBOXD_SYNC_MIN_INTERVAL)
+    except FeedUnavailable:
         return Response(
             {"error": "Could not read that RSS feed. Make sure the profile is public and the input is correct."}, 
             status=status.HTTP_400_BAD_REQUEST,
             )
-    user = request.user
-    synced, created_movies, created_links, updated_links = 0, 0, 0, 0
-    # Typical entries ~20
-    for entry in feed.entries:
-        link = (getattr(entry, "link", "") or "").strip()
-        title = (getattr(entry, "title", "") or "").strip()
-        if not link:
-            continue
-        # use the entry link as our letterboxd_uri key
-        movie, movie_created = Movie.objects.get_or_create(
-            letterboxd_uri=link,
-            defaults={"title": title[:255] if title else None}
-        )
-        if movie_created:
-            created_movies += 1
-
-        # Create or update relationship for this user and movie
-        mu, created = MovieUser.objects.get_or_create(
-            user=user,
-            movie=movie,
-        )
-        if created:
-            created_links += 1
-        
-        # Mark watched + set watched_date from RSS publish date if present
-        pub_dt = _parse_published_date(entry)
-        watched_date = pub_dt if pub_dt else None
-        
-        changed = False
-        if mu.watch_status != "Watched":
-            mu.watch_status = "Watched"
-            changed = True
-
-        if watched_date and mu.watched_date != watched_date:
-            mu.watched_date = watched_date
-            changed = True
-        
-        if changed:
-            mu.save()
-            if not created:
-                updated_links += 1
-
-        synced += 1
+    except SingleFlightTimeout:
+        return Response({"error": "A sync of this feed is already running."}, status=status.HTTP_409_CONFLICT)
 
-        return Response({
-            "status": "ok",
-            "rss_url": rss_url,
-            "entries_processed": synced,
-            "movies_created": created_movies,
-            "movieuser_created": created_links,
-            "movieuser_updated": updated_links,
-        })
-        
\ No newline at end of file
+    mark_recent_write(request)
+    return Response(_with_shared({"status": "ok", "rss_url": rss_url, **counters}, shared))
@@ -0,0 +1,66 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..db_routers import mark_recent_write, use_read_replica
+from ..models import Movie, MovieNeighbor
+from ..services.tmdb_enrichment import enrich_movies, movies_missing_metadata
+
+MAX_SIMILAR = 20
+MAX_ENRICH_PER_REQUEST = 50
+
+
+# --- Similar Films Endpoint ---
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def similar_movies(request, movie_id):
+    """
+    GET ?k=<n> -> the top-k precomputed neighbours of a movie.
+    Reads at most MAX_SIMILAR rows from MovieNeighbor (see build_similar_films).
+    """
+    try:
+        k = int(request.query_params.get("k", MAX_SIMILAR))
+    except ValueError:
+        return Response({"error": "k must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    k = max(1, min(k, MAX_SIMILAR))
+
+    rows = list(
+        MovieNeighbor.objects.filter(movie_id=movie_id)
+        .order_by("rank")
+        .values("neighbor_id", "neighbor__title", "neighbor__release_date", "neighbor__poster_url", "score")[:k]
+    )
+    if not rows and not Movie.objects.filter(pk=movie_id).exists():
+        return Response({"error": "Movie not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(
+        {
+            "movie": movie_id,
+            "similar": [
+                {
+                    "id": r["neighbor_id"],
+                    "title": r["neighbor__title"],
+                    "year": r["neighbor__release_date"].year if r["neighbor__release_date"] else None,
+                    "posterUrl": r["neighbor__poster_url"],
+                    "score": round(r["score"], 4),
+                }
+                for r in rows
+            ],
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+# --- Metadata Enrichment Trigger ---
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def enrich_my_movies(request):
+    """
+    Fetch TMDb metadata and credits for up to MAX_ENRICH_PER_REQUEST of the
+    user's films that are still missing it.
+    """
+    movies = movies_missing_metadata(Movie.objects.filter(movieuser__user=request.user))
+    counters = enrich_movies(movies, limit=MAX_ENRICH_PER_REQUEST)
+    mark_recent_write(request)
+    return Response({"status": "ok", **counters}, status=status.HTTP_200_OK)
@@ -0,0 +1,39 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..services.search_index import search_history
+
+MAX_PAGE_SIZE = 50
+
+
+# --- History Search Endpoint ---
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """
+    GET ?q=<text>&page=<n>&page_size=<n>
+    Full-text search over the user's own films (title, description) and reviews.
+    """
+    q = (request.query_params.get("q") or "").strip()
+    if not q:
+        return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page = max(1, int(request.query_params.get("page", 1)))
+        page_size = max(1, min(int(request.query_params.get("page_size", 20)), MAX_PAGE_SIZE))
+    except ValueError:
+        return Response({"error": "page and page_size must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    results, has_more = search_history(request.user, q, page=page, page_size=page_size)
+    return Response(
+        {
+            "query": q,
+            "page": page,
+            "pageSize": page_size,
+            "hasMore": has_more,
+            "results": results,
+        },
+        status=status.HTTP_200_OK,
+    )
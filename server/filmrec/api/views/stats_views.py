@@ -6,12 +6,12 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from ..db_routers import use_read_replica
 from ..models import MovieUser, Director, Actor, Genre
-from ..utils.dates import week_window_sunday_anchor  # you already created this
+from ..services.global_stats import global_stats_for, percentile_rank
+from ..utils.dates import DECADE_ORDER, getDecadeLabel, week_window_sunday_anchor  # you already created this
 
 
-DECADE_ORDER = ["Pre-1960s", "60s", "70s", "80s", "90s", "00s", "10s", "20s"]
-
 def loadAllTime(user):
     return MovieUser.objects.filter(
         user=user,
@@ -35,26 +35,16 @@ def calc_percentChange(old, new):
     return ((new - old) / abs(old)) * 100
 
 
-def calculatePerDay(entries, start_date):
+def calculatePerDay(dates, start_date):
     weekData = [0] * 7
-    for entry in entries:
-        delta = (entry.watched_date.date() - start_date.date()).days
+    for watched in dates:
+        delta = (watched - start_date.date()).days   # watched_date is a DateField
         if 0 <= delta < 7:
             weekData[delta] += 1
     return weekData
 
 
-def getDecadeLabel(year: int) -> str:
-    if year < 1960:
-        return "Pre-1960s"
-    decade = (year // 10) * 10
-    two = decade % 100
-    return f"{two:02d}s"
-
-
-def byDecadePayload(movieuser_qs):
-    years = movieuser_qs.values_list("movie__release_date__year", flat=True)
-
+def byDecadePayload(years):
     counts = Counter()
     for y in years:
         if y is None:
@@ -64,97 +54,155 @@ def byDecadePayload(movieuser_qs):
     return [{"label": lab, "count": counts.get(lab, 0)} for lab in DECADE_ORDER]
 
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def stats_payload(request):
+def topCounts(model, link, movieuser_qs, limit=5):
+    # e.g. Director via "moviedirector": the user's most-watched directors in movieuser_qs
+    return (
+        model.objects.filter(**{f"{link}__movie__movieuser__in": movieuser_qs})
+        .annotate(count=models.Count(f"{link}__movie__movieuser", distinct=True))
+        .order_by("-count")
+        .values("name", "count")[:limit]
+    )
+
+
+# ---------- queries / payloads ----------
+# Each stats payload is a dict of independent querysets plus a function that
+# assembles the response from their evaluated rows, so the sync views here and
+# the async views (async_views.py) run exactly the same queries.
+
+def weeklyQueries(user):
     lastWeekStart, lastWeekEnd, thisWeekStart, thisWeekEnd = week_window_sunday_anchor()
+    thisWeekMovies = loadWeekly(user, thisWeekStart, thisWeekEnd)
+    lastWeekMovies = loadWeekly(user, lastWeekStart, lastWeekEnd)
+    window = {"thisWeekStart": thisWeekStart, "lastWeekStart": lastWeekStart}
+    return window, {
+        "thisWeek": thisWeekMovies.values_list("watched_date", flat=True),
+        "lastWeek": lastWeekMovies.values_list("watched_date", flat=True),
+        "directors": topCounts(Director, "moviedirector", thisWeekMovies),
+        "actors": topCounts(Actor, "movieactor", thisWeekMovies),
+        "genres": topCounts(Genre, "moviegenre", thisWeekMovies),
+        "recentFilms": thisWeekMovies.order_by("-watched_date").values_list("movie__title", flat=True)[:5],
+        "years": thisWeekMovies.values_list("movie__release_date__year", flat=True),
+    }
 
-    thisWeekMovies = loadWeekly(request.user, thisWeekStart, thisWeekEnd)
-    lastWeekMovies = loadWeekly(request.user, lastWeekStart, lastWeekEnd)
 
-    days = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-    thisWeekArr = calculatePerDay(thisWeekMovies, thisWeekStart)
-    lastWeekArr = calculatePerDay(lastWeekMovies, lastWeekStart)
+def weeklyPayload(window, rows):
+    thisWeekCount = len(rows["thisWeek"])
+    lastWeekCount = len(rows["lastWeek"])
+    return {
+        "totalWatches": thisWeekCount,
+        "percentChange": calc_percentChange(lastWeekCount, thisWeekCount),
+        "days": ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"],
+        "thisWeek": calculatePerDay(rows["thisWeek"], window["thisWeekStart"]),
+        "lastWeek": calculatePerDay(rows["lastWeek"], window["lastWeekStart"]),
+        "directors": rows["directors"],
+        "actors": rows["actors"],
+        "genres": rows["genres"],
+        "recentFilms": [{"name": title} for title in rows["recentFilms"]],
+        "byDecade": byDecadePayload(rows["years"]),
+    }
 
-    topDirectors = (
-        Director.objects.filter(moviedirector__movie__movieuser__in=thisWeekMovies)
-        .annotate(count=models.Count("moviedirector__movie__movieuser", distinct=True))
-        .order_by("-count")[:5]
-    )
 
-    topActors = (
-        Actor.objects.filter(movieactor__movie__movieuser__in=thisWeekMovies)
-        .annotate(count=models.Count("movieactor__movie__movieuser", distinct=True))
-        .order_by("-count")[:5]
-    )
+def allTimeQueries(user):
+    allMovies = loadAllTime(user)
+    return {
+        "directors": topCounts(Director, "moviedirector", allMovies),
+        "actors": topCounts(Actor, "movieactor", allMovies),
+        "genres": topCounts(Genre, "moviegenre", allMovies),
+        "recentFilms": allMovies.values_list("movie__title", flat=True),
+        "years": allMovies.values_list("movie__release_date__year", flat=True),
+    }
 
-    topGenres = (
-        Genre.objects.filter(moviegenre__movie__movieuser__in=thisWeekMovies)
-        .annotate(count=models.Count("moviegenre__movie__movieuser", distinct=True))
-        .order_by("-count")[:5]
-    )
 
-    recentEntries = thisWeekMovies.select_related("movie").order_by("-watched_date")[:5]
-    recentMovies = [entry.movie for entry in recentEntries]
-
-    thisWeekCount = thisWeekMovies.count()
-    lastWeekCount = lastWeekMovies.count()
-    percentChange = calc_percentChange(lastWeekCount, thisWeekCount)
-
-    decadeCounts = byDecadePayload(thisWeekMovies)
-
-    return Response(
-        {
-            "totalWatches": thisWeekCount,
-            "percentChange": percentChange,
-            "days": days,
-            "thisWeek": thisWeekArr,
-            "lastWeek": lastWeekArr,
-            "directors": [{"name": d.name, "count": d.count} for d in topDirectors],
-            "actors": [{"name": a.name, "count": a.count} for a in topActors],
-            "genres": [{"name": g.name, "count": g.count} for g in topGenres],
-            "recentFilms": [{"name": m.title} for m in recentMovies],
-            "byDecade": decadeCounts,
-        },
-        status=status.HTTP_200_OK,
-    )
+def allTimePayload(rows):
+    return {
+        "totalWatches": len(rows["years"]),
+        "directors": rows["directors"],
+        "actors": rows["actors"],
+        "genres": rows["genres"],
+        "recentFilms": [{"name": title} for title in rows["recentFilms"]],
+        "byDecade": byDecadePayload(rows["years"]),
+    }
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated])
-def stats_all_time(request):
-    allMovies = loadAllTime(request.user)
 
-    topDirectors = {
-        Director.objects.filter(moviedirector__movie__movieuser__in=allMovies)
-        .annotate(count=models.Count("moviedirector__movie__movieuser",distinct=True))
-        .order_by("-count")[:5]
+# ---------- you vs everyone ----------
+# Figures from the GlobalStats summary rows (compute_global_stats job); None
+# until the job has run. The user's own counts come from the same run
+# (UserStatsSummary), so both sides cover the same windows as of computedAt.
+# Only cached rows are read here.
+
+def compareCount(you, everyone, cohort, field):
+    points = everyone[field]
+    return {
+        "you": you,
+        "median": points[50] if points else None,
+        "percentile": percentile_rank(points, you),
+        "cohortPercentile": percentile_rank(cohort[field], you) if cohort else None,
     }
 
-    topActors = {
-        Actor.objects.filter(movieactor__movie__movieuser__in=allMovies)
-        .annotate(count=models.Count("movieactor__movie__movieuser",distinct=True))
-        .order_by("-count")[:5]
+
+def vsEveryoneWeekly(everyone, cohort, you):
+    if not everyone:
+        return None
+    return {
+        "computedAt": everyone["computed_at"],
+        "users": everyone["users"],
+        "last7Days": compareCount(you["last_7_days"], everyone, cohort, "week_percentiles"),
+        "last30Days": compareCount(you["last_30_days"], everyone, cohort, "month_percentiles"),
+        "weekStart": everyone["week_start"],
+        "topFilms": everyone["top_films"],
+        "topDirectors": everyone["top_directors"],
     }
 
-    topGenres = {
-        Actor.objects.filter(moviegenre__movie__movieuser__in=allMovies)
-        .annotate(count=models.Count("moviegenre__movie__movieuser",distinct=True))
-        .order_by("-count")[:5]
+
+def vsEveryoneAllTime(rows, everyone, cohort, you):
+    if not everyone:
+        return None
+    # shares are of the films loaded for this response; the count is the job's
+    total = len(rows["years"])
+    decades = Counter(getDecadeLabel(int(y)) for y in rows["years"] if y is not None)
+    dated = sum(decades.values())
+    return {
+        "computedAt": everyone["computed_at"],
+        "users": everyone["users"],
+        "allTime": compareCount(you["all_time"], everyone, cohort, "all_time_percentiles"),
+        "genres": [
+            {
+                "name": row["name"],
+                "yourShare": round(row["count"] / total, 4) if total else None,
+                "everyoneShare": everyone["genre_shares"].get(row["name"], 0),
+            }
+            for row in rows["genres"]
+        ],
+        "byDecade": [
+            {
+                "label": lab,
+                "yourShare": round(decades[lab] / dated, 4) if dated else None,
+                "everyoneShare": everyone["decade_shares"].get(lab, 0),
+            }
+            for lab in DECADE_ORDER
+        ],
     }
 
-    recentEntries = allMovies.select_related("movie")
-    recentMovies = [entry.movie for entry in recentEntries]
-
-    totalCount = allMovies.count()
-    decadeCounts = byDecadePayload(allMovies)
-    return Response(
-        {
-            "totalWatches": totalCount,
-            "directors": [{"name": d.name, "count": d.count} for d in topDirectors],
-            "actors": [{"name": a.name, "count": a.count} for a in topActors],
-            "genres": [{"name": g.name, "count": g.count} for g in topGenres],
-            "recentFilms": [{"name": m.title} for m in recentMovies],
-            "byDecade": decadeCounts,
-        },
-        status=status.HTTP_200_OK,
-    )
\ No newline at end of file
+
+def evaluate(queries):
+    return {name: list(qs) for name, qs in queries.items()}
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def stats_payload(request):
+    window, queries = weeklyQueries(request.user)
+    rows = evaluate(queries)
+    payload = weeklyPayload(window, rows)
+    payload["vsEveryone"] = vsEveryoneWeekly(*global_stats_for(request.user))
+    return Response(payload, status=status.HTTP_200_OK)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@use_read_replica
+def stats_all_time(request):
+    rows = evaluate(allTimeQueries(request.user))
+    payload = allTimePayload(rows)
+    payload["vsEveryone"] = vsEveryoneAllTime(rows, *global_stats_for(request.user))
+    return Response(payload, status=status.HTTP_200_OK)
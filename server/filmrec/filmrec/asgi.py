@@ -7,10 +7,17 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
+import importlib.util
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.exceptions import ImproperlyConfigured
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'filmrec.settings')
 
+# The async endpoints download feeds with httpx: refuse to start without it
+# instead of failing on the first sync. find_spec doesn't import it.
+if importlib.util.find_spec('httpx') is None:
+    raise ImproperlyConfigured("httpx is required to serve filmrec over ASGI (pip install -r requirements.txt).")
+
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,11 +45,15 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -58,6 +63,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.db_routers.recent_write_middleware',
 ]
 
 ROOT_URLCONF = 'filmrec.urls'
@@ -83,13 +89,50 @@ WSGI_APPLICATION = 'filmrec.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite is tuned per connection: WAL lets stats reads run while an import is
+# writing, and IMMEDIATE transactions take the write lock up front so concurrent
+# writers queue on the busy timeout instead of failing mid-transaction.
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',        # durable at checkpoints; safe with WAL
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',       # 256 MB
+    'PRAGMA cache_size=-65536',         # 64 MB page cache
+]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,                  # seconds to wait on a locked database (busy_timeout)
+        },
     }
 }
 
+# Optional read replica for the analytics views (see api/db_routers.py).
+# Locally a second SQLite file stands in for it; refresh it with `manage.py sync_replica`.
+FILMREC_REPLICA_DB_PATH = os.environ.get('FILMREC_REPLICA_DB_PATH', '')
+if FILMREC_REPLICA_DB_PATH:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': FILMREC_REPLICA_DB_PATH,
+        'OPTIONS': {
+            **DATABASES['default']['OPTIONS'],
+            'init_command': ';'.join(SQLITE_PRAGMAS + ['PRAGMA query_only=ON']),
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.db_routers.PrimaryReplicaRouter']
+
+# After an import a user's reads stay on the primary this long (read-your-writes).
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '60'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,3 +174,68 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# TMDb metadata enrichment
+# The base URL is configurable so enrichment can run against a local stand-in server.
+
+TMDB_API_BASE_URL = os.environ.get('TMDB_API_BASE_URL', 'https://api.themoviedb.org/3')
+TMDB_API_KEY = os.environ.get('TMDB_API_KEY', '')
+TMDB_READ_ACCESS_TOKEN = os.environ.get('TMDB_READ_ACCESS_TOKEN', '')
+TMDB_IMAGE_BASE_URL = os.environ.get('TMDB_IMAGE_BASE_URL', 'https://image.tmdb.org/t/p/original')
+TMDB_REQUESTS_PER_SECOND = float(os.environ.get('TMDB_REQUESTS_PER_SECOND', '20'))
+TMDB_MAX_WORKERS = int(os.environ.get('TMDB_MAX_WORKERS', '8'))
+TMDB_TIMEOUT_SECONDS = float(os.environ.get('TMDB_TIMEOUT_SECONDS', '10'))
+# A movie TMDb couldn't match is retried after this many seconds, doubling per failure up to the max.
+TMDB_RETRY_BACKOFF_SECONDS = int(os.environ.get('TMDB_RETRY_BACKOFF_SECONDS', str(60 * 60)))
+TMDB_RETRY_MAX_BACKOFF_SECONDS = int(os.environ.get('TMDB_RETRY_MAX_BACKOFF_SECONDS', str(60 * 60 * 24 * 30)))
+
+# On-disk cache of TMDb responses (set TMDB_CACHE_PATH to '' to disable).
+# TTLs are per endpoint prefix, in seconds; stale entries are revalidated with ETag / Last-Modified.
+TMDB_CACHE_PATH = os.environ.get('TMDB_CACHE_PATH', str(BASE_DIR / 'tmdb_cache.sqlite3'))
+TMDB_CACHE_MAX_ENTRIES = int(os.environ.get('TMDB_CACHE_MAX_ENTRIES', '100000'))
+TMDB_CACHE_DEFAULT_TTL = 60 * 60 * 24
+TMDB_CACHE_TTLS = {
+    '/search/': 60 * 60 * 24,
+    '/movie/': 60 * 60 * 24 * 7,
+    '/person/': 60 * 60 * 24 * 30,
+    '/configuration': 60 * 60 * 24 * 30,
+}
+
+# Local poster / profile image cache.
+# Files are stored content-addressed under POSTER_CACHE_DIR. When POSTER_CACHE_SEED_DIR
+# is set, images are read from files named after the URL's basename there and the
+# network is never used (offline / test runs).
+POSTER_CACHE_DIR = os.environ.get('POSTER_CACHE_DIR', str(BASE_DIR / 'poster_cache'))
+POSTER_CACHE_SEED_DIR = os.environ.get('POSTER_CACHE_SEED_DIR', '')
+POSTER_CACHE_WORKERS = int(os.environ.get('POSTER_CACHE_WORKERS', '2'))
+# How long an image the source didn't have is answered with 404 before it's fetched again.
+POSTER_CACHE_MISS_TTL = int(os.environ.get('POSTER_CACHE_MISS_TTL', str(60 * 60 * 6)))
+POSTER_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+
+# Shared cache (JWT user lookups, global stats). The default is
+# per-process; point CACHE_BACKEND / CACHE_LOCATION at a shared backend (Redis,
+# Memcached, database) when running several worker processes.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'filmrec'),
+    }
+}
+
+# Seconds an authenticated User is served from the cache instead of the database, and the
+# cache alias used for it. With a per-process backend (LocMem) other workers see a
+# deactivation only once their copy expires, so keep the TTL short unless the alias is shared.
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', '10'))
+JWT_USER_CACHE_ALIAS = os.environ.get('JWT_USER_CACHE_ALIAS', 'default')
+
+# A user's sync of the same RSS feed, or the same CSV import, repeated within this many
+# seconds returns the last result instead of running again.
+LETTERBOXD_SYNC_MIN_INTERVAL = int(os.environ.get('LETTERBOXD_SYNC_MIN_INTERVAL', '60'))
+
+# Worker cold-start budget in milliseconds (settings, apps and URLconf) and a ceiling on
+# the modules loaded by then. Checked by `profile_imports --fail-over-budget`; api.tests
+# always checks the module ceiling and 3x the time budget, and the exact budget when
+# FILMREC_TIMING_TESTS=1.
+WORKER_BOOT_BUDGET_MS = int(os.environ.get('WORKER_BOOT_BUDGET_MS', '1500'))
+WORKER_BOOT_MAX_MODULES = int(os.environ.get('WORKER_BOOT_MAX_MODULES', '1000'))
@@ -21,6 +21,14 @@ from django.urls import path
 from api.views.auth_views import loginView, registerView, ping, password_reset_confirm, password_reset_request
 from api.views.stats_views import stats_payload, stats_all_time
 from api.views.letterboxd_views import letterboxd_import, letterboxd_rss
+from api.views.movie_views import similar_movies, enrich_my_movies
+from api.views.search_views import search
+from api.views.history_views import history
+from api.views.image_views import movie_poster, actor_profile
+from api.views.export_views import export_history
+from api.views.async_views import (
+    async_letterboxd_rss, async_enrich_my_movies, async_stats_payload, async_stats_all_time,
+)
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -39,4 +47,19 @@ urlpatterns = [
 
     path("api/letterboxd/import/", letterboxd_import, name="letterboxd-import"),
     path("api/letterboxd/rss/", letterboxd_rss, name="letterboxd-rss"),
+    path("api/export/", export_history, name="export-history"),
+
+    path("api/movies/<int:movie_id>/similar/", similar_movies, name="movie-similar"),
+    path("api/movies/enrich/", enrich_my_movies, name="movie-enrich"),
+    path("api/search/", search, name="search"),
+    path("api/history/", history, name="history"),
+
+    path("api/movies/<int:movie_id>/poster/<str:variant>/", movie_poster, name="movie-poster"),
+    path("api/actors/<int:actor_id>/profile/<str:variant>/", actor_profile, name="actor-profile"),
+
+    # async variants for ASGI deployments: slow feed fetches don't hold a worker thread
+    path("api/async/stats/", async_stats_payload, name="async-stats-payload"),
+    path("api/async/stats/all-time", async_stats_all_time, name="async-stats-all-time"),
+    path("api/async/letterboxd/rss/", async_letterboxd_rss, name="async-letterboxd-rss"),
+    path("api/async/movies/enrich/", async_enrich_my_movies, name="async-movie-enrich"),
 ]